@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Audio block processing shared by NEPTR's pipeline and benchmarks
+Blocks are raw mono int16 PCM bytes, as delivered by the sound card callback.
+"""
+
+import collections
+import math
+
+import numpy as np
+
+# What an AutomaticGainControl reports after each block (levels are RMS after the gain)
+AgcState = collections.namedtuple("AgcState", "gain noise_floor speech_level silence_threshold")
+
+
+def block_rms(data: bytes) -> float:
+    """Root mean square loudness of one int16 block (0.0 for an empty block)"""
+    arr = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+    if not arr.size:
+        return 0.0
+    return float(np.sqrt(np.dot(arr, arr) / arr.size))
+
+
+def resample_linear(data: bytes, from_rate: int, to_rate: int) -> bytes:
+    """Linear-interpolation resampling of int16 PCM (fine for test audio, not for the live path)"""
+    if from_rate == to_rate or not data:
+        return data
+    arr = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+    count = int(round(len(arr) * to_rate / from_rate))
+    positions = np.arange(count) * (from_rate / to_rate)
+    return np.interp(positions, np.arange(len(arr)), arr).round().astype(np.int16).tobytes()
+
+
+class PolyphaseResampler:
+    """
+    Streaming rational resampler for int16 blocks (e.g. 48000 or 44100 -> 16000 Hz).
+    Upsampling by L and downsampling by M around one windowed-sinc low-pass,
+    split into L phases of `taps` coefficients (zero_crossings on each side of
+    the sinc) so each output sample costs `taps` multiply-adds. A whole block is
+    one gather and one einsum; the last taps - 1 input samples carry over to the
+    next block, so block edges are seamless.
+    """
+
+    def __init__(self, from_rate, to_rate, zero_crossings=16, cutoff=0.9, beta=8.0):
+        divisor = math.gcd(from_rate, to_rate)
+        self.up = to_rate // divisor
+        self.down = from_rate // divisor
+        self.from_rate = from_rate
+        self.to_rate = to_rate
+        taps = self.taps = math.ceil(2 * zero_crossings * max(self.up, self.down) / (cutoff * self.up))
+
+        # Low-pass at `cutoff` of the lower Nyquist frequency, designed at the upsampled rate
+        length = self.up * taps
+        n = np.arange(length) - (length - 1) / 2
+        band = cutoff / max(self.up, self.down)
+        prototype = band * np.sinc(band * n) * np.kaiser(length, beta) * self.up
+        # phases[p][k] multiplies input sample (base - k) for output phase p
+        self.phases = prototype.reshape(taps, self.up).T[:, ::-1].astype(np.float32)
+
+        self._history = np.zeros(taps - 1, dtype=np.float32)
+        self._position = 0  # next output's position on the upsampled grid, relative to the history start
+
+    @property
+    def delay_sec(self) -> float:
+        """Group delay of the filter"""
+        return (self.up * self.taps - 1) / 2 / (self.up * self.from_rate)
+
+    def process(self, data: bytes) -> bytes:
+        if self.up == self.down:
+            return data
+        samples = np.concatenate((self._history, np.frombuffer(data, dtype=np.int16).astype(np.float32)))
+        # Upsampled index of the newest sample each output can use
+        last = (len(samples) - self.taps + 1) * self.up
+        positions = np.arange(self._position, last, self.down)
+        if positions.size:
+            bases, phases = np.divmod(positions, self.up)
+            windows = np.lib.stride_tricks.sliding_window_view(samples, self.taps)[bases]
+            out = np.einsum("ij,ij->i", windows, self.phases[phases])
+            self._position = int(positions[-1]) + self.down
+        else:
+            out = np.empty(0, dtype=np.float32)
+        consumed = len(samples) - (self.taps - 1)
+        self._history = samples[consumed:]
+        self._position -= consumed * self.up
+        return np.clip(np.round(out), -32768, 32767).astype(np.int16).tobytes()
+
+
+class NoiseSuppressor:
+    """
+    Streaming spectral noise suppression (STFT Wiener filter) for int16 blocks.
+    Frames of `frame` samples every `hop`, sqrt-Hann windows on both sides so
+    overlap-add reconstructs the input exactly when nothing is suppressed.
+    The noise spectrum is learned from the first `warmup_frames` frames, then
+    tracked in every bin that isn't clearly speech; it creeps up slowly
+    everywhere else so a fan or TV switched on later is still learned.
+    Gains use the decision-directed a priori SNR, floored at gain_floor.
+
+    process() returns whole hops only, so output lags input by frame - hop
+    samples (16 ms at 16 kHz) and block sizes may differ by a hop.
+    """
+
+    def __init__(self, frame=512, hop=256, gain_floor=0.1, noise_smoothing=0.95, prior_smoothing=0.98,
+                 speech_ratio=4.0, noise_rise=0.002, warmup_frames=8):
+        if frame != 2 * hop:
+            raise ValueError("the sqrt-Hann overlap-add needs frame == 2 * hop")
+        self.frame = frame
+        self.hop = hop
+        self.gain_floor = gain_floor
+        self.noise_smoothing = noise_smoothing
+        self.prior_smoothing = prior_smoothing
+        self.speech_ratio = speech_ratio
+        self.noise_rise = noise_rise
+        self.warmup_frames = warmup_frames
+
+        self.window = np.sqrt(np.hanning(frame + 1)[:-1]).astype(np.float32)
+        bins = frame // 2 + 1
+        self.noise = np.zeros(bins, dtype=np.float64)
+        self.frames_seen = 0
+        self._clean_power = np.zeros(bins, dtype=np.float64)
+        self._tail = np.zeros(frame - hop, dtype=np.float32)   # input not yet covered by a full frame
+        self._overlap = np.zeros(frame - hop, dtype=np.float32)  # second half of the last synthesized frame
+        self._frames = np.zeros((0, frame), dtype=np.float32)
+        self._gains = np.zeros((0, bins), dtype=np.float64)
+
+    def _buffers(self, count):
+        # Grown to the largest block seen, then reused
+        if len(self._frames) < count:
+            self._frames = np.zeros((count, self.frame), dtype=np.float32)
+            self._gains = np.zeros((count, self.frame // 2 + 1), dtype=np.float64)
+        return self._frames[:count], self._gains[:count]
+
+    def _update_gains(self, power, gains):
+        """Noise tracking and Wiener gains, frame by frame (each frame depends on the last)"""
+        for i, frame_power in enumerate(power):
+            if self.frames_seen < self.warmup_frames:
+                self.noise += (frame_power - self.noise) / (self.frames_seen + 1)
+                self.frames_seen += 1
+                gains[i] = 1.0
+                continue
+            self.frames_seen += 1
+            noise = np.maximum(self.noise, 1e-3)
+            quiet = frame_power < self.speech_ratio * noise
+            self.noise = np.where(quiet, self.noise_smoothing * self.noise + (1 - self.noise_smoothing) * frame_power,
+                                  self.noise * (1 + self.noise_rise))
+            posterior = frame_power / noise
+            prior = (self.prior_smoothing * self._clean_power / noise
+                     + (1 - self.prior_smoothing) * np.maximum(posterior - 1.0, 0.0))
+            gain = np.maximum(prior / (1.0 + prior), self.gain_floor)
+            self._clean_power = gain * gain * frame_power
+            gains[i] = gain
+
+    def process(self, data: bytes) -> bytes:
+        samples = np.concatenate((self._tail, np.frombuffer(data, dtype=np.int16).astype(np.float32)))
+        count = (len(samples) - (self.frame - self.hop)) // self.hop
+        if count <= 0:
+            self._tail = samples
+            return b""
+        frames, gains = self._buffers(count)
+        windows = np.lib.stride_tricks.sliding_window_view(samples, self.frame)[::self.hop][:count]
+        np.multiply(windows, self.window, out=frames)
+
+        spectrum = np.fft.rfft(frames, axis=1)
+        self._update_gains(spectrum.real ** 2 + spectrum.imag ** 2, gains)
+        spectrum *= gains
+        synthesized = np.fft.irfft(spectrum, n=self.frame, axis=1).astype(np.float32)
+        synthesized *= self.window
+
+        # Overlap-add: each hop of output is the second half of one frame plus the first half of the next
+        out = np.empty(count * self.hop, dtype=np.float32)
+        halves = synthesized.reshape(count, 2, self.hop)
+        out[:self.hop] = self._overlap + halves[0, 0]
+        out[self.hop:] = (halves[:-1, 1] + halves[1:, 0]).ravel()
+        self._overlap = halves[-1, 1].copy()
+        self._tail = samples[count * self.hop:]
+        return np.clip(np.round(out), -32768, 32767).astype(np.int16).tobytes()
+
+
+class AutomaticGainControl:
+    """
+    Streaming AGC with an adaptive noise floor, for int16 blocks.
+    Each block is cut into `window_ms` windows whose RMS levels are computed
+    at once. The quietest windows track the noise floor (falling quickly,
+    rising slowly); windows well above it track the speech level, and the gain
+    moves the speech level towards target_rms, ramped across the block.
+    silence_threshold is the noise floor after the gain times `margin`: a
+    replacement for the fixed RMS_SILENCE_THRESHOLD that follows the room.
+    """
+
+    def __init__(self, sample_rate=16000, target_rms=3000.0, min_gain=0.25, max_gain=8.0, window_ms=20,
+                 margin=2.0, min_threshold=50.0, floor_rise=0.02, floor_fall=0.5, speech_smoothing=0.2,
+                 max_gain_step=1.25):
+        self.window = max(1, sample_rate * window_ms // 1000)
+        self.target_rms = target_rms
+        self.min_gain = min_gain
+        self.max_gain = max_gain
+        self.margin = margin
+        self.min_threshold = min_threshold
+        self.floor_rise = floor_rise
+        self.floor_fall = floor_fall
+        self.speech_smoothing = speech_smoothing
+        self.max_gain_step = max_gain_step
+
+        self.gain = 1.0
+        self.noise_floor = None  # input scale, before the gain
+        self.speech_level = None
+
+    def _track(self, levels):
+        quiet = float(np.percentile(levels, 10))
+        if self.noise_floor is None:
+            self.noise_floor = quiet
+        else:
+            step = self.floor_fall if quiet < self.noise_floor else self.floor_rise
+            self.noise_floor += (quiet - self.noise_floor) * step
+        loud = levels[levels > self.noise_floor * self.margin]
+        if loud.size:
+            level = float(np.sqrt(np.mean(loud ** 2)))
+            self.speech_level = level if self.speech_level is None else (
+                self.speech_level + (level - self.speech_level) * self.speech_smoothing)
+
+    def process(self, data: bytes, adapt=True) -> bytes:
+        """
+        Level one block. With adapt=False (while NEPTR is speaking or thinking)
+        the current gain is applied unchanged and nothing is learned from the
+        block, so NEPTR's own voice echoing back is never taken for the room.
+        """
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+        if not samples.size:
+            return data
+        if not adapt:
+            samples *= self.gain
+            return np.clip(samples, -32768, 32767).astype(np.int16).tobytes()
+        usable = samples.size - samples.size % self.window or samples.size
+        windows = samples[:usable].reshape(-1, min(self.window, usable))
+        self._track(np.sqrt(np.mean(windows * windows, axis=1)))
+
+        wanted = self.gain
+        if self.speech_level:
+            wanted = min(max(self.target_rms / self.speech_level, self.min_gain), self.max_gain)
+        # Limit how far one block can move the gain, and ramp it across the block (no clicks)
+        new_gain = min(max(wanted, self.gain / self.max_gain_step), self.gain * self.max_gain_step)
+        ramp = np.linspace(self.gain, new_gain, samples.size, dtype=np.float32)
+        self.gain = new_gain
+        samples *= ramp
+        return np.clip(samples, -32768, 32767).astype(np.int16).tobytes()
+
+    @property
+    def silence_threshold(self) -> float:
+        floor = (self.noise_floor or 0.0) * self.gain
+        return max(self.min_threshold, floor * self.margin)
+
+    def state(self) -> AgcState:
+        return AgcState(self.gain, (self.noise_floor or 0.0) * self.gain,
+                        (self.speech_level or 0.0) * self.gain, self.silence_threshold)
@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for NEPTR's hot paths
+Run on the Pi before deploying, and compare with a stored baseline:
+
+    python3 benchmark.py --save-baseline       # on a known-good build
+    python3 benchmark.py                       # later: exits 1 on a regression
+
+Covered: wake-phrase matching against TRIGGERS, per-block RMS (the VAD),
+noise suppression, polyphase resampling and Vosk AcceptWaveform real-time
+factors, handle_intent() against the mock LLM server, and espeak-ng synthesis.
+capture_native_vs_alsa records from the default microphone twice, once at
+SAMPLE_RATE (ALSA or PulseAudio converts) and once at the device's own rate
+with in-process resampling, and compares system-wide CPU and input latency. asr_noisy_wer mixes
+fan-like noise (or --noise-wav, a recording of the real fan or TV) into the
+clips and reports Vosk's word error rate with noise suppression, next to the
+rate without it. Benchmarks whose dependencies are missing (vosk, the model,
+espeak-ng, sounddevice or a microphone) are reported as skipped. Lower is better for every number.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+import wave
+
+import numpy as np
+
+from audio_dsp import NoiseSuppressor, PolyphaseResampler, block_rms
+from wake_words import WakeMatcher
+
+try:
+    import config
+except ImportError:
+    config = None
+
+DEFAULT_TRIGGERS = ["hello neptr", "hey neptr", "hi neptr"]
+
+WAKE_TRANSCRIPTS = [
+    "hello neptr",
+    "hey nectar how are you",
+    "what is the weather like today",
+    "the quick brown fox jumps over the lazy dog",
+    "turn on the kitchen lights please",
+    "hi there",
+    "",
+    "i was talking to finn about the candy kingdom yesterday afternoon",
+]
+
+INTENT_COMMANDS = [
+    "what time is it",
+    "what is the date today",
+    "tell me about the candy kingdom",
+    "why is the sky blue",
+    "what is your favorite pie",
+]
+
+SPEECH_TEXTS = [
+    "Beep boop! I am the Never Ending Pie Throwing Robot!",
+    "Whirr! The capital of France is Paris. Mathematical!",
+]
+
+
+class Skipped(Exception):
+    pass
+
+
+def setting(name, default):
+    return getattr(config, name, default) if config is not None else default
+
+
+def measure(fn, repeat=7, number=1, items=1):
+    """
+    Seconds per item when each call of fn handles `items` items:
+    the median and spread of `repeat` runs of `number` calls
+    """
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        runs.append((time.perf_counter() - start) / number / items)
+    runs.sort()
+    return {"median": statistics.median(runs), "min": runs[0], "max": runs[-1],
+            "repeat": repeat, "number": number}
+
+
+def in_units(stats, unit, scale):
+    result = {key: stats[key] * scale for key in ("median", "min", "max")}
+    result.update(unit=unit, repeat=stats["repeat"], number=stats["number"])
+    return result
+
+
+def bench_wake(quick=False):
+    matcher = WakeMatcher(setting("TRIGGERS", DEFAULT_TRIGGERS))
+
+    def run():
+        for text in WAKE_TRANSCRIPTS:
+            matcher(text)
+
+    stats = measure(run, repeat=5 if quick else 9, number=200 if quick else 2000, items=len(WAKE_TRANSCRIPTS))
+    return in_units(stats, "us/transcript", 1e6)
+
+
+def bench_rms(quick=False):
+    block_size = setting("BLOCK_SIZE", 8000)
+    rng = np.random.default_rng(0)
+    block = (rng.standard_normal(block_size) * 3000).astype(np.int16).tobytes()
+    return in_units(measure(lambda: block_rms(block), repeat=5 if quick else 9,
+                            number=200 if quick else 2000), "us/block", 1e6)
+
+
+def fan_noise(samples, rate, rng):
+    """Broadband rumble plus mains hum harmonics, roughly what a fan or a TV in standby sounds like"""
+    white = rng.standard_normal(samples)
+    brown = np.cumsum(white)
+    brown -= np.convolve(brown, np.ones(256) / 256, mode="same")  # keep the random walk from drifting
+    t = np.arange(samples) / rate
+    hum = sum(np.sin(2 * np.pi * 50 * k * t) / k for k in (1, 2, 3, 4))
+    noise = brown / (np.std(brown) or 1.0) + 0.5 * white + 0.5 * hum
+    return noise / np.std(noise)
+
+
+def add_noise(pcm, noise, snr_db):
+    """int16 PCM with noise (a float array, repeated as needed) mixed in at snr_db"""
+    speech = np.frombuffer(pcm, dtype=np.int16).astype(np.float64)
+    noise = np.resize(noise, speech.size)
+    gain = np.sqrt(np.mean(speech ** 2) / (np.mean(noise ** 2) or 1.0)) / 10 ** (snr_db / 20)
+    return np.clip(speech + gain * noise, -32768, 32767).astype(np.int16).tobytes()
+
+
+def bench_noise(quick=False):
+    rate = setting("SAMPLE_RATE", 16000)
+    block_size = setting("BLOCK_SIZE", 8000)
+    rng = np.random.default_rng(0)
+    blocks = [(fan_noise(block_size, rate, rng) * 1000).astype(np.int16).tobytes() for _ in range(4)]
+    suppressor = NoiseSuppressor(gain_floor=setting("NOISE_GAIN_FLOOR", 0.1))
+
+    def run():
+        for block in blocks:
+            suppressor.process(block)
+
+    stats = measure(run, repeat=5 if quick else 9, number=5 if quick else 50)
+    return in_units(stats, "x real time", 1 / (len(blocks) * block_size / rate))
+
+
+def bench_resample(quick=False):
+    """48 kHz capture blocks resampled to SAMPLE_RATE; "44100" is the same for 44.1 kHz devices"""
+    rate = setting("SAMPLE_RATE", 16000)
+    block_sec = setting("BLOCK_SIZE", 8000) / rate
+    rng = np.random.default_rng(0)
+
+    def run_at(native):
+        resampler = PolyphaseResampler(native, rate)
+        blocks = [(rng.standard_normal(round(native * block_sec)) * 3000).astype(np.int16).tobytes()
+                  for _ in range(4)]
+
+        def run():
+            for block in blocks:
+                resampler.process(block)
+
+        stats = measure(run, repeat=5 if quick else 9, number=5 if quick else 50)
+        return in_units(stats, "x real time", 1 / (len(blocks) * block_sec))
+
+    result = run_at(48000)
+    result["44100"] = run_at(44100)["median"]
+    return result
+
+
+def cpu_jiffies():
+    """(busy, total) jiffies over all CPUs from /proc/stat, so PulseAudio and ALSA plugins count too"""
+    try:
+        with open("/proc/stat") as f:
+            fields = [int(value) for value in f.readline().split()[1:]]
+    except (OSError, ValueError):
+        return None
+    idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+    return sum(fields) - idle, sum(fields)
+
+
+def bench_capture(quick=False, seconds=None):
+    """
+    System CPU (% of one core) while capturing from the default microphone at its
+    native rate and resampling in-process; "alsa" is the same capture opened at
+    SAMPLE_RATE, leaving the conversion to ALSA's plug layer or PulseAudio
+    """
+    try:
+        import sounddevice as sd
+    except (ImportError, OSError) as e:
+        raise Skipped(f"sounddevice not available ({e})")
+    if cpu_jiffies() is None:
+        raise Skipped("no /proc/stat")
+    try:
+        native = int(sd.query_devices(kind="input")["default_samplerate"])
+    except (sd.PortAudioError, ValueError) as e:
+        raise Skipped(f"no input device ({e})")
+    rate = setting("SAMPLE_RATE", 16000)
+    block_sec = setting("BLOCK_SIZE", 8000) / rate
+    seconds = seconds or (2.0 if quick else 6.0)
+
+    def record(device_rate):
+        resampler = PolyphaseResampler(device_rate, rate) if device_rate != rate else None
+        received = []
+
+        def callback(indata, frames, time_info, status):
+            received.append(resampler.process(bytes(indata)) if resampler else bytes(indata))
+
+        stream = sd.RawInputStream(samplerate=device_rate, blocksize=round(device_rate * block_sec),
+                                   dtype="int16", channels=1, callback=callback)
+        with stream:
+            busy, total = cpu_jiffies()
+            time.sleep(seconds)
+            busy_after, total_after = cpu_jiffies()
+        cpu = (busy_after - busy) / max(total_after - total, 1) * (os.cpu_count() or 1) * 100
+        return {"cpu": cpu, "latency_ms": stream.latency * 1000,
+                "audio_sec": sum(len(block) for block in received) / 2 / rate}
+
+    try:
+        alsa = record(rate)
+    except sd.PortAudioError as e:
+        alsa = {"error": str(e)}
+    try:
+        runs = [record(native) for _ in range(1 if quick else 3)]
+    except sd.PortAudioError as e:
+        raise Skipped(f"cannot capture at {native} Hz ({e})")
+    cpus = sorted(run["cpu"] for run in runs)
+    native_latency = runs[0]["latency_ms"]
+    if "error" in alsa:
+        note = f"{native} Hz in-process; {rate} Hz capture failed: {alsa['error']}"
+    else:
+        note = (f"{native} Hz in-process, {native_latency:.0f} ms input latency; "
+                f"{rate} Hz via ALSA/Pulse {alsa['cpu']:.2f}% CPU, {alsa['latency_ms']:.0f} ms")
+    return {"median": statistics.median(cpus), "min": cpus[0], "max": cpus[-1], "unit": "% CPU",
+            "native_rate": native, "latency_ms": native_latency, "alsa": alsa,
+            "repeat": len(runs), "number": 1, "note": note}
+
+
+def word_errors(reference, hypothesis) -> int:
+    """Word-level edit distance"""
+    ref, hyp = reference.split(), hypothesis.split()
+    row = list(range(len(hyp) + 1))
+    for i, word in enumerate(ref, 1):
+        previous, row[0] = row[0], i
+        for j, other in enumerate(hyp, 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (word != other))
+    return row[-1]
+
+
+def espeak_pcm(text):
+    """(sample_rate, int16 PCM) rendered the way NEPTR speaks"""
+    if shutil.which("espeak-ng") is None:
+        raise Skipped("espeak-ng not installed")
+    result = subprocess.run(["espeak-ng", "--stdout", "-s", str(setting("VOICE_SPEED", 175)),
+                             "-p", str(setting("VOICE_PITCH", 35)), "-v", "en-us",
+                             "-g", str(setting("VOICE_GAP", 5)), text],
+                            capture_output=True, check=True)
+    with wave.open(io.BytesIO(result.stdout)) as wav:
+        return wav.getframerate(), wav.readframes(wav.getnframes())
+
+
+def load_clips(paths):
+    """Mono 16-bit WAV clips, or espeak-ng renderings of SPEECH_TEXTS if none were given"""
+    clips = []
+    for path in paths:
+        with wave.open(path) as wav:
+            if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+                raise ValueError(f"{path}: expected mono 16-bit PCM")
+            clips.append((wav.getframerate(), wav.readframes(wav.getnframes())))
+    return clips or [espeak_pcm(text) for text in SPEECH_TEXTS]
+
+
+def load_model():
+    try:
+        from vosk import KaldiRecognizer, Model, SetLogLevel
+    except ImportError:
+        raise Skipped("vosk not installed")
+    model_path = setting("MODEL_PATH", os.path.expanduser("~/models/vosk-model-small-en-us-0.15"))
+    if not os.path.isdir(model_path):
+        raise Skipped(f"no Vosk model at {model_path}")
+    SetLogLevel(-1)
+    return Model(model_path), KaldiRecognizer
+
+
+def bench_asr(quick=False, clips=()):
+    model, KaldiRecognizer = load_model()
+    clips = load_clips(clips)
+    block_bytes = setting("BLOCK_SIZE", 8000) * 2
+    audio_sec = sum(len(pcm) / 2 / rate for rate, pcm in clips)
+
+    def run():
+        for rate, pcm in clips:
+            recognizer = KaldiRecognizer(model, rate)
+            for i in range(0, len(pcm), block_bytes):
+                recognizer.AcceptWaveform(pcm[i:i + block_bytes])
+            recognizer.FinalResult()
+
+    result = in_units(measure(run, repeat=2 if quick else 5), "x real time", 1 / audio_sec)
+    result["audio_sec"] = audio_sec
+    return result
+
+
+def bench_noisy_asr(quick=False, clips=(), noise_wav=None, snr_db=5.0):
+    """Word error rate on noisy clips with noise suppression (lower is better); "raw" is without"""
+    model, KaldiRecognizer = load_model()
+    clips = load_clips(clips)
+    if noise_wav:
+        noise_rate, noise_pcm = load_clips([noise_wav])[0]
+        noise = np.frombuffer(noise_pcm, dtype=np.int16).astype(np.float64)
+    block_bytes = setting("BLOCK_SIZE", 8000) * 2
+
+    def transcribe(pcm, rate, suppressor=None):
+        recognizer = KaldiRecognizer(model, rate)
+        text = []
+        for i in range(0, len(pcm), block_bytes):
+            block = pcm[i:i + block_bytes]
+            if recognizer.AcceptWaveform(suppressor.process(block) if suppressor else block):
+                text.append(json.loads(recognizer.Result()).get("text", ""))
+        text.append(json.loads(recognizer.FinalResult()).get("text", ""))
+        return " ".join(part for part in text if part)
+
+    rng = np.random.default_rng(0)
+    words = raw_errors = suppressed_errors = 0
+    for rate, pcm in clips:
+        # The clean transcript is the reference, so any WAV works without a label
+        reference = transcribe(pcm, rate)
+        lead_in = bytes(rate)  # one second of room noise first, as when NEPTR is idle
+        clip_noise = noise if noise_wav and noise_rate == rate else fan_noise(len(pcm) // 2 + rate, rate, rng)
+        noisy = add_noise(lead_in + pcm, clip_noise, snr_db)
+        words += len(reference.split())
+        raw_errors += word_errors(reference, transcribe(noisy, rate))
+        suppressed_errors += word_errors(reference, transcribe(
+            noisy, rate, NoiseSuppressor(gain_floor=setting("NOISE_GAIN_FLOOR", 0.1))))
+    if not words:
+        raise Skipped("Vosk heard no words in the clean clips")
+    wer = suppressed_errors / words
+    return {"median": wer, "min": wer, "max": wer, "unit": "WER", "raw": raw_errors / words,
+            "snr_db": snr_db, "words": words, "repeat": 1, "number": 1,
+            "note": f"without suppression {raw_errors / words:.3f} at {snr_db:g} dB SNR"}
+
+
+def bench_intent(quick=False):
+    """handle_intent() end to end, with the bundled mock server standing in for the LLM"""
+    if config is None:
+        raise Skipped("config.py not found")
+    # neptr reads its settings at import time
+    config.LLM_BACKEND = "mock"
+    config.OPENAI_INTEGRATION = True
+    config.MOCK_LLM_LATENCY_SEC = 0.0
+    config.SEMANTIC_CACHE_ENABLED = False
+    config.API_RATE_LIMIT_SECONDS = 0
+    config.VISUAL_FEEDBACK = False
+    try:
+        import neptr
+    except (ImportError, OSError, SystemExit) as e:
+        raise Skipped(f"neptr not importable: {e}")
+
+    def run():
+        for command in INTENT_COMMANDS:
+            neptr.handle_intent(command)
+
+    stats = measure(run, repeat=3 if quick else 7, number=2 if quick else 10, items=len(INTENT_COMMANDS))
+    return in_units(stats, "ms/command", 1e3)
+
+
+def bench_tts(quick=False):
+    if shutil.which("espeak-ng") is None:
+        raise Skipped("espeak-ng not installed")
+    audio_sec = sum(len(pcm) / 2 / rate for rate, pcm in (espeak_pcm(text) for text in SPEECH_TEXTS))
+
+    def run():
+        for text in SPEECH_TEXTS:
+            espeak_pcm(text)
+
+    result = in_units(measure(run, repeat=3 if quick else 7), "x real time", 1 / audio_sec)
+    result["audio_sec"] = audio_sec
+    return result
+
+
+BENCHMARKS = {
+    "wake_match": bench_wake,
+    "vad_rms": bench_rms,
+    "noise_suppression": bench_noise,
+    "resample_polyphase": bench_resample,
+    "capture_native_vs_alsa": bench_capture,
+    "asr_accept_waveform": bench_asr,
+    "asr_noisy_wer": bench_noisy_asr,
+    "handle_intent_mock": bench_intent,
+    "tts_espeak": bench_tts,
+}
+
+
+def run_benchmarks(names=None, quick=False, clips=(), noise_wav=None) -> dict:
+    results = {}
+    for name in names or BENCHMARKS:
+        kwargs = {"clips": clips} if name == "asr_accept_waveform" else {}
+        if name == "asr_noisy_wer":
+            kwargs = {"clips": clips, "noise_wav": noise_wav}
+        try:
+            results[name] = BENCHMARKS[name](quick=quick, **kwargs)
+        except Skipped as e:
+            results[name] = {"skipped": str(e)}
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance=0.15) -> list:
+    """[(name, baseline median, current median, ratio, regressed)] for benchmarks run in both"""
+    rows = []
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name, {})
+        if "median" not in result or "median" not in before or not before["median"]:
+            continue
+        ratio = result["median"] / before["median"]
+        rows.append((name, before["median"], result["median"], ratio, ratio > 1 + tolerance))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark NEPTR's hot paths")
+    parser.add_argument("--only", action="append", choices=list(BENCHMARKS), help="run just this one (repeatable)")
+    parser.add_argument("--quick", action="store_true", help="fewer iterations")
+    parser.add_argument("--wav", action="append", default=[], help="mono 16-bit WAV clip for the ASR benchmarks")
+    parser.add_argument("--noise-wav", help="mono 16-bit recording of the noise to mix in for asr_noisy_wer")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", default="benchmark_baseline.json")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown before failing (0.15 = 15%%)")
+    args = parser.parse_args()
+
+    print("⏱️ NEPTR benchmarks")
+    print("=" * 40)
+    current = run_benchmarks(args.only, quick=args.quick, clips=args.wav, noise_wav=args.noise_wav)
+    for name, result in current["results"].items():
+        if "skipped" in result:
+            print(f"{name:>22}: skipped ({result['skipped']})")
+        else:
+            detail = result.get("note") or f"min {result['min']:.3f}, max {result['max']:.3f}"
+            print(f"{name:>22}: {result['median']:10.3f} {result['unit']} ({detail})")
+
+    with open(args.output, "w") as f:
+        json.dump(current, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"Saved as the baseline in {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline} (create one with --save-baseline)")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows = compare(current, baseline, args.tolerance)
+    print(f"\nAgainst the baseline from {baseline.get('created', '?')} ({baseline.get('machine', '?')}):")
+    for name, before, after, ratio, regressed in rows:
+        print(f"{'❌' if regressed else '✅'} {name:>22}: {before:.3f} -> {after:.3f} ({ratio - 1:+.0%})")
+    regressions = [row for row in rows if row[4]]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
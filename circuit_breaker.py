@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Circuit breaker for NEPTR's LLM backend
+Once the backend looks down, calls fail fast instead of each paying the full
+request timeout, and a background health probe detects recovery.
+"""
+
+import collections
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    closed    - requests flow normally; consecutive failures are counted
+    open      - requests are refused immediately; a probe runs in the background
+    half_open - one trial request at a time decides between closed and open
+    """
+
+    def __init__(self, name="llm", failure_threshold=3, reset_timeout=30.0,
+                 probe=None, probe_interval=10.0, clock=time.monotonic, log=print):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe = probe
+        self.probe_interval = probe_interval
+        self._clock = clock
+        self.log = log
+
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.transitions = collections.deque(maxlen=100)
+        self.listeners = []
+        self.rejected = 0
+
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._probe_thread = None
+
+    def _transition(self, new_state, reason):
+        # Called with the lock held
+        old_state = self.state
+        if old_state == new_state:
+            return
+        self.state = new_state
+        if new_state == OPEN:
+            self.opened_at = self._clock()
+        if new_state != HALF_OPEN:
+            self._trial_in_flight = False
+        event = (time.time(), old_state, new_state, reason)
+        self.transitions.append(event)
+        self.log(f"Circuit '{self.name}' {old_state} -> {new_state} ({reason})")
+        for listener in self.listeners:
+            try:
+                listener(*event)
+            except Exception:
+                pass
+
+    def allow_request(self) -> bool:
+        """True if a request may be sent now; must be followed by record_*() or release()"""
+        with self._lock:
+            if self.state == OPEN and self._clock() - self.opened_at >= self.reset_timeout:
+                self._transition(HALF_OPEN, "reset timeout elapsed")
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def release(self):
+        """The allowed request was never sent"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._transition(CLOSED, "request succeeded")
+
+    def record_failure(self, reason="request failed"):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN:
+                self._transition(OPEN, f"trial failed: {reason}")
+            elif self.state == CLOSED and self.failures >= self.failure_threshold:
+                self._transition(OPEN, f"{self.failures} consecutive failures: {reason}")
+
+    def start(self):
+        """Start the background health probe (only probes while open)"""
+        if self.probe is None or self._probe_thread is not None:
+            return
+        self._probe_thread = threading.Thread(target=self._probe_loop,
+                                              name=f"{self.name}-health-probe", daemon=True)
+        self._probe_thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _probe_loop(self):
+        while not self._stop.wait(self.probe_interval):
+            if self.state != OPEN:
+                continue
+            try:
+                healthy = self.probe()
+            except Exception:
+                healthy = False
+            if healthy:
+                with self._lock:
+                    if self.state == OPEN:
+                        self._transition(HALF_OPEN, "health probe succeeded")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "rejected": self.rejected,
+                "transitions": len(self.transitions),
+            }
@@ -9,11 +9,81 @@ import os
 # Speech recognition settings
 SAMPLE_RATE = 16000
 BLOCK_SIZE = 8000  # 0.5s chunks at 16kHz
+CAPTURE_NATIVE_RATE = True          # open microphones at their own rate (e.g. 48 kHz) and resample to SAMPLE_RATE in-process
 
 # Command listening parameters
 COMMAND_TIMEOUT_SEC = 12.0          # max time to wait for a command (increased for more natural conversation)
 SILENCE_WINDOW_MS = 2000            # stop if this much trailing silence (increased for more natural conversation)
-RMS_SILENCE_THRESHOLD = 250         # adjust if it cuts off/never stops
+RMS_SILENCE_THRESHOLD = 250         # adjust if it cuts off/never stops (only used without AUTOMATIC_GAIN_CONTROL)
+
+# Conversation timing
+BUFFER_FLUSH_SEC = 2.0              # answer after this much quiet following the last words heard
+CONVERSATION_TIMEOUT_SEC = 30.0     # go back to sleep after this much silence
+ECHO_GUARD_SEC = 2.0                # ignore the microphone this long after speaking (prevents self-hearing)
+CONVERSATION_TRACE = False          # print every state change with how late its timer fired
+
+# Processing pipeline: capture -> vad -> asr -> intent -> tts, joined by bounded queues.
+# Policies say what to shed when a queue is full: "drop_oldest", "drop_newest" or "block".
+# With "block", the intent queue only holds back final transcripts; partials are dropped and
+# replies never wait, so a busy room can't stall the answer sources or its own state machine.
+PIPELINE_QUEUE_SIZES = {"capture": 16, "asr": 16, "intent": 64, "tts": 4}
+PIPELINE_QUEUE_POLICIES = {"capture": "drop_oldest", "asr": "drop_oldest", "intent": "block", "tts": "block"}
+# Where each stage runs: "thread", "process" (forked worker) or "inline" (tts only;
+# vad always reads the capture queue). Recognition (asr) always runs on threads, on the room
+# scheduler below; "asr" is no longer accepted here (see Multiple Rooms in README.md).
+PIPELINE_STAGE_MODES = {"vad": "thread", "tts": "thread"}
+PIPELINE_REPORT_SEC = 300           # print queue/stage stats this often (0 = only at exit)
+
+# Multi-room: one entry per microphone. All rooms share one loaded Vosk model and each
+# gets its own conversation. "input"/"output" are sounddevice device names or indexes
+# (None = system default). List devices with: python3 -m sounddevice
+ROOMS = [
+    {"name": "default", "input": None, "output": None},
+    # {"name": "kitchen", "input": "USB PnP Sound Device", "output": None},
+    # {"name": "bedroom", "input": "satellite"},   # a satellite.py client streams this room over the network
+]
+ROOM_ASR_WORKERS = 0                # recognizer threads shared fairly by all rooms (0 = one per room, up to the CPU count)
+
+# Satellites (only listened for when a room's input is "satellite")
+SATELLITE_HOST = "0.0.0.0"          # interface to accept satellites on
+SATELLITE_PORT = 7700
+SATELLITE_COMPRESSION = True        # zlib-compress speech sent to satellites
+SATELLITE_PLAYOUT_DELAY_SEC = 0.3   # satellite jitter buffer delay, added to the listening pause after speaking
+
+# Headless API: answer typed or recorded (PCM) utterances over HTTP without a microphone.
+# Always on with `python3 neptr.py --headless`; load test it with load_test.py
+HEADLESS_API_ENABLED = False        # also serve the API while listening to microphones
+HEADLESS_API_HOST = "127.0.0.1"     # keep on localhost - the API has no authentication
+HEADLESS_API_PORT = 8765            # 0 = no TCP listener
+HEADLESS_API_SOCKET = ""            # Unix socket path, e.g. "/tmp/neptr.sock" ("" = none)
+HEADLESS_API_SESSIONS = 64          # conversation histories kept for API sessions
+
+# Latency tracking: timestamps every turn's stage boundaries (speech end, transcript, dispatch,
+# first LLM byte, reply, first TTS sample, playback end, listen resume) into histograms.
+# Printed at exit and served at GET /v1/latency on the headless API.
+LATENCY_TRACKING = True
+LATENCY_DUMP_FILE = ""              # also write the histograms as JSON here at exit ("" = don't)
+
+# Prometheus metrics: queue depths, callback overflows, Vosk real-time factor, wake
+# detections, API/LLM latency and status codes, cache hit rate, TTS time, RSS/CPU
+METRICS_ENABLED = False             # Serve GET /metrics
+METRICS_HOST = "127.0.0.1"          # Keep on localhost; there is no authentication
+METRICS_PORT = 9101                 # Port for the metrics endpoint
+
+# Timeline tracing: recent spans (audio blocks, Vosk decodes, state changes, answer
+# sources, TTS) kept in a ring buffer and written as Chrome trace JSON on request.
+# Open the file in chrome://tracing or ui.perfetto.dev.
+TRACE_ENABLED = False               # Record spans (no cost at all when off)
+TRACE_BUFFER_EVENTS = 50000         # Ring buffer size; the oldest events are overwritten
+TRACE_DUMP_SIGNAL = "SIGQUIT"       # kill -QUIT <pid> (or Ctrl+\) writes the trace ("" = off)
+TRACE_DUMP_FILE = "neptr-trace.json"  # Where the signal writes it; also at GET /v1/trace on the API
+
+# Sampling profiler for a unit that has started lagging, without restarting it:
+# kill -USR1 <pid> starts it, kill -USR2 <pid> stops it and writes collapsed stacks
+# (flamegraph.pl / speedscope.app). Also at /debug/profile/start|stop on the metrics port.
+PROFILE_SIGNALS = True              # Listen for SIGUSR1/SIGUSR2
+PROFILE_INTERVAL_MS = 10            # Time between stack samples
+PROFILE_OUTPUT = "neptr-profile.collapsed"  # Where stopping the profiler writes the stacks
 
 # Voice settings
 VOICE_SPEED = 175                   # Speech speed (words per minute)
@@ -109,6 +179,14 @@ NEPTR_JOKES = [
     "What do you call a robot that's good at math? A calculator!"
 ]
 
+# Spoken while a slow answer is still on its way
+NEPTR_FILLERS = [
+    "Hmm, let me think about that! Whirr!",
+    "Beep boop, computing! One moment!",
+    "My circuits are buzzing! Just a second!",
+    "Ooh, good question! Let me check my pie-brain!"
+]
+
 NEPTR_APOLOGIES = [
     "I'm sorry, I didn't catch that. Could you repeat it?",
     "I didn't quite understand. Can you say that again?",
@@ -132,11 +210,52 @@ WEATHER_FEATURES = False            # Enable/disable weather features
 # API SETTINGS
 # ============================================================================
 
+# AI backend: "openai" (needs OPENAI_API_KEY), "local" (any OpenAI-compatible server,
+# e.g. llama.cpp's server on the Pi or the LAN) or "mock" (bundled offline test server)
+LLM_BACKEND = "openai"
+LLM_BASE_URL = "http://localhost:8080/v1"  # Server URL for the "local" backend
+LOCAL_LLM_MODEL = "local-model"     # Model name sent to the "local" backend
+LLM_TIMEOUT_SEC = 10.0              # Request timeout in seconds
+LLM_STREAM = False                  # Stream replies (reports time to first byte)
+MOCK_LLM_PORT = 0                   # Port for the "mock" backend (0 = any free port)
+MOCK_LLM_LATENCY_SEC = 0.3          # Simulated thinking time of the mock backend
+MOCK_LLM_TOKEN_DELAY_SEC = 0.0      # Simulated delay between streamed chunks
+
 # OpenAI settings (optional)
 OPENAI_MODEL = "gpt-4o-mini"       # Model to use for responses (reliable and cost-effective)
 OPENAI_MAX_TOKENS = 1000            # Maximum response length (increased for GPT-5 nano with long system prompt)
 OPENAI_TEMPERATURE = 0.8            # Response creativity (0.0-1.0) - more creative
-API_RATE_LIMIT_SECONDS = 1.0        # Minimum seconds between API calls
+
+# Conversation history (recent turns are sent along so follow-up questions make sense)
+CONVERSATION_HISTORY_ENABLED = True # Send recent turns with each request
+CONVERSATION_TOKEN_BUDGET = 1200    # Approximate tokens of history kept (older turns are summarized)
+CONVERSATION_SUMMARY_TOKENS = 150   # Approximate tokens for the summary of older turns
+API_RATE_LIMIT_SECONDS = 1.0        # Average seconds between API calls
+API_RATE_LIMIT_BURST = 3            # Calls allowed back-to-back before the rate applies
+API_RATE_LIMIT_MAX_WAIT_SEC = 3.0   # Skip the API for a turn rather than queue longer than this
+
+# Circuit breaker (answer from fallbacks instantly while the API is unreachable)
+LLM_CIRCUIT_FAILURE_THRESHOLD = 2   # Consecutive failures (timeouts, 5xx) before the circuit opens
+LLM_CIRCUIT_RESET_SEC = 60.0        # Let a trial request through after this long even without a probe
+LLM_HEALTH_PROBE_INTERVAL_SEC = 15.0  # Background health check interval while the circuit is open
+LLM_HEALTH_PROBE_TIMEOUT_SEC = 3.0  # Timeout for each health check
+
+# Semantic answer cache (near-duplicate questions are answered without calling the API)
+SEMANTIC_CACHE_ENABLED = True       # Enable/disable the local answer cache (first questions only, never follow-ups)
+SEMANTIC_CACHE_THRESHOLD = 0.85     # Cosine similarity needed for a cache hit (0.0-1.0, higher = stricter)
+SEMANTIC_CACHE_SIZE = 256           # Maximum number of cached answers
+SEMANTIC_CACHE_TOP_K = 3            # Candidates checked per lookup
+SEMANTIC_CACHE_TTL_SEC = 3600       # Cached answers expire after this many seconds
+
+# Response latency budget (local answers, cache and OpenAI are raced)
+LOCAL_INTENTS_ENABLED = True        # Answer time/date questions locally without the API
+RESPONSE_DEADLINE_SEC = 6.0         # Every turn gets a reply (fallback if needed) within this bound
+RESPONSE_FILLER_AFTER_SEC = 2.5     # Speak a filler if no answer has arrived by then
+RESPONSE_HEDGE_DELAY_SEC = 0.05     # Head start for local/cached answers before calling the API
+
+# Speculative dispatch (start answering before the 2 second end-of-speech wait is over)
+SPECULATIVE_DISPATCH = True         # Enable/disable early answers on a stable transcript
+SPECULATION_STABLE_SEC = 0.5        # Transcript must be unchanged this long (lower = more aggressive, more wasted requests)
 
 # Weather API settings (optional)
 WEATHER_API_KEY = None              # Set your weather API key here
@@ -153,6 +272,24 @@ MODEL_PATH = os.path.expanduser("~/models/vosk-model-small-en-us-0.15")
 LOG_LEVEL = "INFO"                  # DEBUG, INFO, WARNING, ERROR
 LOG_TO_FILE = False                 # Enable/disable file logging
 LOG_FILE = "neptr.log"              # Log file name
+LOG_FORMAT = "text"                 # "text" or "json" (one object per line, for journald/Loki)
+LOG_MAX_BYTES = 5 * 1024 * 1024     # Rotate the log file at this size
+LOG_BACKUP_COUNT = 3                # Rotated files to keep
+LOG_QUEUE_SIZE = 10000              # Records waiting for the writer; more are dropped, never blocking
+
+# Low-memory mode for 2 GB Pis: caps every queue, cache and buffer (see memory_budget.py),
+# drops the model files from the page cache once loaded and enforces the memory budget -
+# while resident memory is over it, caches are shed and freed memory goes back to the OS
+LOW_MEMORY_MODE = False
+MEMORY_BUDGET_MB = 700              # RSS limit enforced in low-memory mode
+MEMORY_CHECK_SEC = 5.0              # How often the budget is checked
+MEMORY_REPORT_SEC = 600             # Print the memory breakdown this often (0 = only at startup)
+RECOGNIZER_POOL_IDLE = 2            # Reusable recognizers kept for one-off utterances (API, legacy listeners)
+
+# Hot reload: re-read this file without restarting (the model and audio streams stay loaded).
+# Thresholds, timings, voice, phrases and API limits change live; anything else needs a restart.
+CONFIG_RELOAD_SIGNAL = "SIGHUP"     # kill -HUP <pid> or systemctl reload neptr ("" = off)
+CONFIG_WATCH_SEC = 2.0              # Also reload when the file changes, checked this often (0 = off)
 
 # Performance settings
 USE_VIRTUAL_ENV = True              # Use virtual environment
@@ -182,9 +319,12 @@ WAKE_WORD_SENSITIVITY = 0.8         # Sensitivity for wake word (0.0-1.0)
 COMMAND_SENSITIVITY = 0.7           # Sensitivity for commands (0.0-1.0)
 
 # Audio processing
-NOISE_REDUCTION = True              # Enable noise reduction
+NOISE_REDUCTION = True              # Suppress steady background noise (fans, TVs) before recognition
+NOISE_GAIN_FLOOR = 0.1              # Least gain for noise-only frequencies (higher = gentler, fewer artifacts)
 ECHO_CANCELLATION = True            # Enable echo cancellation
-AUTOMATIC_GAIN_CONTROL = True       # Enable automatic gain control
+AUTOMATIC_GAIN_CONTROL = True       # Even out microphone levels and derive the silence threshold from the room's noise
+AGC_TARGET_RMS = 3000               # Loudness speech is brought to
+AGC_MAX_GAIN = 8.0                  # Most amplification for quiet microphones (8 = +18 dB)
 
 # Response customization
 RESPONSE_DELAY = 0.5                # Delay before responding (seconds)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Hot config reload for NEPTR
+config.py is re-read on SIGHUP or when the file changes. The new settings are
+validated against the running ones (same types, sane ranges), and only the
+ones that can change live are handed to apply() in one go; the Vosk model,
+audio streams, queues and listeners stay as they are. Settings that need a
+restart are reported and left alone.
+"""
+
+import os
+import runpy
+import threading
+import time
+
+# Settings read fresh on every use, or pushed into live objects by apply()
+RELOADABLE = {
+    "RMS_SILENCE_THRESHOLD", "SILENCE_WINDOW_MS", "COMMAND_TIMEOUT_SEC",
+    "BUFFER_FLUSH_SEC", "CONVERSATION_TIMEOUT_SEC", "ECHO_GUARD_SEC", "CONVERSATION_TRACE",
+    "VOICE_SPEED", "VOICE_PITCH", "VOICE_GAP", "AUDIO_FEEDBACK",
+    "TRIGGERS", "NEPTR_GREETINGS", "NEPTR_FILLERS", "NEPTR_APOLOGIES",
+    "OPENAI_MODEL", "LOCAL_LLM_MODEL", "OPENAI_MAX_TOKENS", "OPENAI_TEMPERATURE",
+    "CONVERSATION_TOKEN_BUDGET", "CONVERSATION_SUMMARY_TOKENS",
+    "API_RATE_LIMIT_SECONDS", "API_RATE_LIMIT_BURST", "API_RATE_LIMIT_MAX_WAIT_SEC",
+    "SEMANTIC_CACHE_THRESHOLD", "SEMANTIC_CACHE_TOP_K", "SEMANTIC_CACHE_TTL_SEC",
+    "LOCAL_INTENTS_ENABLED", "RESPONSE_DEADLINE_SEC", "RESPONSE_FILLER_AFTER_SEC",
+    "SPECULATION_STABLE_SEC", "LOG_LEVEL", "PIPELINE_REPORT_SEC", "MEMORY_REPORT_SEC",
+}
+
+# Lower and upper bounds (None = unbounded) checked before anything is applied
+RANGES = {
+    "RMS_SILENCE_THRESHOLD": (0, 32767),
+    "SILENCE_WINDOW_MS": (0, None),
+    "COMMAND_TIMEOUT_SEC": (0, None),
+    "BUFFER_FLUSH_SEC": (0, None),
+    "CONVERSATION_TIMEOUT_SEC": (0, None),
+    "ECHO_GUARD_SEC": (0, None),
+    "VOICE_SPEED": (80, 500),
+    "VOICE_PITCH": (0, 99),
+    "VOICE_GAP": (0, None),
+    "OPENAI_TEMPERATURE": (0.0, 2.0),
+    "API_RATE_LIMIT_SECONDS": (0, None),
+    "API_RATE_LIMIT_BURST": (1, None),
+    "SEMANTIC_CACHE_THRESHOLD": (0.0, 1.0),
+    "SEMANTIC_CACHE_TOP_K": (1, None),
+    "RESPONSE_DEADLINE_SEC": (0, None),
+    "RESPONSE_FILLER_AFTER_SEC": (0, None),
+}
+
+# Lists of phrases that must not end up empty (random.choice / the wake matcher need one)
+NON_EMPTY = {"TRIGGERS", "NEPTR_GREETINGS", "NEPTR_FILLERS"}
+
+
+class ConfigError(ValueError):
+    """The new config was rejected; nothing was applied"""
+
+
+def load_settings(path) -> dict:
+    """Run a config file in a fresh namespace and return its UPPERCASE settings"""
+    try:
+        namespace = runpy.run_path(path)
+    except Exception as e:
+        raise ConfigError(f"{os.path.basename(path)} failed to load: {e}") from e
+    return {name: value for name, value in namespace.items() if name.isupper()}
+
+
+def _same_type(new, old) -> bool:
+    if isinstance(old, bool) or isinstance(new, bool):
+        return isinstance(new, bool) and isinstance(old, bool)
+    if isinstance(old, (int, float)):
+        return isinstance(new, (int, float))
+    return old is None or new is None or isinstance(new, type(old))
+
+
+def validate(new: dict, current: dict) -> list:
+    """Problems with the new settings (empty if they can be applied)"""
+    errors = []
+    for name in sorted(RELOADABLE & new.keys()):
+        value = new[name]
+        if name in current and not _same_type(value, current[name]):
+            errors.append(f"{name} should be {type(current[name]).__name__}, got {type(value).__name__}")
+            continue
+        low, high = RANGES.get(name, (None, None))
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            if (low is not None and value < low) or (high is not None and value > high):
+                errors.append(f"{name} = {value} is outside {low}..{'' if high is None else high}")
+        if name in NON_EMPTY and (not isinstance(value, (list, tuple)) or not value
+                                  or not all(isinstance(item, str) and item for item in value)):
+            errors.append(f"{name} needs at least one non-empty phrase")
+    if "LOG_LEVEL" in new and str(new["LOG_LEVEL"]).upper() not in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"):
+        errors.append(f"LOG_LEVEL {new['LOG_LEVEL']!r} is not a logging level")
+    return errors
+
+
+def diff(new: dict, current: dict):
+    """(reloadable changes, names that changed but need a restart)"""
+    changed = {name: value for name, value in new.items() if name in current and current[name] != value}
+    live = {name: value for name, value in changed.items() if name in RELOADABLE}
+    return live, sorted(changed.keys() - live.keys())
+
+
+class ConfigReloader:
+    """
+    reload() reads `path`, validates it against current() and calls
+    apply(changes) with the changed reloadable settings. adjust(settings) may
+    rewrite the new settings first (e.g. the low-memory caps). watch() polls
+    the file's mtime; reload() is safe to call from a signal handler's thread.
+    """
+
+    def __init__(self, path, current, apply, adjust=None, log=print):
+        self.path = path
+        self.current = current
+        self.apply = apply
+        self.adjust = adjust
+        self.log = log
+        self.reloads = 0
+        self.rejected = 0
+        self.last_duration_ms = None
+        self._lock = threading.Lock()
+        self._mtime = self._stat()
+
+    def _stat(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def reload(self) -> dict:
+        """Apply the file's reloadable changes; returns them ({} if none or rejected)"""
+        with self._lock:
+            started = time.perf_counter()
+            self._mtime = self._stat()
+            try:
+                new = load_settings(self.path)
+                if self.adjust is not None:
+                    new.update(self.adjust(new))
+                current = self.current()
+                errors = validate(new, current)
+                if errors:
+                    raise ConfigError("; ".join(errors))
+            except ConfigError as e:
+                self.rejected += 1
+                self.log(f"Config not reloaded, keeping the running settings: {e}")
+                return {}
+            live, restart = diff(new, current)
+            if live:
+                self.apply(live)
+            self.reloads += 1
+            self.last_duration_ms = (time.perf_counter() - started) * 1000
+        if restart:
+            self.log(f"Restart NEPTR to apply: {', '.join(restart)}")
+        summary = ", ".join(sorted(live)) if live else "no changes"
+        self.log(f"Config reloaded in {self.last_duration_ms:.1f} ms ({summary})")
+        return live
+
+    def changed(self) -> bool:
+        mtime = self._stat()
+        return mtime is not None and mtime != self._mtime
+
+    def watch(self, stop, interval=2.0):
+        """Reload whenever the file's mtime changes, until stop is set"""
+        while not stop.wait(interval):
+            if self.changed():
+                self.reload()
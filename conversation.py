@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Event-driven conversation state machine for NEPTR
+
+    idle --wake word--> wake --greeting--> speaking --echo guard--> listening
+    listening --2s quiet--> thinking --answer--> speaking --echo guard--> listening
+    listening --goodbye / 30s silence--> speaking --echo guard--> idle
+
+Everything that used to be a global flag re-checked on every audio block
+(is_listening, in_conversation, speaking_until, conversation_buffer, ...)
+is either the current state or a named timer that fires exactly when due.
+"""
+
+import collections
+import heapq
+import itertools
+import queue
+import random
+import re
+import threading
+import time
+
+IDLE = "idle"
+WAKE = "wake"
+LISTENING = "listening"
+THINKING = "thinking"
+SPEAKING = "speaking"
+
+# Events
+Transcript = collections.namedtuple("Transcript", "text final")
+SpeechFinished = collections.namedtuple("SpeechFinished", "")
+ReplyReady = collections.namedtuple("ReplyReady", "turn reply source")
+TimerFired = collections.namedtuple("TimerFired", "name due")
+Stop = collections.namedtuple("Stop", "")
+Reconfigure = collections.namedtuple("Reconfigure", "settings")  # {attribute: value}, e.g. after a config reload
+
+# Attributes a Reconfigure event may replace; timers already running keep their deadlines
+RECONFIGURABLE = ("wake_matcher", "lines", "flush_sec", "timeout_sec", "echo_guard_sec",
+                  "filler_after_sec", "deadline_sec", "trace_log")
+
+# Ends the conversation when heard while listening
+GOODBYE_PAT = re.compile(r"\b(goodbye|bye|see.*you|farewell|exit|quit|stop|end.*conversation|that.*all|done|finished)\b")
+
+# One traced state change; lateness is how long after its due time a timer fired
+Transition = collections.namedtuple("Transition", "at old new cause lateness")
+
+
+class TimerQueue:
+    """Named one-shot timers; rescheduling a name replaces its previous deadline"""
+
+    def __init__(self):
+        self._heap = []
+        self._active = {}
+        self._seq = itertools.count()
+
+    def schedule(self, name, due):
+        seq = next(self._seq)
+        self._active[name] = seq
+        heapq.heappush(self._heap, (due, seq, name))
+
+    def cancel(self, name):
+        self._active.pop(name, None)
+
+    def _drop_stale(self):
+        while self._heap and self._active.get(self._heap[0][2]) != self._heap[0][1]:
+            heapq.heappop(self._heap)
+
+    def next_due(self):
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now):
+        """Remove and return (name, due) for every timer due at or before now"""
+        fired = []
+        self._drop_stale()
+        while self._heap and self._heap[0][0] <= now:
+            due, seq, name = heapq.heappop(self._heap)
+            if self._active.get(name) == seq:
+                del self._active[name]
+                fired.append((name, due))
+            self._drop_stale()
+        return fired
+
+    def __contains__(self, name):
+        return name in self._active
+
+
+class ConversationMachine:
+    """
+    speak(text) must start speaking and post SpeechFinished() when done.
+    submit(command) returns a concurrent future resolving to (source, reply) or None.
+    clock and rng can be replaced for deterministic simulations.
+    """
+
+    def __init__(self, speak, submit, wake_matcher, goodbye_pat, lines, fallback,
+                 clock=time.monotonic, flush_sec=2.0, timeout_sec=30.0, echo_guard_sec=2.0,
+                 filler_after_sec=2.5, deadline_sec=6.0, speculator=None, drain=None,
+                 on_session_start=None, on_reply=None, log=print, trace_log=False, trace_size=256,
+                 inbox=None, rng=random):
+        self.speak = speak
+        self.submit = submit
+        self.wake_matcher = wake_matcher
+        self.goodbye_pat = goodbye_pat
+        self.lines = lines
+        self.fallback = fallback
+        self.clock = clock
+        self.rng = rng
+        self.flush_sec = flush_sec
+        self.timeout_sec = timeout_sec
+        self.echo_guard_sec = echo_guard_sec
+        self.filler_after_sec = filler_after_sec
+        self.deadline_sec = deadline_sec
+        self.speculator = speculator
+        self.drain = drain
+        self.on_session_start = on_session_start
+        self.on_reply = on_reply
+        self.log = log
+        self.trace_log = trace_log
+
+        self.state = IDLE
+        self.buffer = ""
+        self.timers = TimerQueue()
+        self.inbox = inbox if inbox is not None else queue.Queue()
+        self._overflow = collections.deque()  # the machine's own events that didn't fit in the inbox
+        self.trace = collections.deque(maxlen=trace_size)
+        self.listeners = []
+        self.counters = collections.Counter()
+
+        self._after_speaking = IDLE
+        self._turn = 0
+        self._future = None
+        self._command = ""
+        self._pending_reply = None
+
+    # -----------------------------
+    # Driving the machine
+    # -----------------------------
+    @property
+    def accepting_audio(self) -> bool:
+        """Audio is only recognized while nobody is speaking or thinking"""
+        return self.state in (IDLE, LISTENING)
+
+    def post(self, event):
+        """
+        Queue an event from any thread. Only final transcripts wait for room in a
+        full inbox; partials are dropped (the next one supersedes them), and the
+        machine's own events (replies, speech finished, ...) overflow into a side
+        list, so reply callbacks and the machine itself can never block here.
+        """
+        if isinstance(event, Transcript) and event.final:
+            self.inbox.put(event)
+            return
+        try:
+            accepted = self.inbox.put(event, block=False) is not False
+        except queue.Full:
+            accepted = False
+        if not accepted and not isinstance(event, Transcript):
+            self._overflow.append(event)
+
+    def time_until_next_timer(self):
+        due = self.timers.next_due()
+        return None if due is None else max(0.0, due - self.clock())
+
+    def run_due_timers(self):
+        for name, due in self.timers.pop_due(self.clock()):
+            self.dispatch(TimerFired(name, due))
+
+    def run(self, stop_event: threading.Event, poll_sec=0.5):
+        """Process events and timers until stop_event is set or Stop() is posted"""
+        while not stop_event.is_set():
+            self.run_due_timers()
+            wait = self.time_until_next_timer()
+            if self._overflow:
+                event = self._overflow.popleft()
+            else:
+                try:
+                    event = self.inbox.get(timeout=poll_sec if wait is None else min(wait, poll_sec))
+                except queue.Empty:
+                    continue
+            if isinstance(event, Stop):
+                break
+            self.dispatch(event)
+
+    def dispatch(self, event):
+        if isinstance(event, Transcript):
+            if event.final:
+                self._on_transcript(event.text.lower().strip())
+            else:
+                self._on_partial(event.text.lower().strip())
+        elif isinstance(event, SpeechFinished):
+            self._on_speech_finished()
+        elif isinstance(event, ReplyReady):
+            self._on_reply_ready(event)
+        elif isinstance(event, TimerFired):
+            handler = getattr(self, f"_on_{event.name}_timer")
+            handler(event.due)
+        elif isinstance(event, Reconfigure):
+            # Applied between events on the machine's own thread, so a turn never sees a mix
+            for name, value in event.settings.items():
+                if name in RECONFIGURABLE:
+                    setattr(self, name, value)
+
+    # -----------------------------
+    # Transitions
+    # -----------------------------
+    def _transition(self, new_state, cause, due=None):
+        now = self.clock()
+        record = Transition(now, self.state, new_state, cause, now - due if due is not None else 0.0)
+        self.state = new_state
+        self.trace.append(record)
+        if self.trace_log:
+            self.log(f"{record.old} -> {record.new} ({cause}, {record.lateness * 1000:.1f} ms late)")
+        for listener in self.listeners:
+            listener(record)
+
+    def _say(self, text, then, cause, due=None):
+        """Speak text, then move to `then` once the echo guard has passed"""
+        if self.state != SPEAKING:
+            self._transition(SPEAKING, cause, due)
+            self.log("🔇 Listening paused while speaking...")
+        self._after_speaking = then
+        self.timers.cancel("echo_guard")
+        self.speak(text)
+
+    def _start_session(self):
+        self._transition(WAKE, "wake word")
+        self.buffer = ""
+        if self.on_session_start:
+            self.on_session_start()
+        self.log("Wake word detected! Starting conversation mode...")
+        self._say(self.rng.choice(self.lines["greeting"]), LISTENING, "greeting")
+        self.log("I'm now in continuous conversation mode! Just talk naturally - I'll listen to everything you say!")
+        self.log("Say 'goodbye' to end our conversation or I'll go to sleep after 30 seconds of silence.")
+
+    def _end_session(self, message, cause, due=None):
+        self.timers.cancel("flush")
+        self.timers.cancel("timeout")
+        self.buffer = ""
+        if self.speculator:
+            self.speculator.discard()
+        reply = self.rng.choice(self.lines[cause])
+        self.log(f"Reply: {reply}")
+        self._say(reply, IDLE, cause, due)
+        self.log(message)
+
+    def _handle_command(self, due):
+        command, self.buffer = self.buffer, ""
+        speculative = self.speculator.take(command) if self.speculator else None
+
+        if self.goodbye_pat.search(command):
+            if speculative:
+                speculative.cancel()
+            self._end_session("Conversation ended. Say 'Hello Neptr' to start a new conversation.",
+                              "goodbye", due)
+            return
+
+        self.log(f"Command: '{command}'")
+        self.timers.cancel("timeout")
+        self._turn += 1
+        self._command = command
+        self._pending_reply = None
+        self._transition(THINKING, "end of utterance", due)
+
+        turn = self._turn
+        future = self._future = speculative or self.submit(command)
+        future.add_done_callback(lambda f: self._post_reply(turn, f))
+        now = self.clock()
+        self.timers.schedule("filler", now + self.filler_after_sec)
+        self.timers.schedule("deadline", now + self.deadline_sec)
+
+    def _post_reply(self, turn, future):
+        if future.cancelled():
+            return
+        try:
+            result = future.result()
+        except Exception:
+            result = None
+        source, reply = result if result else ("fallback", self.fallback())
+        self.post(ReplyReady(turn, reply, source))
+
+    def _answer(self, reply, source, cause, due=None):
+        self.timers.cancel("filler")
+        self.timers.cancel("deadline")
+        if self.on_reply:
+            self.on_reply(self._command, reply, source)
+        self.log(f"Reply: {reply}")
+        self._say(reply, LISTENING, cause, due)
+
+    # -----------------------------
+    # Event handlers
+    # -----------------------------
+    def _on_transcript(self, text):
+        if not text:
+            return
+        if self.state == IDLE:
+            self.log(f"Heard: '{text}'")
+            if self.wake_matcher(text):
+                self.counters["wake_detections"] += 1
+                self._start_session()
+            elif getattr(self.wake_matcher, "near_miss", None) and self.wake_matcher.near_miss(text):
+                self.counters["wake_suppressed"] += 1
+        elif self.state == LISTENING:
+            self.log(f"Heard: '{text}'")
+            self.buffer = f"{self.buffer} {text}" if self.buffer else text
+            now = self.clock()
+            self.timers.schedule("flush", now + self.flush_sec)
+            self.timers.schedule("timeout", now + self.timeout_sec)
+
+    def _on_partial(self, text):
+        # Start answering early once the transcript stops changing
+        if self.state != LISTENING or not self.speculator:
+            return
+        candidate = f"{self.buffer} {text}".strip()
+        if not self.goodbye_pat.search(candidate):
+            self.speculator.observe(candidate)
+
+    def _on_speech_finished(self):
+        if self.state == SPEAKING:
+            # Keep ignoring audio a little longer so NEPTR doesn't hear itself
+            self.timers.schedule("echo_guard", self.clock() + self.echo_guard_sec)
+
+    def _on_reply_ready(self, event):
+        if event.turn != self._turn:
+            return  # a late answer for a turn that already got the fallback
+        if self.state == THINKING:
+            self._answer(event.reply, event.source, "answer")
+        elif self.state == SPEAKING and self._after_speaking == THINKING and self._pending_reply is None:
+            self._pending_reply = (event.reply, event.source)  # said after the filler
+
+    def _on_flush_timer(self, due):
+        if self.state == LISTENING and self.buffer:
+            self._handle_command(due)
+
+    def _on_timeout_timer(self, due):
+        if self.state == LISTENING:
+            self._end_session("Conversation timed out. Say 'Hello Neptr' to start a new conversation.",
+                              "timeout", due)
+
+    def _on_filler_timer(self, due):
+        if self.state == THINKING:
+            self._say(self.rng.choice(self.lines["filler"]), THINKING, "filler", due)
+
+    def _on_deadline_timer(self, due):
+        self._turn += 1  # anything still running for this turn is now late
+        if self._future is not None:
+            self._future.cancel()  # stop racing the sources that haven't answered
+        if self.state == THINKING:
+            self.log(f"No answer within {self.deadline_sec:.1f}s, using fallback")
+            self._answer(self.fallback(), "fallback", "deadline", due)
+        elif self.state == SPEAKING and self._pending_reply is None:
+            self._pending_reply = (self.fallback(), "fallback")
+
+    def _on_echo_guard_timer(self, due):
+        if self.state != SPEAKING:
+            return
+        if self.drain:
+            self.drain()
+        after = self._after_speaking
+        if after == THINKING:
+            self._transition(THINKING, "filler spoken", due)
+            if self._pending_reply:
+                reply, source = self._pending_reply
+                self._pending_reply = None
+                self._answer(reply, source, "answer after filler")
+            return
+
+        self._transition(after, "echo guard passed", due)
+        self.log("🎤 Listening resumed")
+        if after == LISTENING:
+            # NEPTR just spoke, so the silence timeout starts over
+            self.timers.schedule("timeout", self.clock() + self.timeout_sec)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Conversation history for NEPTR's LLM requests
+Keeps the system prompt as a stable prefix and packs as many recent turns as
+fit a token budget; older turns are folded into a short local summary.
+"""
+
+import collections
+import threading
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for English)"""
+    return (len(text) + 3) // 4 + 1
+
+
+def _gist(text: str, max_words: int = 12) -> str:
+    words = text.split()
+    gist = " ".join(words[:max_words])
+    return gist + "..." if len(words) > max_words else gist
+
+
+class ConversationContext:
+    """Sliding window of recent turns for one conversation session"""
+
+    def __init__(self, system_prompt: str, token_budget=1200, summary_tokens=150, name="default"):
+        self.name = name
+        # The same message object is sent first on every request so the prefix
+        # stays byte-identical and can be reused by the backend's prompt cache.
+        self.system_message = {"role": "system", "content": system_prompt}
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+
+        self.turns = collections.deque()  # (user, assistant, tokens)
+        self.summary = collections.deque()  # gists of evicted turns
+        self.history_tokens = 0
+        self.evicted_turns = 0
+        self.last_turn_stats = {}
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Start a new session"""
+        with self._lock:
+            self.turns.clear()
+            self.summary.clear()
+            self.history_tokens = 0
+
+    @property
+    def has_history(self) -> bool:
+        """True once a turn has been answered in this session"""
+        return bool(self.turns or self.summary)
+
+    def _summary_text(self):
+        if not self.summary:
+            return ""
+        return "Earlier in this conversation: " + " ".join(self.summary)
+
+    def messages_for(self, user_text: str) -> list:
+        """Messages for a request: system prompt, summary, recent turns, then the new utterance"""
+        with self._lock:
+            messages = [self.system_message]
+            summary = self._summary_text()
+            if summary:
+                messages.append({"role": "system", "content": summary})
+            for user, assistant, _ in self.turns:
+                messages.append({"role": "user", "content": user})
+                messages.append({"role": "assistant", "content": assistant})
+        messages.append({"role": "user", "content": user_text})
+        return messages
+
+    def add_turn(self, user_text: str, reply: str):
+        """Record an answered turn and evict the oldest ones beyond the budget"""
+        tokens = estimate_tokens(user_text) + estimate_tokens(reply)
+        with self._lock:
+            self.turns.append((user_text, reply, tokens))
+            self.history_tokens += tokens
+
+            while self.turns and self.history_tokens > self.token_budget:
+                user, assistant, old_tokens = self.turns.popleft()
+                self.history_tokens -= old_tokens
+                self.evicted_turns += 1
+                self.summary.append(f"User said '{_gist(user)}' and you replied '{_gist(assistant, 8)}'.")
+                while self.summary and estimate_tokens(" ".join(self.summary)) > self.summary_tokens:
+                    self.summary.popleft()
+
+    def record_request(self, payload_bytes: int, latency_ms: float, cached_tokens=None):
+        """Remember size and latency of the last request for reporting"""
+        self.last_turn_stats = {
+            "payload_bytes": payload_bytes,
+            "latency_ms": latency_ms,
+            "history_turns": len(self.turns),
+            "history_tokens": self.history_tokens,
+            "cached_prompt_tokens": cached_tokens,
+        }
+        return self.last_turn_stats
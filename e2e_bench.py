@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+End-to-end latency benchmark: "user stops talking -> NEPTR starts talking"
+espeak-ng renders wake phrases and commands to WAV, and a virtual microphone
+streams them into a running NEPTR over the satellite protocol, in real time
+with silence in between, exactly like a satellite room. Replies are "heard"
+when their first audio comes out of the satellite's jitter buffer. Filler
+lines ("let me think...") are announced as such and timed separately, so a
+slow answer is still matched to its command.
+
+Run NEPTR with a satellite room for the benchmark and the mock LLM, e.g. in
+config.py:
+
+    ROOMS = [{"name": "default", "input": None, "output": None},
+             {"name": "bench", "input": "satellite"}]
+    LLM_BACKEND = "mock"
+
+then:
+
+    python3 e2e_bench.py --runs 200 --history e2e_history.jsonl
+
+Each run wakes NEPTR, asks one command and says goodbye; every few runs a
+sentence without the wake word checks for false wakes.
+"""
+
+import argparse
+import json
+import os
+import queue
+import re
+import shutil
+import subprocess
+import threading
+import time
+import wave
+
+from audio_dsp import block_rms, resample_linear
+from load_test import percentile
+from satellite import SatelliteClient
+
+WAKE_PHRASES = ["hello neptr", "hey neptr", "hi neptr"]
+COMMANDS = [
+    "what time is it",
+    "what is your favorite pie",
+    "tell me about the candy kingdom",
+    "why is the sky blue",
+    "who is finn the human",
+]
+GOODBYES = ["goodbye"]
+DISTRACTORS = ["i think it might rain later today", "pass me the salt please"]
+
+# Voices and speeds the corpus is rendered with, for some variety
+VOICES = [("en-us", 160), ("en-us", 190), ("en", 175)]
+
+
+def _slug(text):
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_")
+
+
+def render_corpus(directory, texts, voices=VOICES):
+    """espeak-ng renders each text with each voice to WAV (cached); returns {text: [paths]}"""
+    if shutil.which("espeak-ng") is None:
+        raise RuntimeError("espeak-ng is needed to render the corpus")
+    os.makedirs(directory, exist_ok=True)
+    corpus = {}
+    for text in texts:
+        for voice, speed in voices:
+            path = os.path.join(directory, f"{_slug(text)}-{voice}-{speed}.wav")
+            if not os.path.exists(path):
+                subprocess.run(["espeak-ng", "-v", voice, "-s", str(speed), "-w", path, text], check=True)
+            corpus.setdefault(text, []).append(path)
+    return corpus
+
+
+def load_clip(path, sample_rate):
+    """Mono int16 PCM at sample_rate, with leading and trailing silence trimmed"""
+    with wave.open(path) as wav:
+        pcm = resample_linear(wav.readframes(wav.getnframes()), wav.getframerate(), sample_rate)
+    return trim_silence(pcm, sample_rate)
+
+
+def trim_silence(pcm, sample_rate, threshold=200, window_ms=10):
+    step = int(sample_rate * window_ms / 1000) * 2
+    windows = [i for i in range(0, len(pcm), step) if block_rms(pcm[i:i + step]) > threshold]
+    if not windows:
+        return b""
+    return pcm[windows[0]:windows[-1] + step]
+
+
+class VirtualMicrophone:
+    """
+    A satellite that "hears" PCM from say() and silence otherwise, sent in
+    real-time frames, and timestamps the start of every reply it plays
+    (filler lines in filler_starts, everything else in reply_starts).
+    """
+
+    def __init__(self, host, port, room, sample_rate=16000, frame_ms=100, jitter_frames=3):
+        self.sample_rate = sample_rate
+        self.frame_bytes = sample_rate * frame_ms // 1000 * 2
+        self.frame_sec = frame_ms / 1000
+        self.reply_starts = []
+        self.filler_starts = []
+        self._seen = 0
+        self._frames = queue.Queue()
+        self._stop = threading.Event()
+        self._lock = threading.Condition()
+        self.client = SatelliteClient(host, port, room, sample_rate=sample_rate, frame_ms=frame_ms,
+                                      jitter_frames=jitter_frames, on_audio=self._on_audio)
+
+    def start(self):
+        self.client.connect()
+        self._thread = threading.Thread(target=self._send_loop, name="virtual-mic", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        self.client.close()
+
+    def _send_loop(self):
+        silence = bytes(self.frame_bytes)
+        next_tick = time.monotonic()
+        while not self._stop.is_set() and not self.client.closed:
+            next_tick += self.frame_sec
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                frame, done = self._frames.get_nowait()
+            except queue.Empty:
+                frame, done = silence, None
+            if self.client.closed:
+                break
+            self.client.send_audio(frame)
+            if done is not None:
+                done.append(time.monotonic())
+
+    def _on_audio(self, pcm, sample_rate):
+        with self._lock:
+            if self.client.speech_started > self._seen:
+                self._seen = self.client.speech_started
+                starts = self.filler_starts if self.client.speech_info.get("filler") else self.reply_starts
+                starts.append(time.monotonic())
+                self._lock.notify_all()
+
+    def say(self, pcm) -> float:
+        """Stream pcm as if spoken now; returns when its last frame was sent (the end of speech)"""
+        done = []
+        frames = [pcm[i:i + self.frame_bytes] for i in range(0, len(pcm), self.frame_bytes)]
+        for i, frame in enumerate(frames):
+            frame = frame.ljust(self.frame_bytes, b"\0")
+            self._frames.put((frame, done if i == len(frames) - 1 else None))
+        while not done:
+            if self.client.closed:
+                raise ConnectionError("NEPTR closed the connection")
+            time.sleep(0.005)
+        return done[0]
+
+    def wait_reply(self, count, timeout):
+        """Wait for reply number `count` to start playing; returns when it did, or None"""
+        with self._lock:
+            self._lock.wait_for(lambda: len(self.reply_starts) >= count, timeout)
+            return self.reply_starts[count - 1] if len(self.reply_starts) >= count else None
+
+    def wait_quiet(self, guard_sec, timeout=60.0):
+        """Wait for NEPTR to finish speaking, then for its echo guard to pass"""
+        deadline = time.monotonic() + timeout
+        client = self.client
+        while time.monotonic() < deadline:
+            if client.jitter.drained >= client.speech_started and client.jitter.depth() == 0:
+                break
+            time.sleep(0.02)
+        time.sleep(guard_sec)
+
+
+def run_once(mic, wake, command, goodbye, timeout=15.0, guard_sec=2.5) -> dict:
+    """
+    Wake NEPTR, ask one command, say goodbye; latencies in ms. Replies are
+    counted from this run's start; a run that heard more replies than it
+    asked for is flagged with extra_replies.
+    """
+    result = {"wake": False, "answered": False}
+    replies, fillers = len(mic.reply_starts), len(mic.filler_starts)
+
+    spoke_at = mic.say(wake)
+    heard_at = mic.wait_reply(replies + 1, timeout)
+    if heard_at is None:
+        return result
+    result.update(wake=True, wake_ms=(heard_at - spoke_at) * 1000)
+    mic.wait_quiet(guard_sec)
+
+    spoke_at = mic.say(command)
+    heard_at = mic.wait_reply(replies + 2, timeout)
+    if len(mic.filler_starts) > fillers:
+        result["filler_ms"] = (mic.filler_starts[fillers] - spoke_at) * 1000
+    if heard_at is not None:
+        result.update(answered=True, response_ms=(heard_at - spoke_at) * 1000)
+        mic.wait_quiet(guard_sec)
+
+    expected = len(mic.reply_starts) + 1
+    mic.say(goodbye)
+    if mic.wait_reply(expected, timeout) is not None:
+        mic.wait_quiet(guard_sec)
+    extra = len(mic.reply_starts) - expected
+    if extra > 0:
+        result["extra_replies"] = extra
+    return result
+
+
+def check_false_wake(mic, distractor, listen_sec=5.0) -> bool:
+    """True if NEPTR answered a sentence without the wake word"""
+    replies = len(mic.reply_starts)
+    mic.say(distractor)
+    woke = mic.wait_reply(replies + 1, listen_sec) is not None
+    if woke:
+        mic.wait_quiet(2.5)
+    return woke
+
+
+def distribution(values) -> dict:
+    values = sorted(values)
+    if not values:
+        return {"count": 0}
+    return {"count": len(values), "mean": sum(values) / len(values), "p50": percentile(values, 50),
+            "p90": percentile(values, 90), "p99": percentile(values, 99),
+            "min": values[0], "max": values[-1]}
+
+
+def summarize(runs, false_wake_checks) -> dict:
+    woke = [r for r in runs if r["wake"]]
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "runs": len(runs),
+        "wake_accuracy": len(woke) / len(runs) if runs else 0.0,
+        "answer_rate": sum(r["answered"] for r in woke) / len(woke) if woke else 0.0,
+        "false_wake_rate": sum(false_wake_checks) / len(false_wake_checks) if false_wake_checks else 0.0,
+        "response_ms": distribution([r["response_ms"] for r in runs if r["answered"]]),
+        "wake_ms": distribution([r["wake_ms"] for r in woke]),
+        "filler_ms": distribution([r["filler_ms"] for r in runs if "filler_ms" in r]),
+        "extra_reply_runs": sum(1 for r in runs if r.get("extra_replies")),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end latency benchmark over a satellite room")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7700)
+    parser.add_argument("--room", default="bench", help="satellite room name in NEPTR's ROOMS")
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--false-wake-every", type=int, default=5, help="try a distractor every N runs (0 = never)")
+    parser.add_argument("--corpus", default="e2e_corpus", help="where the rendered WAVs are cached")
+    parser.add_argument("--rate", type=int, default=16000)
+    parser.add_argument("--guard-sec", type=float, default=2.5, help="wait after each reply (>= ECHO_GUARD_SEC)")
+    parser.add_argument("--output", default="e2e_results.json")
+    parser.add_argument("--history", default=None, help="append the summary to this JSONL file")
+    args = parser.parse_args()
+
+    corpus = render_corpus(args.corpus, WAKE_PHRASES + COMMANDS + GOODBYES + DISTRACTORS)
+    clips = {text: [load_clip(path, args.rate) for path in paths] for text, paths in corpus.items()}
+
+    def pick(texts, i):
+        variants = [clip for text in texts for clip in clips[text]]
+        return variants[i % len(variants)]
+
+    print("🎙️ NEPTR end-to-end latency benchmark")
+    print("=" * 40)
+    mic = VirtualMicrophone(args.host, args.port, args.room, sample_rate=args.rate).start()
+    runs, false_wakes = [], []
+    try:
+        time.sleep(1.0)  # let NEPTR register the room
+        for i in range(args.runs):
+            result = run_once(mic, pick(WAKE_PHRASES, i), pick(COMMANDS, i), pick(GOODBYES, i),
+                              guard_sec=args.guard_sec)
+            runs.append(result)
+            status = f"{result['response_ms']:.0f} ms" if result["answered"] else (
+                "no answer" if result["wake"] else "did not wake")
+            if "filler_ms" in result:
+                status += f" (filler after {result['filler_ms']:.0f} ms)"
+            if result.get("extra_replies"):
+                status += f" ({result['extra_replies']} unexpected replies)"
+            print(f"run {i + 1}/{args.runs}: {status}")
+            if args.false_wake_every and (i + 1) % args.false_wake_every == 0:
+                false_wakes.append(check_false_wake(mic, pick(DISTRACTORS, i)))
+    except KeyboardInterrupt:
+        print("Interrupted - summarizing the runs so far")
+    finally:
+        mic.close()
+
+    summary = summarize(runs, false_wakes)
+    with open(args.output, "w") as f:
+        json.dump({"summary": summary, "runs": runs}, f, indent=2)
+    if args.history:
+        with open(args.history, "a") as f:
+            f.write(json.dumps(summary) + "\n")
+
+    r = summary["response_ms"]
+    print(f"\nWake accuracy: {summary['wake_accuracy']:.0%}, answered: {summary['answer_rate']:.0%}, "
+          f"false wakes: {summary['false_wake_rate']:.0%}")
+    if r["count"]:
+        print(f"Stop talking -> NEPTR talking: p50 {r['p50']:.0f} ms, p90 {r['p90']:.0f} ms, "
+              f"p99 {r['p99']:.0f} ms, max {r['max']:.0f} ms over {r['count']} answers")
+    if summary["filler_ms"]["count"]:
+        print(f"Filler lines: {summary['filler_ms']['count']}, p50 {summary['filler_ms']['p50']:.0f} ms")
+    if summary["extra_reply_runs"]:
+        print(f"⚠️ {summary['extra_reply_runs']} runs heard more replies than expected; their numbers may be off")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Headless HTTP API for NEPTR
+Answers typed or recorded utterances without a microphone, over TCP on
+localhost and/or a Unix socket. Used for load testing the response path.
+
+    POST /v1/utterance   {"text": "what is pi", "session": "bench-1", "audio": false}
+    POST /v1/utterance?rate=16000&session=bench-1&audio=1   (raw int16 PCM body)
+    GET  /v1/health
+    GET  /v1/latency     per-stage latency histograms (when tracking is on)
+    GET  /v1/trace       recent spans as Chrome trace JSON (when tracing is on)
+
+The reply is JSON: transcript, reply, source, latency_ms and, when audio was
+asked for, base64 int16 PCM plus its sample_rate.
+"""
+
+import base64
+import json
+import os
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PCM_TYPES = ("audio/l16", "application/octet-stream")
+MAX_BODY = 16 * 1024 * 1024
+
+
+class HeadlessAPI:
+    """
+    transcribe(pcm, sample_rate) -> text
+    respond(text, session) -> (reply, source)
+    synthesize(text) -> (sample_rate, pcm); optional
+    latency() -> dict of latency histograms; optional
+    trace() -> Chrome trace JSON of recent spans; optional
+    on_request(path, status, seconds) is called after every reply; optional
+    """
+
+    def __init__(self, transcribe, respond, synthesize=None, latency=None, on_request=None, trace=None, log=print):
+        self.transcribe = transcribe
+        self.respond = respond
+        self.synthesize = synthesize
+        self.latency = latency
+        self.on_request = on_request
+        self.trace = trace
+        self.log = log
+        self.servers = []
+        self.requests_served = 0
+        self._lock = threading.Lock()
+
+    def handle_utterance(self, text=None, pcm=None, sample_rate=16000, session="default", want_audio=False) -> dict:
+        start = time.perf_counter()
+        result = {"session": session}
+        if pcm is not None:
+            text = self.transcribe(pcm, sample_rate)
+            result["asr_ms"] = (time.perf_counter() - start) * 1000
+        text = (text or "").strip()
+        result["transcript"] = text
+        reply, source = self.respond(text, session)
+        result["reply"], result["source"] = reply, source
+        result["latency_ms"] = (time.perf_counter() - start) * 1000
+        if want_audio and self.synthesize and reply:
+            rate, audio = self.synthesize(reply)
+            result["sample_rate"] = rate
+            result["audio"] = base64.b64encode(audio).decode("ascii")
+            result["tts_ms"] = (time.perf_counter() - start) * 1000 - result["latency_ms"]
+        with self._lock:
+            self.requests_served += 1
+        return result
+
+    def serve_tcp(self, host="127.0.0.1", port=0):
+        server = _TCPServer((host, port), self)
+        self._serve(server, f"http://{host}:{server.server_address[1]}")
+        return server
+
+    def serve_unix(self, path):
+        if os.path.exists(path):
+            os.unlink(path)
+        server = _UnixServer(path, self)
+        os.chmod(path, 0o660)
+        self._serve(server, f"unix:{path}")
+        return server
+
+    def _serve(self, server, where):
+        threading.Thread(target=server.serve_forever, name="neptr-headless-api", daemon=True).start()
+        self.servers.append(server)
+        self.log(f"Headless API listening on {where}")
+
+    def stop(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+            if isinstance(server, _UnixServer) and os.path.exists(server.server_address):
+                os.unlink(server.server_address)
+        self.servers = []
+
+
+class _TCPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, api):
+        super().__init__(address, HeadlessHandler)
+        self.api = api
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, api):
+        super().__init__(path, HeadlessHandler)
+        self.api = api
+
+
+class HeadlessHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def address_string(self):
+        return self.client_address[0] if self.client_address else "unix"
+
+    def _send_json(self, status, obj):
+        body = json.dumps(obj).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if self.server.api.on_request:
+            self.server.api.on_request(urlparse(self.path).path, status, time.perf_counter() - self._started)
+
+    def do_GET(self):
+        self._started = time.perf_counter()
+        path = urlparse(self.path).path
+        if path == "/v1/health":
+            self._send_json(200, {"status": "ok", "requests_served": self.server.api.requests_served})
+        elif path == "/v1/latency" and self.server.api.latency:
+            self._send_json(200, self.server.api.latency())
+        elif path == "/v1/trace" and self.server.api.trace:
+            self._send_json(200, self.server.api.trace())
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        self._started = time.perf_counter()
+        url = urlparse(self.path)
+        if url.path != "/v1/utterance":
+            self._send_json(404, {"error": "not found"})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        if length > MAX_BODY:
+            self._send_json(413, {"error": "utterance too large"})
+            return
+        body = self.rfile.read(length)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        content_type = self.headers.get("Content-Type", "").split(";")[0].strip().lower()
+
+        try:
+            if content_type in PCM_TYPES:
+                kwargs = {"pcm": body, "sample_rate": int(query.get("rate", 16000)),
+                          "session": query.get("session", "default"),
+                          "want_audio": query.get("audio", "0") in ("1", "true")}
+            else:
+                request = json.loads(body or b"{}")
+                kwargs = {"text": request.get("text", ""), "session": str(request.get("session", "default")),
+                          "want_audio": bool(request.get("audio"))}
+        except (ValueError, AttributeError) as e:
+            self._send_json(400, {"error": f"bad request: {e}"})
+            return
+
+        try:
+            self._send_json(200, self.server.api.handle_utterance(**kwargs))
+        except Exception as e:
+            self.server.api.log(f"Headless API error: {e}")
+            self._send_json(500, {"error": str(e)})
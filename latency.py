@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Per-stage latency tracking for NEPTR
+Each conversation turn collects monotonic timestamps at its stage boundaries;
+when the turn ends the time between boundaries goes into HDR-style histograms,
+so a slow reply can be pinned on endpointing, Vosk, the LLM, espeak-ng or the
+echo guard.
+"""
+
+import collections
+import json
+import math
+import threading
+import time
+
+# Stage boundaries of one turn, in order
+SPEECH_END = "speech_end"
+FINAL_TRANSCRIPT = "final_transcript"
+INTENT_DISPATCH = "intent_dispatch"
+LLM_FIRST_BYTE = "llm_first_byte"
+REPLY_COMPLETE = "reply_complete"
+TTS_FIRST_SAMPLE = "tts_first_sample"
+PLAYBACK_END = "playback_end"
+LISTEN_RESUME = "listen_resume"
+
+# Histogram name -> (from boundary, to boundary)
+INTERVALS = collections.OrderedDict([
+    ("endpointing", (SPEECH_END, FINAL_TRANSCRIPT)),
+    ("flush_wait", (FINAL_TRANSCRIPT, INTENT_DISPATCH)),
+    ("llm_first_byte", (INTENT_DISPATCH, LLM_FIRST_BYTE)),
+    ("answer", (INTENT_DISPATCH, REPLY_COMPLETE)),
+    ("tts_startup", (REPLY_COMPLETE, TTS_FIRST_SAMPLE)),
+    ("playback", (TTS_FIRST_SAMPLE, PLAYBACK_END)),
+    ("resume", (PLAYBACK_END, LISTEN_RESUME)),
+    ("response", (SPEECH_END, TTS_FIRST_SAMPLE)),
+    ("turn", (SPEECH_END, LISTEN_RESUME)),
+])
+
+
+class HdrHistogram:
+    """
+    Log-linear buckets in the style of HdrHistogram: every value is kept to
+    `digits` significant decimal digits, whatever its magnitude, in a few KB.
+    Values are recorded in milliseconds with microsecond resolution.
+    """
+
+    def __init__(self, digits=2):
+        self.digits = digits
+        self._sub_bits = math.ceil(math.log2(2 * 10 ** digits))
+        self._counts = collections.Counter()
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def _bucket(self, us):
+        shift = max(0, us.bit_length() - self._sub_bits)
+        return (us >> shift) << shift, shift
+
+    def record(self, value_ms, count=1):
+        if value_ms < 0:
+            return
+        us = int(round(value_ms * 1000))
+        low, _ = self._bucket(us)
+        self._counts[low] += count
+        self.count += count
+        self.total += value_ms * count
+        self.min = value_ms if self.min is None else min(self.min, value_ms)
+        self.max = value_ms if self.max is None else max(self.max, value_ms)
+
+    def merge(self, other):
+        self._counts.update(other._counts)
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, pct):
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(pct / 100 * self.count))
+        seen = 0
+        for low in sorted(self._counts):
+            seen += self._counts[low]
+            if seen >= target:
+                _, shift = self._bucket(low)
+                value = (low + ((1 << shift) - 1) / 2) / 1000  # middle of the bucket
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def reset(self):
+        self._counts.clear()
+        self.count, self.total, self.min, self.max = 0, 0.0, None, None
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "min": self.min or 0.0,
+            "mean": self.mean(),
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "p999": self.percentile(99.9),
+            "max": self.max or 0.0,
+        }
+
+
+class LatencyTracker:
+    """
+    mark(key, boundary) stamps a boundary of the turn in progress for key (a
+    room or API session); finish(key) closes the turn and records its intervals.
+    observe(name, ms) records a standalone duration (e.g. one Vosk block).
+    """
+
+    def __init__(self, clock=time.monotonic, history=50, digits=2):
+        self.clock = clock
+        self.digits = digits
+        self.histograms = collections.OrderedDict((name, HdrHistogram(digits)) for name in INTERVALS)
+        self.recent = collections.deque(maxlen=history)
+        self._open = {}
+        self._lock = threading.Lock()
+
+    def mark(self, key, boundary, at=None):
+        at = self.clock() if at is None else at
+        with self._lock:
+            self._open.setdefault(key, {})[boundary] = at
+
+    def get(self, key, boundary):
+        with self._lock:
+            return self._open.get(key, {}).get(boundary)
+
+    def observe(self, name, value_ms):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = HdrHistogram(self.digits)
+            histogram.record(value_ms)
+
+    def finish(self, key):
+        """Record the intervals of key's turn; returns them in ms"""
+        with self._lock:
+            marks = self._open.pop(key, None)
+            if not marks:
+                return {}
+            intervals = {}
+            for name, (start, end) in INTERVALS.items():
+                if start in marks and end in marks and marks[end] >= marks[start]:
+                    intervals[name] = (marks[end] - marks[start]) * 1000
+                    self.histograms[name].record(intervals[name])
+            self.recent.append({"key": str(key), "intervals": intervals})
+            return intervals
+
+    def discard(self, key):
+        with self._lock:
+            self._open.pop(key, None)
+
+    def reset(self):
+        with self._lock:
+            for histogram in self.histograms.values():
+                histogram.reset()
+            self.recent.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "histograms": {name: h.snapshot() for name, h in self.histograms.items() if h.count},
+                "recent_turns": list(self.recent),
+            }
+
+    def dump(self) -> str:
+        """Percentile table of every stage that has seen data"""
+        rows = self.snapshot()["histograms"]
+        if not rows:
+            return "no turns recorded yet"
+        lines = [f"{'stage':>16} {'count':>6} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}  (ms)"]
+        for name, s in rows.items():
+            lines.append(f"{name:>16} {s['count']:>6} {s['p50']:>8.1f} {s['p90']:>8.1f} "
+                         f"{s['p99']:>8.1f} {s['max']:>8.1f}")
+        return "\n".join(lines)
+
+    def dump_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+LLM backends for NEPTR
+Any OpenAI-compatible chat completions endpoint works: OpenAI itself, a local
+llama.cpp-style server on the Pi or the LAN, or the bundled mock server.
+"""
+
+import json
+import time
+
+import requests
+
+OPENAI_BASE_URL = "https://api.openai.com/v1"
+
+
+class LLMResponse:
+    """Reply text plus what it cost to get it"""
+
+    def __init__(self, text, status_code, payload_bytes, latency_ms, first_byte_ms, usage=None):
+        self.text = text
+        self.status_code = status_code
+        self.payload_bytes = payload_bytes
+        self.latency_ms = latency_ms
+        self.first_byte_ms = first_byte_ms
+        self.usage = usage or {}
+
+
+class OpenAICompatibleBackend:
+    """Chat completions over HTTP; raises requests exceptions on failure"""
+
+    def __init__(self, name, base_url, model, api_key=None, timeout=10.0, stream=False):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.api_key = api_key
+        self.timeout = timeout
+        self.stream = stream
+        self._session = requests.Session()
+
+    def _headers(self):
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    def complete(self, messages, max_tokens=1000, temperature=0.8) -> LLMResponse:
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+        if self.stream:
+            payload["stream"] = True
+        body = json.dumps(payload).encode("utf-8")
+
+        start = time.monotonic()
+        r = self._session.post(f"{self.base_url}/chat/completions", headers=self._headers(),
+                               data=body, timeout=self.timeout, stream=self.stream)
+        try:
+            r.raise_for_status()
+            if self.stream:
+                text, usage, first_byte = self._read_stream(r, start)
+            else:
+                first_byte = time.monotonic()
+                data = r.json()
+                usage = data.get("usage") or {}
+                choices = data.get("choices") or []
+                text = choices[0]["message"]["content"].strip() if choices else ""
+        finally:
+            r.close()
+        end = time.monotonic()
+
+        return LLMResponse(text, r.status_code, len(body), (end - start) * 1000,
+                           (first_byte - start) * 1000, usage)
+
+    def _read_stream(self, r, start):
+        """Collect a server-sent-events stream of chat completion chunks"""
+        parts = []
+        usage = {}
+        first_byte = None
+        for line in r.iter_lines():
+            if first_byte is None:
+                first_byte = time.monotonic()
+            if not line or not line.startswith(b"data:"):
+                continue
+            data = line[5:].strip()
+            if data == b"[DONE]":
+                break
+            chunk = json.loads(data)
+            usage = chunk.get("usage") or usage
+            for choice in chunk.get("choices") or []:
+                parts.append((choice.get("delta") or {}).get("content") or "")
+        return "".join(parts).strip(), usage, first_byte or time.monotonic()
+
+    def health(self, timeout=3.0) -> bool:
+        """Cheap reachability check: anything below 500 means the server answers"""
+        r = self._session.get(f"{self.base_url}/models", headers=self._headers(), timeout=timeout)
+        return r.status_code < 500
+
+
+def create_backend(kind, model, api_key=None, base_url=None, timeout=10.0, stream=False):
+    """Build the configured backend ("openai", "local" or "mock"); None if unusable"""
+    if kind == "openai":
+        if not api_key:
+            return None
+        return OpenAICompatibleBackend("openai", base_url or OPENAI_BASE_URL, model,
+                                       api_key=api_key, timeout=timeout, stream=stream)
+    if kind in ("local", "mock"):
+        if not base_url:
+            raise ValueError(f"LLM backend '{kind}' needs a base URL")
+        return OpenAICompatibleBackend(kind, base_url, model, api_key=api_key,
+                                       timeout=timeout, stream=stream)
+    raise ValueError(f"Unknown LLM backend: {kind}")
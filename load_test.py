@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Concurrent load generator for NEPTR's headless API
+Reports throughput and p50/p95/p99 latency of the response path.
+
+    python3 load_test.py --url http://127.0.0.1:8765 --concurrency 8 --requests 200
+    python3 load_test.py --socket /tmp/neptr.sock --wav question.wav
+"""
+
+import argparse
+import http.client
+import json
+import socket
+import threading
+import time
+import wave
+from urllib.parse import urlparse
+
+DEFAULT_QUESTIONS = [
+    "what time is it",
+    "what is your name",
+    "tell me about the candy kingdom",
+    "what is your favorite pie",
+    "how far away is the moon",
+    "who is finn the human",
+    "what is the capital of france",
+    "why is the sky blue",
+]
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout=30.0):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5 - 1e-9)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def read_wav(path):
+    """Mono int16 PCM and sample rate from a WAV file"""
+    with wave.open(path) as wav:
+        if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+            raise ValueError(f"{path}: expected mono 16-bit PCM")
+        return wav.readframes(wav.getnframes()), wav.getframerate()
+
+
+def _connect(url=None, socket_path=None, timeout=30.0):
+    if socket_path:
+        return UnixHTTPConnection(socket_path, timeout=timeout)
+    parsed = urlparse(url)
+    return http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=timeout)
+
+
+def run_load(url=None, socket_path=None, questions=DEFAULT_QUESTIONS, pcm_clips=(),
+             concurrency=4, requests=100, want_audio=False, timeout=30.0) -> dict:
+    """
+    Send `requests` utterances from `concurrency` workers, each with its own
+    keep-alive connection and session. Text questions and (pcm, rate) clips are
+    used in turn.
+    """
+    utterances = [("text", q) for q in questions] + [("pcm", clip) for clip in pcm_clips]
+    if not utterances:
+        raise ValueError("nothing to send")
+    latencies, server_ms, errors, sources = [], [], [], {}
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def worker(worker_id):
+        conn = _connect(url, socket_path, timeout)
+        session = f"load-{worker_id}"
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            kind, utterance = utterances[i % len(utterances)]
+            if kind == "text":
+                body = json.dumps({"text": utterance, "session": session, "audio": want_audio})
+                path, headers = "/v1/utterance", {"Content-Type": "application/json"}
+            else:
+                body, rate = utterance
+                path = f"/v1/utterance?rate={rate}&session={session}&audio={int(want_audio)}"
+                headers = {"Content-Type": "audio/L16"}
+            start = time.perf_counter()
+            try:
+                conn.request("POST", path, body=body, headers=headers)
+                response = conn.getresponse()
+                payload = response.read()
+                elapsed = (time.perf_counter() - start) * 1000
+                if response.status != 200:
+                    raise RuntimeError(f"HTTP {response.status}")
+                result = json.loads(payload)
+                with lock:
+                    latencies.append(elapsed)
+                    server_ms.append(result.get("latency_ms", 0.0))
+                    sources[result.get("source")] = sources.get(result.get("source"), 0) + 1
+            except Exception as e:
+                with lock:
+                    errors.append(str(e))
+                conn.close()
+                conn = _connect(url, socket_path, timeout)
+        conn.close()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(n,), daemon=True) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    server_ms.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "concurrency": concurrency,
+        "wall_sec": wall,
+        "throughput_rps": len(latencies) / wall if wall else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": latencies[-1] if latencies else 0.0,
+        "server_p50_ms": percentile(server_ms, 50),
+        "server_p99_ms": percentile(server_ms, 99),
+        "sources": sources,
+        "first_errors": errors[:5],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test NEPTR's headless API")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--socket", default=None, help="Unix socket path (instead of --url)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--questions", default=None, help="text file with one question per line")
+    parser.add_argument("--wav", action="append", default=[], help="mono 16-bit WAV utterance (repeatable)")
+    parser.add_argument("--audio", action="store_true", help="also ask for synthesized speech")
+    parser.add_argument("--json", action="store_true", help="print the raw results as JSON")
+    args = parser.parse_args()
+
+    questions = DEFAULT_QUESTIONS
+    if args.questions:
+        with open(args.questions) as f:
+            questions = [line.strip() for line in f if line.strip()]
+    if args.wav and not args.questions:
+        questions = []
+
+    results = run_load(url=args.url, socket_path=args.socket, questions=questions,
+                       pcm_clips=[read_wav(path) for path in args.wav],
+                       concurrency=args.concurrency, requests=args.requests, want_audio=args.audio)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("🤖 NEPTR load test")
+    print("=" * 40)
+    print(f"Requests:    {results['requests']} ok, {results['errors']} errors "
+          f"({results['concurrency']} concurrent, {results['wall_sec']:.1f}s)")
+    print(f"Throughput:  {results['throughput_rps']:.1f} req/s")
+    print(f"Latency:     p50 {results['p50_ms']:.0f} ms, p95 {results['p95_ms']:.0f} ms, "
+          f"p99 {results['p99_ms']:.0f} ms, max {results['max_ms']:.0f} ms")
+    print(f"Server side: p50 {results['server_p50_ms']:.0f} ms, p99 {results['server_p99_ms']:.0f} ms")
+    print(f"Answered by: {results['sources']}")
+    for error in results["first_errors"]:
+        print(f"  ❌ {error}")
+
+
+if __name__ == "__main__":
+    main()
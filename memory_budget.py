@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Low-memory profile for 2 GB Raspberry Pis
+LOW_MEMORY_MODE shrinks every queue, buffer and cache before anything is built,
+recognizers for one-off utterances come from a small reusable pool, and an RSS
+budget is checked every few seconds: while resident memory is over it, caches
+are shed (cheapest to lose first) and freed heap is handed back to the OS.
+"""
+
+import contextlib
+import ctypes
+import ctypes.util
+import os
+import threading
+
+from rooms import rss_bytes
+
+# Upper bounds applied by low_memory_settings(); settings already smaller are kept
+LOW_MEMORY_LIMITS = {
+    "PIPELINE_QUEUE_SIZES": {"capture": 8, "asr": 8, "intent": 16, "tts": 2},
+    "SEMANTIC_CACHE_SIZE": 64,
+    "TRACE_BUFFER_EVENTS": 5000,
+    "LOG_QUEUE_SIZE": 1000,
+    "HEADLESS_API_SESSIONS": 8,
+    "CONVERSATION_TOKEN_BUDGET": 600,
+    "RECOGNIZER_POOL_IDLE": 1,
+}
+
+
+def low_memory_settings(settings: dict) -> dict:
+    """The LOW_MEMORY_LIMITS-capped values of the given settings (only the ones that change)"""
+    changed = {}
+    for name, limit in LOW_MEMORY_LIMITS.items():
+        if name not in settings:
+            continue
+        value = settings[name]
+        if isinstance(limit, dict):
+            capped = {key: min(size, limit.get(key, size)) for key, size in value.items()}
+        else:
+            capped = min(value, limit)
+        if capped != value:
+            changed[name] = capped
+    return changed
+
+
+def trim_heap() -> bool:
+    """Return freed malloc memory to the OS (glibc only); True if anything was released"""
+    libc_name = ctypes.util.find_library("c")
+    if not libc_name:
+        return False
+    try:
+        return bool(ctypes.CDLL(libc_name).malloc_trim(0))
+    except (OSError, AttributeError):
+        return False
+
+
+def drop_file_cache(path) -> int:
+    """
+    Ask the kernel to drop the files under path from the page cache (they were
+    read once, into our own heap, and are never read again). Returns their size.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return 0
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                fd = os.open(os.path.join(root, name), os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+                total += os.fstat(fd).st_size
+            except OSError:
+                pass
+            finally:
+                os.close(fd)
+    return total
+
+
+class RecognizerPool:
+    """
+    Recognizers for one-off utterances, reset and reused instead of built per
+    turn. factory(sample_rate) makes a new one; at most `idle` per sample rate
+    are kept between uses, so concurrent callers never wait.
+    """
+
+    def __init__(self, factory, idle=2):
+        self.factory = factory
+        self.idle = idle
+        self.created = 0
+        self.reused = 0
+        self._free = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, sample_rate):
+        with self._lock:
+            free = self._free.get(sample_rate)
+            recognizer = free.pop() if free else None
+        if recognizer is None:
+            self.created += 1
+            return self.factory(sample_rate)
+        self.reused += 1
+        return recognizer
+
+    def release(self, sample_rate, recognizer):
+        recognizer.Reset()
+        with self._lock:
+            free = self._free.setdefault(sample_rate, [])
+            if len(free) < self.idle:
+                free.append(recognizer)
+
+    @contextlib.contextmanager
+    def recognizer(self, sample_rate):
+        recognizer = self.acquire(sample_rate)
+        try:
+            yield recognizer
+        finally:
+            self.release(sample_rate, recognizer)
+
+    def shed(self) -> int:
+        """Drop the idle recognizers; returns how many"""
+        with self._lock:
+            count = sum(len(free) for free in self._free.values())
+            self._free.clear()
+        return count
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(free) for free in self._free.values())
+
+
+class MemoryBudget:
+    """
+    Named parts of NEPTR's memory with optional size estimates and shedders.
+    check() runs the shedders in registration order until RSS is back under
+    limit_bytes (0 = no limit, report only). While shedding isn't enough,
+    `backoff` doubles (up to 16) so callers can check less often.
+    """
+
+    def __init__(self, limit_bytes=0, measure=rss_bytes, trim=trim_heap, log=print):
+        self.limit_bytes = limit_bytes
+        self.measure = measure
+        self.trim = trim
+        self.log = log
+        self.components = []  # (name, size, shed)
+        self.sheds = 0
+        self.over_budget_checks = 0
+        self.backoff = 1
+
+    def add(self, name, size=None, shed=None):
+        """size() -> bytes (estimated); shed() frees what it can"""
+        self.components.append((name, size, shed))
+
+    def breakdown(self) -> dict:
+        """{name: bytes} for every sized part, plus "other" and the "total" RSS"""
+        rss = self.measure()
+        parts = {name: int(size()) for name, size, _ in self.components if size is not None}
+        parts["other"] = max(0, rss - sum(parts.values()))
+        parts["total"] = rss
+        return parts
+
+    def report(self) -> str:
+        parts = self.breakdown()
+        total = parts.pop("total")
+        limit = f" of {self.limit_bytes / 1e6:.0f} MB budget" if self.limit_bytes else ""
+        lines = [f"Resident memory: {total / 1e6:.1f} MB{limit}"]
+        for name, size in sorted(parts.items(), key=lambda item: -item[1]):
+            lines.append(f"  {name:<18} {size / 1e6:8.1f} MB")
+        return "\n".join(lines)
+
+    def check(self) -> list:
+        """Shed until under budget; returns the names of the parts that were shed"""
+        if not self.limit_bytes or self.measure() <= self.limit_bytes:
+            self.backoff = 1
+            return []
+        self.over_budget_checks += 1
+        shed = []
+        for name, _, shed_fn in self.components:
+            if shed_fn is None:
+                continue
+            shed_fn()
+            shed.append(name)
+            self.sheds += 1
+            self.trim()
+            if self.measure() <= self.limit_bytes:
+                break
+        rss = self.measure()
+        if rss > self.limit_bytes:
+            self.backoff = min(self.backoff * 2, 16)
+            self.log(f"Still over the memory budget after shedding {', '.join(shed) or 'nothing'}:\n{self.report()}")
+        else:
+            self.backoff = 1
+            self.log(f"Over the memory budget: shed {', '.join(shed)}, now {rss / 1e6:.1f} MB")
+        return shed
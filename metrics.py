@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Minimal Prometheus metrics for NEPTR
+Counters, gauges and histograms rendered in the Prometheus text format from a
+tiny HTTP server on localhost. Updating a metric is a dict lookup and an add
+under a lock, so it is cheap enough to leave on all the time; numbers that
+already live elsewhere (queue depths, cache stats, RSS) are read by collector
+callbacks only when /metrics is scraped.
+
+    curl -s localhost:9101/metrics
+"""
+
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.label_names, key)} {_number(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set(self, value, **labels):
+        """Mirror a cumulative count kept elsewhere (for collectors)"""
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def get(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def get(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels):
+        return sum(self._values.get(self._key(labels), ([0], 0.0))[0])
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = _labels(self.label_names, key, [("le", _number(bound))])
+                    lines.append(f"{self.name}_bucket{le} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(total)}")
+                lines.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = []
+
+    def _add(self, metric):
+        return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help, labels=()):
+        return self._add(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=()):
+        return self._add(Gauge(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def add_collector(self, collect):
+        """collect() is called before each scrape to refresh mirrored values"""
+        self.collectors.append(collect)
+
+    def render(self) -> str:
+        for collect in self.collectors:
+            try:
+                collect()
+            except Exception as e:
+                print(f"Metrics collector error: {e}")
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, registry, routes=None):
+        super().__init__(address, MetricsHandler)
+        self.registry = registry
+        self.routes = routes or {}
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/metrics":
+            body, content_type = self.server.registry.render(), "text/plain; version=0.0.4; charset=utf-8"
+        elif path in self.server.routes:
+            body, content_type = self.server.routes[path](), "text/plain; charset=utf-8"
+        else:
+            self.send_error(404)
+            return
+        body = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_metrics_server(registry, host="127.0.0.1", port=9101, routes=None):
+    """
+    Serve /metrics on a background thread; port 0 picks a free port.
+    routes maps extra paths to functions returning plain text (e.g. profiler controls).
+    """
+    server = MetricsServer((host, port), registry, routes)
+    threading.Thread(target=server.serve_forever, name="neptr-metrics", daemon=True).start()
+    return server
+
+
+class NeptrMetrics(Registry):
+    """Every metric NEPTR exports, created up front so updates are plain attribute access"""
+
+    def __init__(self):
+        super().__init__()
+        self.audio_callbacks = self.counter(
+            "neptr_audio_callbacks_total", "Audio blocks delivered by the sound card", ["room"])
+        self.audio_callback_status = self.counter(
+            "neptr_audio_callback_status_total", "Audio callbacks reporting a PortAudio status flag", ["room", "flag"])
+        self.queue_depth = self.gauge(
+            "neptr_queue_depth", "Items waiting in a pipeline queue", ["queue"])
+        self.queue_drops = self.counter(
+            "neptr_queue_drops_total", "Items shed by a full pipeline queue", ["queue"])
+        self.asr_audio_seconds = self.counter(
+            "neptr_asr_audio_seconds_total", "Seconds of audio fed to Vosk", ["room"])
+        self.asr_decode_seconds = self.counter(
+            "neptr_asr_decode_seconds_total", "Seconds spent decoding audio in Vosk", ["room"])
+        self.asr_real_time_factor = self.gauge(
+            "neptr_asr_real_time_factor", "Vosk decode time per second of audio (must stay below 1)", ["room"])
+        self.wake_detections = self.counter(
+            "neptr_wake_detections_total", "Conversations started by the wake word", ["room"])
+        self.wake_suppressed = self.counter(
+            "neptr_wake_suppressed_total", "Transcripts with half a wake phrase that did not wake NEPTR", ["room"])
+        self.llm_request_seconds = self.histogram(
+            "neptr_llm_request_seconds", "LLM request latency", ["backend"])
+        self.llm_requests = self.counter(
+            "neptr_llm_requests_total", "LLM requests by HTTP status or error", ["backend", "code"])
+        self.llm_circuit_open = self.gauge(
+            "neptr_llm_circuit_open", "1 while the LLM circuit breaker is open", ["backend"])
+        self.api_request_seconds = self.histogram(
+            "neptr_api_request_seconds", "Headless API request latency", ["path"])
+        self.api_responses = self.counter(
+            "neptr_api_responses_total", "Headless API responses by status code", ["path", "code"])
+        self.rate_limit_queue_depth = self.gauge(
+            "neptr_api_rate_limit_queue_depth", "Requests waiting for the API rate limiter")
+        self.rate_limit_wait = self.gauge(
+            "neptr_api_rate_limit_wait_seconds", "Time requests waited for the rate limiter", ["stat"])
+        self.rate_limit_rejected = self.counter(
+            "neptr_api_rate_limit_rejected_total", "Turns that skipped the API rather than wait too long")
+        self.rate_limit_throttled = self.counter(
+            "neptr_api_rate_limit_throttled_total", "HTTP 429 responses that made the limiter back off")
+        self.cache_lookups = self.counter(
+            "neptr_cache_lookups_total", "Semantic cache lookups", ["result"])
+        self.cache_hit_ratio = self.gauge(
+            "neptr_cache_hit_ratio", "Semantic cache hits / lookups")
+        self.agc_gain = self.gauge(
+            "neptr_agc_gain", "Automatic gain control multiplier", ["room"])
+        self.noise_floor = self.gauge(
+            "neptr_noise_floor_rms", "Tracked ambient noise level (RMS after the gain)", ["room"])
+        self.silence_threshold = self.gauge(
+            "neptr_silence_threshold_rms", "Loudness above which a block counts as voice", ["room"])
+        self.tts_seconds = self.histogram(
+            "neptr_tts_seconds", "Time spent speaking one reply", ["room"])
+        self.resident_memory = self.gauge(
+            "process_resident_memory_bytes", "Resident memory size in bytes")
+        self.cpu_seconds = self.counter(
+            "process_cpu_seconds_total", "User and system CPU time spent in seconds")
+
+    def set_rate_limiter(self, stats):
+        """Mirror TokenBucket.stats()"""
+        self.rate_limit_queue_depth.set(stats["queue_depth"])
+        self.rate_limit_wait.set(stats["avg_wait_sec"], stat="avg")
+        self.rate_limit_wait.set(stats["max_wait_sec"], stat="max")
+        self.rate_limit_rejected.set(stats["rejected"])
+        self.rate_limit_throttled.set(stats["throttled"])
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Deterministic mock of an OpenAI-compatible chat completions server
+Used to load-test and benchmark NEPTR's response path without network access.
+
+    python3 mock_llm_server.py --port 8089 --latency 0.3 --token-delay 0.02
+"""
+
+import argparse
+import json
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MOCK_REPLIES = [
+    "Beep boop! {echo}? That's mathematical! My circuits say the answer is pie!",
+    "Whirr! You asked about {echo}. Finn would love that question! Algebraic!",
+    "Zap! {echo}! Oh my glob, I know this one! It's a mock answer from the Land of Ooo!",
+    "Bleep! My pie-brain processed {echo} and found it delicious!",
+]
+
+
+def mock_reply(user_text: str) -> str:
+    """Same question, same answer"""
+    template = MOCK_REPLIES[zlib.crc32(user_text.encode("utf-8")) % len(MOCK_REPLIES)]
+    return template.format(echo=user_text.strip() or "nothing")
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.3, token_delay=0.0, error_every=0):
+        super().__init__(address, MockLLMHandler)
+        self.latency = latency
+        self.token_delay = token_delay
+        self.error_every = error_every
+        self.requests_served = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def next_request_number(self):
+        with self._lock:
+            self.requests_served += 1
+            return self.requests_served
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, obj):
+        body = json.dumps(obj).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "neptr-mock", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        number = self.server.next_request_number()
+
+        if self.server.error_every and number % self.server.error_every == 0:
+            self._send_json(503, {"error": {"message": "mock outage"}})
+            return
+
+        messages = request.get("messages") or []
+        user_text = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+        reply = mock_reply(user_text)
+        usage = {
+            "prompt_tokens": sum(len(m.get("content", "")) for m in messages) // 4,
+            "completion_tokens": len(reply) // 4,
+        }
+
+        time.sleep(self.server.latency)
+        if request.get("stream"):
+            self._stream(request, reply, usage)
+        else:
+            self._send_json(200, {
+                "id": f"mock-{number}",
+                "object": "chat.completion",
+                "model": request.get("model", "neptr-mock"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": reply},
+                             "finish_reason": "stop"}],
+                "usage": usage,
+            })
+
+    def _stream(self, request, reply, usage):
+        """Server-sent events, one word per chunk"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        words = reply.split(" ")
+        for i, word in enumerate(words):
+            chunk = {
+                "object": "chat.completion.chunk",
+                "model": request.get("model", "neptr-mock"),
+                "choices": [{"index": 0, "delta": {"content": word + (" " if i < len(words) - 1 else "")}}],
+            }
+            if i == len(words) - 1:
+                chunk["usage"] = usage
+            self.wfile.write(b"data: " + json.dumps(chunk).encode("utf-8") + b"\n\n")
+            self.wfile.flush()
+            if self.server.token_delay:
+                time.sleep(self.server.token_delay)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def start_mock_server(host="127.0.0.1", port=0, latency=0.3, token_delay=0.0, error_every=0):
+    """Start the mock server on a background thread; port 0 picks a free port"""
+    server = MockLLMServer((host, port), latency=latency, token_delay=token_delay,
+                           error_every=error_every)
+    thread = threading.Thread(target=server.serve_forever, name="mock-llm-server", daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deterministic mock OpenAI-compatible server for NEPTR")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds before the first byte")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="seconds between streamed chunks")
+    parser.add_argument("--error-every", type=int, default=0, help="answer every Nth request with HTTP 503")
+    args = parser.parse_args()
+
+    server = MockLLMServer((args.host, args.port), latency=args.latency,
+                           token_delay=args.token_delay, error_every=args.error_every)
+    print(f"🤖 Mock LLM server listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nGoodbye! 🤖🥧")
+
+
+if __name__ == "__main__":
+    main()
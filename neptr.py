@@ -1,10 +1,41 @@
 import json, queue, sys, subprocess, os, shutil, time, re, random
+import atexit
+import collections
+import concurrent.futures
+import contextlib
+import io
+import logging
+import multiprocessing
+import struct
+import wave
 from datetime import datetime
-import numpy as np
 import sounddevice as sd
 from vosk import Model, KaldiRecognizer
 import threading
 import signal
+import requests
+from audio_dsp import AutomaticGainControl, NoiseSuppressor, PolyphaseResampler, block_rms
+from circuit_breaker import CircuitBreaker
+from config_reload import ConfigReloader
+from conversation import GOODBYE_PAT, ConversationMachine, LISTENING, THINKING, Reconfigure, SpeechFinished, Transcript
+from conversation_context import ConversationContext
+from headless_api import HeadlessAPI
+from latency import (FINAL_TRANSCRIPT, INTENT_DISPATCH, LISTEN_RESUME, LLM_FIRST_BYTE, PLAYBACK_END,
+                     REPLY_COMPLETE, SPEECH_END, TTS_FIRST_SAMPLE, LatencyTracker)
+from llm_backend import create_backend
+from memory_budget import MemoryBudget, RecognizerPool, drop_file_cache, low_memory_settings, trim_heap
+from metrics import NeptrMetrics, start_metrics_server
+from profiler import SamplingProfiler
+from rate_limiter import TokenBucket, parse_retry_after
+from response_pipeline import ResponsePipeline
+from rooms import FairScheduler, Room, rss_bytes
+from satellite import start_satellite_server
+from semantic_cache import SemanticCache, normalize as normalize_transcript
+from speculation import SpeculativeDispatcher
+from stages import Pipeline, Stage, StageQueue
+from structured_log import setup_logging
+from tracer import Tracer
+from wake_words import WakeMatcher
 
 # Import configuration
 try:
@@ -32,9 +63,173 @@ except ImportError:
     MATH_CALCULATIONS = True
     CONFIRMATION_ENABLED = True
     API_RATE_LIMIT_SECONDS = 1.0
+    API_RATE_LIMIT_BURST = 3
+    API_RATE_LIMIT_MAX_WAIT_SEC = 3.0
+    LLM_CIRCUIT_FAILURE_THRESHOLD = 2
+    LLM_CIRCUIT_RESET_SEC = 60.0
+    LLM_HEALTH_PROBE_INTERVAL_SEC = 15.0
+    LLM_HEALTH_PROBE_TIMEOUT_SEC = 3.0
+    CONVERSATION_HISTORY_ENABLED = True
+    CONVERSATION_TOKEN_BUDGET = 1200
+    CONVERSATION_SUMMARY_TOKENS = 150
+    SPECULATIVE_DISPATCH = True
+    SPECULATION_STABLE_SEC = 0.5
+    OPENAI_MODEL = "gpt-4o-mini"
+    OPENAI_MAX_TOKENS = 1000
+    OPENAI_TEMPERATURE = 0.8
+    LLM_BACKEND = "openai"
+    LLM_BASE_URL = "http://localhost:8080/v1"
+    LOCAL_LLM_MODEL = "local-model"
+    LLM_TIMEOUT_SEC = 10.0
+    LLM_STREAM = False
+    MOCK_LLM_PORT = 0
+    MOCK_LLM_LATENCY_SEC = 0.3
+    MOCK_LLM_TOKEN_DELAY_SEC = 0.0
+    BUFFER_FLUSH_SEC = 2.0
+    CONVERSATION_TIMEOUT_SEC = 30.0
+    ECHO_GUARD_SEC = 2.0
+    CONVERSATION_TRACE = False
+    PIPELINE_QUEUE_SIZES = {"capture": 16, "asr": 16, "intent": 64, "tts": 4}
+    PIPELINE_QUEUE_POLICIES = {"capture": "drop_oldest", "asr": "drop_oldest", "intent": "block", "tts": "block"}
+    PIPELINE_STAGE_MODES = {"vad": "thread", "tts": "thread"}
+    PIPELINE_REPORT_SEC = 300
+    ROOMS = [{"name": "default", "input": None, "output": None}]
+    ROOM_ASR_WORKERS = 0
+    SATELLITE_HOST = "0.0.0.0"
+    SATELLITE_PORT = 7700
+    SATELLITE_COMPRESSION = True
+    SATELLITE_PLAYOUT_DELAY_SEC = 0.3
+    HEADLESS_API_ENABLED = False
+    HEADLESS_API_HOST = "127.0.0.1"
+    HEADLESS_API_PORT = 8765
+    HEADLESS_API_SOCKET = ""
+    HEADLESS_API_SESSIONS = 64
+    LATENCY_TRACKING = True
+    LATENCY_DUMP_FILE = ""
+    METRICS_ENABLED = False
+    METRICS_HOST = "127.0.0.1"
+    METRICS_PORT = 9101
+    TRACE_ENABLED = False
+    TRACE_BUFFER_EVENTS = 50000
+    TRACE_DUMP_SIGNAL = "SIGQUIT"
+    TRACE_DUMP_FILE = "neptr-trace.json"
+    LOG_LEVEL = "INFO"
+    LOG_TO_FILE = False
+    LOG_FILE = "neptr.log"
+    LOG_FORMAT = "text"
+    LOG_MAX_BYTES = 5 * 1024 * 1024
+    LOG_BACKUP_COUNT = 3
+    LOG_QUEUE_SIZE = 10000
+    PROFILE_SIGNALS = True
+    PROFILE_INTERVAL_MS = 10
+    PROFILE_OUTPUT = "neptr-profile.collapsed"
+    SEMANTIC_CACHE_ENABLED = True
+    SEMANTIC_CACHE_THRESHOLD = 0.85
+    SEMANTIC_CACHE_SIZE = 256
+    SEMANTIC_CACHE_TOP_K = 3
+    SEMANTIC_CACHE_TTL_SEC = 3600
+    LOCAL_INTENTS_ENABLED = True
+    RESPONSE_DEADLINE_SEC = 6.0
+    RESPONSE_FILLER_AFTER_SEC = 2.5
+    RESPONSE_HEDGE_DELAY_SEC = 0.05
+    NEPTR_FILLERS = ["Hmm, let me think about that! Whirr!"]
+    LOW_MEMORY_MODE = False
+    MEMORY_BUDGET_MB = 700
+    MEMORY_CHECK_SEC = 5.0
+    MEMORY_REPORT_SEC = 600
+    RECOGNIZER_POOL_IDLE = 2
+    CONFIG_RELOAD_SIGNAL = ""
+    CONFIG_WATCH_SEC = 0
+    NOISE_REDUCTION = True
+    NOISE_GAIN_FLOOR = 0.1
+    AUTOMATIC_GAIN_CONTROL = True
+    AGC_TARGET_RMS = 3000
+    AGC_MAX_GAIN = 8.0
+    CAPTURE_NATIVE_RATE = True
 
-# Rate limiting for OpenAI API
-last_api_call_time = 0
+# Low-memory mode: cap queues, caches and buffers before any of them is built
+if LOW_MEMORY_MODE:
+    globals().update(low_memory_settings(globals()))
+
+# Status messages go through a queue to a background writer, never blocking audio or Vosk
+log, log_listener = setup_logging(LOG_LEVEL, console=VISUAL_FEEDBACK, to_file=LOG_TO_FILE, path=LOG_FILE,
+                                  json_format=LOG_FORMAT == "json", max_bytes=LOG_MAX_BYTES,
+                                  backups=LOG_BACKUP_COUNT, queue_size=LOG_QUEUE_SIZE)
+atexit.register(log_listener.stop)
+
+# Rate limiting for OpenAI API (token bucket: steady rate plus a small burst)
+api_rate_limiter = TokenBucket(
+    rate=1.0 / API_RATE_LIMIT_SECONDS if API_RATE_LIMIT_SECONDS > 0 else 0.0,
+    burst=API_RATE_LIMIT_BURST,
+)
+
+# Per-stage timestamps of every turn, aggregated into latency histograms
+latency = LatencyTracker() if LATENCY_TRACKING else None
+
+def mark_latency(key, boundary, at=None):
+    if latency is not None:
+        latency.mark(key, boundary, at)
+
+# Counters for the optional Prometheus endpoint (cheap enough to always collect)
+metrics = NeptrMetrics()
+
+# Timeline of recent spans for chrome://tracing (None when tracing is off: no overhead)
+tracer = Tracer(TRACE_BUFFER_EVENTS) if TRACE_ENABLED else None
+
+def dump_trace():
+    path = os.path.expanduser(TRACE_DUMP_FILE)
+    count = tracer.dump(path)
+    print_neptr_status(f"Wrote {count} trace events to {path}")
+
+def install_trace_signal():
+    """TRACE_DUMP_SIGNAL (e.g. kill -QUIT) writes the trace buffer without stopping NEPTR"""
+    if tracer is None or not TRACE_DUMP_SIGNAL:
+        return
+    signal.signal(getattr(signal, TRACE_DUMP_SIGNAL),
+                  lambda signum, frame: threading.Thread(target=dump_trace, name="neptr-trace-dump").start())
+    print_neptr_status(f"Tracing on: send {TRACE_DUMP_SIGNAL} to pid {os.getpid()} to write {TRACE_DUMP_FILE}")
+
+# Sampling profiler, switched on and off while running (kill -USR1 / -USR2, or the metrics endpoint)
+profiler = SamplingProfiler(PROFILE_INTERVAL_MS / 1000)
+
+def start_profiling() -> str:
+    if not profiler.start():
+        return "profiler already running\n"
+    print_neptr_status("Profiler started")
+    return "profiler started\n"
+
+def stop_profiling() -> str:
+    """Stop sampling, write PROFILE_OUTPUT and return the collapsed stacks"""
+    if not profiler.stop():
+        return "profiler not running\n"
+    path = os.path.expanduser(PROFILE_OUTPUT)
+    profiler.write(path)
+    print_neptr_status(f"Profile written to {path}\n{profiler.report()}")
+    return profiler.collapsed()
+
+def install_profile_signals():
+    if not PROFILE_SIGNALS:
+        return
+    # Signal handlers run on the main thread; do the work elsewhere so the report loop keeps going
+    signal.signal(signal.SIGUSR1, lambda signum, frame: threading.Thread(target=start_profiling).start())
+    signal.signal(signal.SIGUSR2, lambda signum, frame: threading.Thread(target=stop_profiling).start())
+
+def traced(name, source):
+    """Wrap an answer source so each call shows up as a span"""
+    if tracer is None:
+        return source
+    def call(command_text, context=None):
+        with tracer.span(name, "answer"):
+            return source(command_text, context)
+    return call
+
+# Near-duplicate answer cache for OpenAI replies
+semantic_cache = SemanticCache(
+    max_size=SEMANTIC_CACHE_SIZE,
+    threshold=SEMANTIC_CACHE_THRESHOLD,
+    top_k=SEMANTIC_CACHE_TOP_K,
+    ttl_sec=SEMANTIC_CACHE_TTL_SEC,
+) if SEMANTIC_CACHE_ENABLED else None
 
 # -----------------------------
 # Checks & setup
@@ -45,18 +240,29 @@ if not os.path.isdir(MODEL_PATH):
     print("And extract it to:", MODEL_PATH)
     sys.exit(1)
 
+# Loaded once and shared by every room's recognizer
+rss_before_model = rss_bytes()
 model = Model(MODEL_PATH)
-wake_rec = KaldiRecognizer(model, SAMPLE_RATE)
-wake_rec.SetWords(True)
+model_memory_bytes = rss_bytes() - rss_before_model
+if LOW_MEMORY_MODE:
+    # Vosk has copied the model into its own memory; the page cache copy is never read again
+    drop_file_cache(MODEL_PATH)
+    trim_heap()
+
+def new_recognizer(sample_rate):
+    recognizer = KaldiRecognizer(model, sample_rate)
+    recognizer.SetWords(True)
+    return recognizer
+
+# Recognizers for one-off utterances (API requests, legacy listeners) are reset and reused
+recognizer_pool = RecognizerPool(new_recognizer, idle=RECOGNIZER_POOL_IDLE)
 
-audio_q = queue.Queue()
+# Bounded: when recognition falls behind the oldest audio is dropped (and counted)
+audio_q = StageQueue("capture", PIPELINE_QUEUE_SIZES["capture"], PIPELINE_QUEUE_POLICIES["capture"])
 is_listening = False
 should_exit = False
 speaking_until = 0  # Timestamp when speaking will be complete
-in_conversation = False
 last_speech_time = 0
-conversation_buffer = ""
-last_buffer_update = 0
 
 def signal_handler(signum, frame):
     global should_exit
@@ -65,10 +271,48 @@ def signal_handler(signum, frame):
 
 signal.signal(signal.SIGINT, signal_handler)
 
-def callback(indata, frames, time_info, status):
-    if status:
-        print(status, file=sys.stderr)
-    audio_q.put(bytes(indata))
+CALLBACK_FLAGS = ("input_overflow", "input_underflow", "output_overflow", "output_underflow", "priming_output")
+
+def make_callback(capture, room_name="default", resampler=None):
+    named = False
+
+    def callback(indata, frames, time_info, status):
+        nonlocal named
+        if not named:
+            # PortAudio's thread, named so it can be told apart in profiles and traces
+            threading.current_thread().name = f"audio-callback:{room_name}"
+            named = True
+        metrics.audio_callbacks.inc(room=room_name)
+        if tracer is not None:
+            tracer.instant("audio_block", "audio", room=room_name, frames=frames)
+        if status:
+            print_neptr_status(f"Audio status ({room_name}): {status}", logging.WARNING, room=room_name)
+            for flag in CALLBACK_FLAGS:
+                if getattr(status, flag, False):
+                    metrics.audio_callback_status.inc(room=room_name, flag=flag)
+        capture.put(resampler.process(bytes(indata)) if resampler is not None else bytes(indata))
+    return callback
+
+def open_capture_stream(room):
+    """
+    Open a room's microphone. With CAPTURE_NATIVE_RATE the device runs at its own
+    default rate (usually 44.1 or 48 kHz) and the callback resamples each block to
+    SAMPLE_RATE, instead of leaving the conversion to ALSA's plug layer or PulseAudio.
+    """
+    rate, resampler = SAMPLE_RATE, None
+    if CAPTURE_NATIVE_RATE:
+        try:
+            rate = int(sd.query_devices(room.input_device, "input")["default_samplerate"])
+        except (sd.PortAudioError, ValueError, KeyError, TypeError) as e:
+            print_neptr_status(f"Could not read {room.name}'s native rate, capturing at {SAMPLE_RATE} Hz: {e}",
+                               logging.WARNING, room=room.name)
+        if rate != SAMPLE_RATE:
+            resampler = PolyphaseResampler(rate, SAMPLE_RATE)
+    print_neptr_status(f"Microphone ({room.name}): {rate} Hz" +
+                       (f", resampled to {SAMPLE_RATE} Hz in-process" if resampler else ""), room=room.name)
+    return sd.RawInputStream(samplerate=rate, blocksize=round(BLOCK_SIZE * rate / SAMPLE_RATE),
+                             device=room.input_device, dtype='int16', channels=1,
+                             callback=make_callback(room.capture, room.name, resampler))
 
 # TTS: prefer espeak-ng (Pi). On macOS fallback to 'say'
 USE_ESPEAK = shutil.which("espeak-ng") is not None
@@ -113,26 +357,56 @@ def tts(text: str, voice_speed=None, voice_pitch=None):
     global last_speech_time
     last_speech_time = time.time()
 
-def tts_espeak(text: str, voice_speed: int, voice_pitch: int):
+def tts_espeak(text: str, voice_speed: int, voice_pitch: int, device=None, on_first_sample=None):
     """Text-to-speech using espeak with robot-like characteristics"""
     if USE_ESPEAK:
-        # Slightly robotic voice with pauses
-        subprocess.run([
-            "espeak-ng", 
-            "-s", str(voice_speed), 
-            "-p", str(voice_pitch), 
+        # Slightly robotic voice with pauses, streamed to the speaker as espeak-ng renders it
+        proc = subprocess.Popen([
+            "espeak-ng", "--stdout",
+            "-s", str(voice_speed),
+            "-p", str(voice_pitch),
             "-v", "en-us",
             "-g", str(VOICE_GAP),  # Word gap for more robotic speech
             text
-        ], check=False)
+        ], stdout=subprocess.PIPE)
+        try:
+            header = proc.stdout.read(44)
+            if len(header) < 44:
+                return
+            rate = struct.unpack("<I", header[24:28])[0]
+            with sd.RawOutputStream(samplerate=rate, channels=1, dtype='int16', device=device) as out:
+                chunk = proc.stdout.read(4096)
+                if chunk and on_first_sample:
+                    on_first_sample()
+                while chunk:
+                    out.write(chunk)
+                    chunk = proc.stdout.read(4096)
+        finally:
+            proc.stdout.close()
+            proc.wait()
     else:
+        if on_first_sample:
+            on_first_sample()
         subprocess.run(["say", "-r", str(voice_speed), text], check=False)
 
-def print_neptr_status(message: str):
-    """Print status with Neptr branding"""
-    if VISUAL_FEEDBACK:
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        print(f"[{timestamp}] 🤖 NEPTR: {message}")
+def synthesize_pcm(text: str, voice_speed: int, voice_pitch: int):
+    """Render speech with espeak-ng; returns (sample_rate, mono int16 PCM bytes)"""
+    result = subprocess.run([
+        "espeak-ng", "--stdout",
+        "-s", str(voice_speed),
+        "-p", str(voice_pitch),
+        "-v", "en-us",
+        "-g", str(VOICE_GAP),
+        text
+    ], capture_output=True, check=False)
+    if result.returncode != 0 or not result.stdout:
+        return SAMPLE_RATE, b""
+    with wave.open(io.BytesIO(result.stdout)) as wav:
+        return wav.getframerate(), wav.readframes(wav.getnframes())
+
+def print_neptr_status(message: str, level=logging.INFO, **fields):
+    """Log status with Neptr branding (queued; written by the log thread)"""
+    log.log(level, message, extra=fields or None)
 
 # -----------------------------
 # Enhanced intent handling with Neptr personality
@@ -146,37 +420,14 @@ WEATHER_PAT = re.compile(r"\b(weather|temperature|forecast)\b")
 MATH_PAT = re.compile(r"\b(calculate|math|plus|minus|times|divided|add|subtract|multiply|divide)\b")
 PI_PAT = re.compile(r"\b(pi|pie|π)\b")
 STATUS_PAT = re.compile(r"\b(status|how.*you|feeling|okay|ok)\b")
-GOODBYE_PAT = re.compile(r"\b(goodbye|bye|see.*you|farewell|exit|quit|stop|end.*conversation|that.*all|done|finished)\b")
+# Answers that go stale or should vary are never served from the cache
+UNCACHEABLE_PAT = re.compile(r"\b(time|date|day|today|tonight|tomorrow|yesterday|now|news|latest|current|weather|temperature|forecast|joke|funny|story|random)\b")
 
-def handle_intent(command_text: str) -> str:
-    text = command_text.lower().strip()
-    
-    if not text:
-        return random.choice(NEPTR_APOLOGIES)
-    
-    # Skip very short commands that might be speech recognition errors
-    if len(text) < 3:
-        return "I didn't catch that clearly. Could you please repeat your command?"
+def is_cacheable(text: str) -> bool:
+    return semantic_cache is not None and not UNCACHEABLE_PAT.search(text)
 
-    # Try OpenAI API for ALL queries (ChatGPT-like behavior)
-    api_key = os.getenv("OPENAI_API_KEY")
-    
-    if api_key and OPENAI_INTEGRATION:
-        # Rate limiting - ensure we don't make too many calls too quickly
-        global last_api_call_time
-        current_time = time.time()
-        time_since_last_call = current_time - last_api_call_time
-        
-        if time_since_last_call < API_RATE_LIMIT_SECONDS:
-            sleep_time = API_RATE_LIMIT_SECONDS - time_since_last_call
-            print_neptr_status(f"Rate limiting: waiting {sleep_time:.1f} seconds...")
-            time.sleep(sleep_time)
-        
-        try:
-            import requests
-            
-            # Enhanced system prompt to match Neptr from Adventure Time
-            system_prompt = """You are NEPTR (Never Ending Pie Throwing Robot) from Adventure Time! You're Finn's loyal robot companion who loves throwing pies and being helpful.
+# Enhanced system prompt to match Neptr from Adventure Time
+NEPTR_SYSTEM_PROMPT = """You are NEPTR (Never Ending Pie Throwing Robot) from Adventure Time! You're Finn's loyal robot companion who loves throwing pies and being helpful.
 
 PERSONALITY TRAITS:
 - You're enthusiastic, loyal, and slightly naive but well-meaning
@@ -215,73 +466,235 @@ ADVENTURE TIME REFERENCES:
 
 Remember: You're from the Land of Ooo, you love Finn, and you're always ready to help with pie-throwing enthusiasm! Keep responses fun, enthusiastic, and true to your character!"""
 
-            headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
-            payload = {
-                "model": OPENAI_MODEL,
-                "messages": [
-                    {
-                        "role": "system", 
-                        "content": system_prompt
-                    },
-                    {
-                        "role": "user",
-                        "content": command_text
-                    }
-                ],
-                "max_tokens": OPENAI_MAX_TOKENS,
-                "temperature": OPENAI_TEMPERATURE
-            }
-            r = requests.post("https://api.openai.com/v1/chat/completions", headers=headers, json=payload, timeout=10)
-            r.raise_for_status()
-            data = r.json()
-            if "choices" in data and data["choices"]:
-                last_api_call_time = time.time()  # Update timestamp for rate limiting
-                return data["choices"][0]["message"]["content"].strip()
-        except requests.exceptions.RequestException as e:
-            print_neptr_status(f"OpenAI API request error: {e}")
-            # Continue to fallback responses below
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 429:
-                print_neptr_status("OpenAI API rate limit reached, using fallback response")
-            elif e.response.status_code == 401:
-                print_neptr_status("OpenAI API authentication error - check your API key")
-            else:
-                print_neptr_status(f"OpenAI API HTTP error {e.response.status_code}: {e}")
-            # Continue to fallback responses below
-        except Exception as e:
-            print_neptr_status(f"Unexpected error with OpenAI API: {e}")
-            # Continue to fallback responses below
-
-    # Fallback responses only if OpenAI is not available
-    fallback_responses = [
-        "I'd love to help with that! My AI brain is currently offline, but I'm still here to chat!",
-        "That's a great question! My cloud connection is down right now, but I'm happy to keep you company!",
-        "I'm having trouble connecting to my AI brain, but I'm still your friendly robot companion!",
-        "My advanced circuits are temporarily offline, but I'm still here and ready to help however I can!",
-        "I'd normally give you a smart answer, but my AI connection is down. Still, I'm happy to chat!"
-    ]
-    return random.choice(fallback_responses)
+FALLBACK_RESPONSES = [
+    "I'd love to help with that! My AI brain is currently offline, but I'm still here to chat!",
+    "That's a great question! My cloud connection is down right now, but I'm happy to keep you company!",
+    "I'm having trouble connecting to my AI brain, but I'm still your friendly robot companion!",
+    "My advanced circuits are temporarily offline, but I'm still here and ready to help however I can!",
+    "I'd normally give you a smart answer, but my AI connection is down. Still, I'm happy to chat!"
+]
+
+# Strict whole-utterance patterns for questions answered locally without the API
+LOCAL_TIME_PAT = re.compile(r"^(what time is it( now| right now)?|what is the (current )?time( now| right now)?|tell me the time)$")
+LOCAL_DATE_PAT = re.compile(r"^(what is the date( today)?|what is today's date|what day is (it|it today|today)|what is today|tell me the date)$")
+
+def precheck_reply(text: str):
+    """Reply to empty or too-short commands without looking any further"""
+    if not text:
+        return random.choice(NEPTR_APOLOGIES)
+    
+    # Skip very short commands that might be speech recognition errors
+    if len(text) < 3:
+        return "I didn't catch that clearly. Could you please repeat your command?"
+    return None
+
+def local_intent(command_text: str, context=None):
+    """Answer time and date questions locally (exact and instant)"""
+    if not LOCAL_INTENTS_ENABLED:
+        return None
+    text = normalize_transcript(command_text)
+    now = datetime.now()
+    if LOCAL_TIME_PAT.match(text):
+        return f"Beep boop! My internal clock says it's {now.strftime('%I:%M %p').lstrip('0')}! Mathematical!"
+    if LOCAL_DATE_PAT.match(text):
+        return f"Whirr! Today is {now.strftime('%A, %B')} {now.day}, {now.year}! Algebraic!"
+    return None
+
+def cached_reply(command_text: str, context=None):
+    """Answer near-duplicate questions from the semantic cache (not follow-ups)"""
+    text = command_text.lower().strip()
+    if not is_cacheable(text):
+        return None
+    cached = semantic_cache.lookup(text, follow_up=(context or conversation_context).has_history)
+    if cached:
+        print_neptr_status("Answering from semantic cache")
+    return cached
+
+# Recent turns of the current conversation, sent with each API request
+# (each room keeps its own; this one is used when no room is given)
+conversation_context = ConversationContext(
+    NEPTR_SYSTEM_PROMPT,
+    token_budget=CONVERSATION_TOKEN_BUDGET if CONVERSATION_HISTORY_ENABLED else 0,
+    summary_tokens=CONVERSATION_SUMMARY_TOKENS if CONVERSATION_HISTORY_ENABLED else 0,
+)
+
+def start_llm_backend():
+    """Create the configured chat backend (OpenAI, a local server or the bundled mock)"""
+    base_url = LLM_BASE_URL
+    if LLM_BACKEND == "mock":
+        from mock_llm_server import start_mock_server
+        mock = start_mock_server(port=MOCK_LLM_PORT, latency=MOCK_LLM_LATENCY_SEC,
+                                 token_delay=MOCK_LLM_TOKEN_DELAY_SEC)
+        base_url = mock.base_url
+        print_neptr_status(f"Using mock LLM server at {base_url}")
+    model = OPENAI_MODEL if LLM_BACKEND == "openai" else LOCAL_LLM_MODEL
+    api_key = os.getenv("OPENAI_API_KEY") if LLM_BACKEND == "openai" else os.getenv("LOCAL_LLM_API_KEY")
+    return create_backend(LLM_BACKEND, model, api_key=api_key,
+                          base_url=base_url if LLM_BACKEND != "openai" else None,
+                          timeout=LLM_TIMEOUT_SEC, stream=LLM_STREAM)
+
+llm_backend = start_llm_backend() if OPENAI_INTEGRATION else None
+
+def llm_reply(command_text: str, context=None):
+    """Ask the LLM backend; returns None if it is unavailable or fails"""
+    if llm_backend is None:
+        return None
+    text = command_text.lower().strip()
+    context = context or conversation_context
+    # Decided before the request: the answer only stands on its own if nothing came before it
+    follow_up = context.has_history
+
+    # Fail fast while the backend is known to be down
+    if not llm_breaker.allow_request():
+        return None
+
+    # Rate limiting - only this worker thread waits, never capture or recognition
+    waited = api_rate_limiter.acquire(max_wait=API_RATE_LIMIT_MAX_WAIT_SEC)
+    if waited is None:
+        llm_breaker.release()
+        print_neptr_status("Rate limit queue too long, skipping the AI backend for this turn")
+        return None
+    if waited:
+        print_neptr_status(f"Rate limited: waited {waited:.1f} seconds")
+
+    try:
+        requested_at = time.monotonic()
+        response = llm_backend.complete(context.messages_for(command_text),
+                                        max_tokens=OPENAI_MAX_TOKENS,
+                                        temperature=OPENAI_TEMPERATURE)
+        metrics.llm_request_seconds.observe(response.latency_ms / 1000, backend=llm_backend.name)
+        metrics.llm_requests.inc(backend=llm_backend.name, code=str(response.status_code))
+        llm_breaker.record_success()
+        mark_latency(context.name, LLM_FIRST_BYTE, requested_at + response.first_byte_ms / 1000)
+        cached_tokens = (response.usage.get("prompt_tokens_details") or {}).get("cached_tokens")
+        stats = context.record_request(response.payload_bytes, response.latency_ms, cached_tokens)
+        print_neptr_status(f"API turn: {stats['payload_bytes']} bytes sent, {response.latency_ms:.0f} ms "
+                           f"(first byte {response.first_byte_ms:.0f} ms), {stats['history_turns']} turns of context, "
+                           f"{cached_tokens or 0} cached prompt tokens")
+        if response.text:
+            if is_cacheable(text):
+                semantic_cache.add(text, response.text, follow_up=follow_up)
+            return response.text
+    except requests.exceptions.HTTPError as e:
+        metrics.llm_requests.inc(backend=llm_backend.name, code=str(e.response.status_code))
+        # Any answer below 500 means the backend is reachable
+        if e.response.status_code >= 500:
+            llm_breaker.record_failure(f"HTTP {e.response.status_code}")
+        else:
+            llm_breaker.record_success()
+        if e.response.status_code == 429:
+            retry_after = parse_retry_after(e.response.headers.get("Retry-After"))
+            api_rate_limiter.penalize(retry_after)
+            print_neptr_status(f"{llm_backend.name} rate limit reached, backing off {retry_after:.1f}s")
+        elif e.response.status_code == 401:
+            print_neptr_status(f"{llm_backend.name} authentication error - check your API key", logging.WARNING)
+        else:
+            print_neptr_status(f"{llm_backend.name} HTTP error {e.response.status_code}: {e}", logging.WARNING)
+    except requests.exceptions.RequestException as e:
+        metrics.llm_requests.inc(backend=llm_backend.name, code=type(e).__name__)
+        llm_breaker.record_failure(type(e).__name__)
+        print_neptr_status(f"{llm_backend.name} request error: {e}", logging.WARNING)
+    except Exception as e:
+        llm_breaker.release()
+        print_neptr_status(f"Unexpected error with {llm_backend.name}: {e}", logging.ERROR)
+    return None
+
+def llm_health_probe() -> bool:
+    """Cheap reachability check used while the circuit is open"""
+    return llm_backend is not None and llm_backend.health(timeout=LLM_HEALTH_PROBE_TIMEOUT_SEC)
+
+# Stops paying the request timeout on every turn while the backend is unreachable
+llm_breaker = CircuitBreaker(
+    name=LLM_BACKEND,
+    failure_threshold=LLM_CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=LLM_CIRCUIT_RESET_SEC,
+    probe=llm_health_probe,
+    probe_interval=LLM_HEALTH_PROBE_INTERVAL_SEC,
+    log=lambda message: print_neptr_status(message),
+)
+
+def fallback_reply() -> str:
+    """Fallback responses only if OpenAI is not available"""
+    return random.choice(FALLBACK_RESPONSES)
+
+def handle_intent(command_text: str) -> str:
+    """Answer a command serially: local intents, cache, OpenAI, then fallback"""
+    text = command_text.lower().strip()
+    return (precheck_reply(text)
+            or local_intent(command_text)
+            or cached_reply(command_text)
+            or llm_reply(command_text)
+            or fallback_reply())
+
+# Races local intents, the cache and OpenAI (the conversation machine owns the filler and deadline)
+response_pipeline = ResponsePipeline(
+    sources=[
+        ("local", traced("local_intent", local_intent), 0.0),
+        ("cache", traced("cached_reply", cached_reply), 0.0),
+        ("llm", traced("llm_reply", llm_reply), RESPONSE_HEDGE_DELAY_SEC),
+    ],
+    log=lambda message: print_neptr_status(message),
+)
+
+def submit_command(command_text: str, context=None):
+    """Start answering a command; the future resolves to (source, reply)"""
+    early = precheck_reply(command_text.lower().strip())
+    if early:
+        future = concurrent.futures.Future()
+        future.set_result(("precheck", early))
+        return future
+    return response_pipeline.submit(command_text, context or conversation_context)
+
+def record_turn(command_text: str, reply: str, source: str, context=None):
+    """Remember answered turns for the conversation history"""
+    if source not in ("fallback", "precheck"):
+        (context or conversation_context).add_turn(command_text, reply)
+
+def create_speculator(context):
+    """Answers the transcript early once it stops changing, before the buffer flush"""
+    if not SPECULATIVE_DISPATCH:
+        return None
+    return SpeculativeDispatcher(lambda text: response_pipeline.submit(text, context),
+                                 stable_sec=SPECULATION_STABLE_SEC)
+
+def print_speculation_stats(rooms):
+    for room in rooms:
+        if room.speculator and room.speculator.fired:
+            stats = room.speculator.stats()
+            print_neptr_status(f"Speculation ({room.name}): {stats['hits']} hits, {stats['wasted']} wasted "
+                               f"({stats['wasted_rate']:.0%}), {stats['avg_latency_saved_sec']:.2f}s saved per hit")
 
 # -----------------------------
 # Improved audio capture and processing
 # -----------------------------
 def drain_queue():
-    while not audio_q.empty():
-        try:
-            audio_q.get_nowait()
-        except queue.Empty:
-            break
+    audio_q.clear()
+
+def create_agc():
+    if not AUTOMATIC_GAIN_CONTROL:
+        return None
+    return AutomaticGainControl(SAMPLE_RATE, target_rms=AGC_TARGET_RMS, max_gain=AGC_MAX_GAIN)
+
+legacy_agc = create_agc()
 
-def listen_for_command(timeout_sec=COMMAND_TIMEOUT_SEC) -> str:
+def measure_block(data):
+    """(block, rms, silence threshold) for the legacy listeners, levelled by the AGC when it is on"""
+    if legacy_agc is None:
+        return data, block_rms(data), RMS_SILENCE_THRESHOLD
+    data = legacy_agc.process(data)
+    return data, block_rms(data), legacy_agc.silence_threshold
+
+def listen_for_command(timeout_sec=None) -> str:
     """
     Capture audio after wake word and transcribe one command.
     Stops on trailing silence or timeout.
     """
     global is_listening
+    if timeout_sec is None:
+        timeout_sec = COMMAND_TIMEOUT_SEC
     
-    # Fresh recognizer for the command utterance
-    cmd_rec = KaldiRecognizer(model, SAMPLE_RATE)
-    cmd_rec.SetWords(True)
+    # Clean recognizer for the command utterance
+    cmd_rec = recognizer_pool.acquire(SAMPLE_RATE)
 
     drain_queue()
     start = time.time()
@@ -302,9 +715,8 @@ def listen_for_command(timeout_sec=COMMAND_TIMEOUT_SEC) -> str:
             continue
 
         # Silence/voice detection
-        arr = np.frombuffer(data, dtype=np.int16)
-        rms = np.sqrt(np.mean(arr.astype(np.float32) ** 2)) if arr.size else 0
-        if rms > RMS_SILENCE_THRESHOLD:
+        data, rms, threshold = measure_block(data)
+        if rms > threshold:
             last_voice_ts = time.time()
 
         # Feed recognizer
@@ -325,6 +737,7 @@ def listen_for_command(timeout_sec=COMMAND_TIMEOUT_SEC) -> str:
             transcript_final += (" " + tail if transcript_final else tail)
     except Exception:
         pass
+    recognizer_pool.release(SAMPLE_RATE, cmd_rec)
 
     is_listening = False
     return transcript_final.strip()
@@ -334,9 +747,8 @@ def listen_for_conversation(timeout_sec=30.0) -> str:
     Conversation-specific listener that doesn't interfere with main loop state.
     Designed for continuous conversation flow with faster response.
     """
-    # Fresh recognizer for the conversation utterance
-    cmd_rec = KaldiRecognizer(model, SAMPLE_RATE)
-    cmd_rec.SetWords(True)
+    # Clean recognizer for the conversation utterance
+    cmd_rec = recognizer_pool.acquire(SAMPLE_RATE)
 
     drain_queue()
     start = time.time()
@@ -360,9 +772,8 @@ def listen_for_conversation(timeout_sec=30.0) -> str:
             continue
 
         # Silence/voice detection
-        arr = np.frombuffer(data, dtype=np.int16)
-        rms = np.sqrt(np.mean(arr.astype(np.float32) ** 2)) if arr.size else 0
-        if rms > RMS_SILENCE_THRESHOLD:
+        data, rms, threshold = measure_block(data)
+        if rms > threshold:
             last_voice_ts = time.time()
             speech_detected = True
 
@@ -385,6 +796,7 @@ def listen_for_conversation(timeout_sec=30.0) -> str:
             transcript_final += (" " + tail if transcript_final else tail)
     except Exception:
         pass
+    recognizer_pool.release(SAMPLE_RATE, cmd_rec)
 
     # Debug output to see what we got
     if transcript_final.strip():
@@ -397,163 +809,592 @@ def listen_for_conversation(timeout_sec=30.0) -> str:
     # Note: We don't modify is_listening here to avoid conflicts with main loop
     return transcript_final.strip()
 
+GOODBYE_MESSAGES = [
+    "Goodbye! It was great talking with you! Beep boop!",
+    "See you later! Thanks for the conversation! Whirr!",
+    "Farewell, friend! I'll be here whenever you need me! Zap!",
+    "Bye bye! Come back soon for more pie-throwing adventures! Bleep!",
+    "Goodbye! I'll miss our chat! Beep boop whirr!"
+]
+
+TIMEOUT_GOODBYE_MESSAGES = [
+    "I haven't heard anything for a while. I'll go back to sleep now! Goodbye! Beep boop!",
+    "It's been quiet for a bit. I'll take a nap! See you later! Whirr!",
+    "No one's talking, so I'll go back to sleep! Farewell! Zap!",
+    "I'm getting sleepy from the silence. Goodbye for now! Bleep!",
+    "Time for me to rest! I'll be here when you need me! Beep boop whirr!"
+]
+
+def vad_stage(suppressor=None, agc=None, adapting=None):
+    """
+    Per room: suppress steady noise, even out the level, then measure the block's
+    loudness (runs on its own thread or process, so the AGC state travels with the block).
+    adapting is a shared flag (survives the fork in process mode); while it is off
+    the AGC keeps its gain and noise floor as they are.
+    """
+    def handle(data):
+        if suppressor is not None:
+            data = suppressor.process(data)
+        if agc is not None:
+            data = agc.process(data, adapt=adapting is None or bool(adapting.value))
+        return data, block_rms(data), agc.state() if agc is not None else None
+    return handle
+
+def asr_stage(recognizer, key):
+    """Feed one room's Vosk recognizer; returns a final transcript, or the partial one for speculative dispatch"""
+    def handle(item):
+        data, rms, want_partial = item
+        start = time.monotonic()
+        final = recognizer.AcceptWaveform(data)
+        elapsed = time.monotonic() - start
+        metrics.asr_audio_seconds.inc(len(data) / 2 / SAMPLE_RATE, room=key)
+        metrics.asr_decode_seconds.inc(elapsed, room=key)
+        if latency is not None:
+            latency.observe("vosk_block", elapsed * 1000)
+        if tracer is not None:
+            tracer.complete("AcceptWaveform", start, start + elapsed, "asr", room=key, final=bool(final))
+        if final:
+            transcript = json.loads(recognizer.Result()).get("text", "")
+            return Transcript(transcript, True) if transcript else None
+        if want_partial:
+            return Transcript(json.loads(recognizer.PartialResult()).get("partial", ""), False)
+        return None
+    return handle
+
+def tts_stage(key, device=None):
+    """Speak one reply; the state machine hears back when it is done"""
+    def handle(text):
+        if text and AUDIO_FEEDBACK:
+            start = time.monotonic()
+
+            def on_first_sample():
+                mark_latency(key, TTS_FIRST_SAMPLE)
+                if tracer is not None:
+                    tracer.complete("tts_synth", start, cat="tts", room=key)
+
+            try:
+                tts_espeak(text, VOICE_SPEED, VOICE_PITCH, device, on_first_sample=on_first_sample)
+            except Exception as e:
+                print_neptr_status(f"TTS error: {e}", logging.WARNING)
+            mark_latency(key, PLAYBACK_END)
+            metrics.tts_seconds.observe(time.monotonic() - start, room=key)
+            if tracer is not None:
+                tracer.complete("tts", start, cat="tts", room=key, chars=len(text))
+        return SpeechFinished()
+    return handle
+
+def satellite_tts_stage(name):
+    """Send one reply's speech to a satellite and wait while it plays there"""
+    def handle(text):
+        if text and AUDIO_FEEDBACK and satellite_server is not None:
+            try:
+                start = time.monotonic()
+                rate, pcm = synthesize_pcm(text, VOICE_SPEED, VOICE_PITCH)
+                if tracer is not None:
+                    tracer.complete("tts_synth", start, cat="tts", room=name, chars=len(text))
+                # send_speech paces itself, so it returns near the end of the reply
+                sent = time.monotonic()
+                duration = satellite_server.send_speech(name, pcm, rate,
+                                                        info={"filler": True} if text in NEPTR_FILLERS else None)
+                if duration:
+                    mark_latency(name, TTS_FIRST_SAMPLE, sent + SATELLITE_PLAYOUT_DELAY_SEC)
+                    time.sleep(max(0.0, sent + duration + SATELLITE_PLAYOUT_DELAY_SEC - time.monotonic()))
+                    mark_latency(name, PLAYBACK_END)
+                    metrics.tts_seconds.observe(duration, room=name)
+            except Exception as e:
+                print_neptr_status(f"Satellite TTS error: {e}", logging.WARNING)
+        return SpeechFinished()
+    return handle
+
+# Receives audio from satellite rooms (started by start_satellites)
+satellite_server = None
+
+def start_satellites(rooms):
+    """Listen for satellites if any room in ROOMS is fed over the network"""
+    global satellite_server
+    by_name = {room.name: room for room in rooms if room.is_satellite}
+    if not by_name:
+        return
+
+    def on_connect(name, sample_rate):
+        room = by_name.get(name)
+        if room is None:
+            print_neptr_status(f"Unknown satellite room '{name}' (add it to ROOMS with \"input\": \"satellite\")")
+            return None
+        if sample_rate != SAMPLE_RATE:
+            print_neptr_status(f"Satellite '{name}' sends {sample_rate} Hz, expected {SAMPLE_RATE} Hz")
+            return None
+        return room.capture.put
+
+    satellite_server = start_satellite_server(on_connect, host=SATELLITE_HOST, port=SATELLITE_PORT,
+                                              compress=SATELLITE_COMPRESSION, log=print_neptr_status)
+    print_neptr_status(f"Waiting for satellites on port {satellite_server.address[1]}: {', '.join(by_name)}")
+
+def print_pipeline_stats(pipeline):
+    lines = [pipeline.report()]
+    if satellite_server is not None:
+        for name, s in satellite_server.stats().items():
+            rtt = f"{s['avg_rtt_ms']:.1f} ms" if s["avg_rtt_ms"] is not None else "n/a"
+            lines.append(f"{name:>8}: satellite {s['frames']} frames, rtt {rtt}, jitter {s['jitter_ms']:.1f} ms, "
+                         f"{s['gaps']} gaps, wire/raw {s['compression']:.2f}")
+    s = api_rate_limiter.stats()
+    lines.append(f"rate limiter: {s['acquired']} requests, {s['queue_depth']} waiting, "
+                 f"wait avg {s['avg_wait_sec']:.2f}s max {s['max_wait_sec']:.2f}s, "
+                 f"{s['rejected']} skipped, {s['throttled']} throttled by 429s")
+    print_neptr_status("Pipeline stats:\n" + "\n".join(lines))
+
+# -----------------------------
+# Headless API: typed or recorded utterances, no microphone
+# -----------------------------
+headless_sessions = collections.OrderedDict()
+headless_lock = threading.Lock()
+
+def headless_context(session: str):
+    """Each API session has its own history; the least recently used ones are forgotten"""
+    with headless_lock:
+        context = headless_sessions.pop(session, None)
+        if context is None:
+            context = ConversationContext(
+                NEPTR_SYSTEM_PROMPT,
+                token_budget=CONVERSATION_TOKEN_BUDGET if CONVERSATION_HISTORY_ENABLED else 0,
+                summary_tokens=CONVERSATION_SUMMARY_TOKENS if CONVERSATION_HISTORY_ENABLED else 0,
+                name=f"api:{session}",
+            )
+        headless_sessions[session] = context
+        while len(headless_sessions) > HEADLESS_API_SESSIONS:
+            headless_sessions.popitem(last=False)
+        return context
+
+def transcribe_pcm(pcm: bytes, sample_rate: int) -> str:
+    """Recognize one whole utterance with a pooled recognizer on the shared model"""
+    with recognizer_pool.recognizer(sample_rate) as recognizer:
+        recognizer.AcceptWaveform(pcm)
+        return json.loads(recognizer.FinalResult()).get("text", "")
+
+def answer_utterance(text: str, session: str):
+    """Same answer path as a spoken turn: precheck, local, cache, LLM race with the deadline and fallback"""
+    context = headless_context(session)
+    mark_latency(context.name, INTENT_DISPATCH)
+    try:
+        future = submit_command(text, context)
+        result = future.result(timeout=RESPONSE_DEADLINE_SEC)
+    except concurrent.futures.TimeoutError:
+        future.cancel()  # ends the race; a running LLM call may still cache its answer
+        result = None
+    source, reply = result if result else ("fallback", fallback_reply())
+    mark_latency(context.name, REPLY_COMPLETE)
+    if latency is not None:
+        latency.finish(context.name)
+    record_turn(text, reply, source, context)
+    return reply, source
+
+def observe_api_request(path, status, seconds):
+    metrics.api_request_seconds.observe(seconds, path=path)
+    metrics.api_responses.inc(path=path, code=str(status))
+
+def start_headless_api():
+    api = HeadlessAPI(transcribe=transcribe_pcm, respond=answer_utterance,
+                      synthesize=(lambda text: synthesize_pcm(text, VOICE_SPEED, VOICE_PITCH)) if USE_ESPEAK else None,
+                      latency=latency.snapshot if latency is not None else None,
+                      on_request=observe_api_request,
+                      trace=tracer.to_chrome if tracer is not None else None,
+                      log=print_neptr_status)
+    if HEADLESS_API_PORT:
+        api.serve_tcp(HEADLESS_API_HOST, HEADLESS_API_PORT)
+    if HEADLESS_API_SOCKET:
+        api.serve_unix(os.path.expanduser(HEADLESS_API_SOCKET))
+    return api
+
+def track_turn_latency(key):
+    """State machine listener: stamps intent dispatch and listen resume, closing the turn"""
+    def on_transition(record):
+        if record.new == THINKING and record.cause == "end of utterance":
+            mark_latency(key, INTENT_DISPATCH, record.at)
+        elif record.cause == "echo guard passed":
+            mark_latency(key, LISTEN_RESUME, record.at)
+            latency.finish(key)
+    return on_transition
+
+def trace_transitions(key):
+    """State machine listener: every state change (wake match, flush, reply...) as an instant event"""
+    def on_transition(record):
+        tracer.instant(f"{record.old} -> {record.new}", "conversation", room=key, cause=record.cause)
+    return on_transition
+
+def dump_latency():
+    """Print the per-stage latency histograms (and save them if LATENCY_DUMP_FILE is set)"""
+    if latency is None:
+        return
+    print_neptr_status("Latency per stage:\n" + latency.dump())
+    if LATENCY_DUMP_FILE:
+        latency.dump_json(os.path.expanduser(LATENCY_DUMP_FILE))
+
+def conversation_lines():
+    return {
+        "greeting": NEPTR_GREETINGS,
+        "goodbye": GOODBYE_MESSAGES,
+        "timeout": TIMEOUT_GOODBYE_MESSAGES,
+        "filler": NEPTR_FILLERS,
+    }
+
+def create_conversation_machine(room, speak, drain, inbox=None):
+    """Wire one room's conversation state machine to TTS, the answer pipeline and its audio queues"""
+    context = room.context
+
+    def on_reply(command, reply, source):
+        mark_latency(context.name, REPLY_COMPLETE)
+        record_turn(command, reply, source, context)
+
+    machine = ConversationMachine(
+        speak=speak,
+        submit=lambda command: submit_command(command, context),
+        wake_matcher=WakeMatcher(TRIGGERS),
+        goodbye_pat=GOODBYE_PAT,
+        lines=conversation_lines(),
+        fallback=fallback_reply,
+        flush_sec=BUFFER_FLUSH_SEC,
+        timeout_sec=CONVERSATION_TIMEOUT_SEC,
+        echo_guard_sec=ECHO_GUARD_SEC,
+        filler_after_sec=RESPONSE_FILLER_AFTER_SEC,
+        deadline_sec=RESPONSE_DEADLINE_SEC,
+        speculator=room.speculator,
+        drain=drain,
+        on_session_start=context.reset,
+        on_reply=on_reply,
+        log=(print_neptr_status if len(ROOMS) == 1
+             else lambda message: print_neptr_status(f"[{room.name}] {message}", room=room.name)),
+        trace_log=CONVERSATION_TRACE,
+        inbox=inbox,
+    )
+    if latency is not None:
+        machine.listeners.append(track_turn_latency(context.name))
+    if tracer is not None:
+        machine.listeners.append(trace_transitions(room.name))
+    return machine
+
+def create_rooms():
+    """One Room per ROOMS entry; all share the loaded model. Reports memory per room."""
+    rooms = []
+    for i, spec in enumerate(ROOMS):
+        before = rss_bytes()
+        room = Room(spec.get("name", f"room{i + 1}"), spec.get("input"), spec.get("output"))
+        # The first room keeps the module-level queue the legacy listeners use
+        room.capture = audio_q if i == 0 else StageQueue(
+            "capture", PIPELINE_QUEUE_SIZES["capture"], PIPELINE_QUEUE_POLICIES["capture"])
+        room.recognizer = new_recognizer(SAMPLE_RATE)
+        room.context = conversation_context if i == 0 else ConversationContext(
+            NEPTR_SYSTEM_PROMPT,
+            token_budget=CONVERSATION_TOKEN_BUDGET if CONVERSATION_HISTORY_ENABLED else 0,
+            summary_tokens=CONVERSATION_SUMMARY_TOKENS if CONVERSATION_HISTORY_ENABLED else 0,
+        )
+        room.context.name = room.name
+        room.speculator = create_speculator(room.context)
+        room.memory_bytes = rss_bytes() - before
+        rooms.append(room)
+
+    print_neptr_status(f"Vosk model: {model_memory_bytes / 1e6:.1f} MB (shared by {len(rooms)} room(s))")
+    for room in rooms:
+        print_neptr_status(f"Room '{room.name}': +{room.memory_bytes / 1e6:.1f} MB")
+    return rooms
+
+def create_pipeline(rooms):
+    """
+    Per room: capture (audio callback) -> vad (noise suppression, AGC, loudness) -> asr -> intent (state machine) -> tts,
+    connected by bounded queues with the shedding policies from config.py.
+    Recognition for all rooms shares one fair scheduler.
+    """
+    def stage(name, handler, **kwargs):
+        return Stage(name, handler, mode=PIPELINE_STAGE_MODES[name],
+                     maxsize=PIPELINE_QUEUE_SIZES.get(name, 16),
+                     policy=PIPELINE_QUEUE_POLICIES.get(name, "drop_oldest"),
+                     log=lambda message: print_neptr_status(message, logging.ERROR), **kwargs)
+
+    if PIPELINE_STAGE_MODES.get("asr", "thread") != "thread":
+        print_neptr_status(f"PIPELINE_STAGE_MODES['asr'] = {PIPELINE_STAGE_MODES['asr']!r} is ignored: recognition "
+                           f"runs on ROOM_ASR_WORKERS threads sharing one model", logging.WARNING)
+    workers = ROOM_ASR_WORKERS or min(len(rooms), os.cpu_count() or 1)
+    scheduler = FairScheduler("asr", workers=workers,
+                              log=lambda message: print_neptr_status(message, logging.ERROR))
+    stages, queues = [], []
+
+    for room in rooms:
+        suffix = f":{room.name}" if len(rooms) > 1 else ""
+        intent_q = StageQueue(f"intent{suffix}", PIPELINE_QUEUE_SIZES["intent"], PIPELINE_QUEUE_POLICIES["intent"])
+        room.tts = stage("tts", satellite_tts_stage(room.name) if room.is_satellite
+                         else tts_stage(room.name, room.output_device))
+        room.tts.name += suffix
+        lane = scheduler.add_lane(room.name, asr_stage(room.recognizer, room.name),
+                                  maxsize=PIPELINE_QUEUE_SIZES["asr"], policy=PIPELINE_QUEUE_POLICIES["asr"])
+
+        def drain(room=room, lane=lane):
+            # Throw away audio recorded while NEPTR was speaking
+            dropped = room.capture.qsize() + lane.inbox.qsize()
+            room.capture.clear()
+            lane.inbox.clear()
+            if tracer is not None:
+                tracer.instant("drain_queue", "audio", room=room.name, dropped=dropped)
+
+        room.machine = create_conversation_machine(room, speak=room.tts.submit, drain=drain, inbox=intent_q)
+        room.tts.output = room.machine.post
+
+        def on_transcript(event, room=room):
+            # Only a command heard while listening starts a turn; wake phrases said in idle
+            # would leave stale marks that the next turn's latency is measured from
+            if event.final and room.machine.state == LISTENING:
+                # The user stopped talking around the last loud block before this transcript
+                mark_latency(room.name, FINAL_TRANSCRIPT)
+                if room.last_voice_at is not None:
+                    mark_latency(room.name, SPEECH_END, room.last_voice_at)
+            room.machine.post(event)
+
+        lane.output = on_transcript
+
+        def gate(item, room=room):
+            # Only recognize audio while NEPTR isn't speaking or thinking in this room
+            machine = room.machine
+            data, rms, agc_state = item
+            room.agc_state = agc_state
+            if machine.accepting_audio:
+                threshold = agc_state.silence_threshold if agc_state is not None else RMS_SILENCE_THRESHOLD
+                if rms > threshold:
+                    room.last_voice_at = time.monotonic()
+                scheduler.submit(room.name, (data, rms, room.speculator is not None and machine.state == LISTENING))
+
+        # Freeze the AGC while NEPTR speaks or thinks, so its own echo doesn't pull the gain down
+        adapting = multiprocessing.Value("b", True, lock=False)
+        room.machine.listeners.append(
+            lambda record, machine=room.machine, adapting=adapting: setattr(adapting, "value", machine.accepting_audio))
+        suppressor = NoiseSuppressor(gain_floor=NOISE_GAIN_FLOOR) if NOISE_REDUCTION else None
+        vad = stage("vad", vad_stage(suppressor, create_agc(), adapting), output=gate, inbox=room.capture)
+        vad.name += suffix
+        stages += [vad, room.tts]
+        queues += [lane, intent_q]
+
+    return Pipeline(stages + [scheduler], queues=queues)
+
+def collect_metrics(rooms, pipeline):
+    """Refresh the metrics that mirror numbers kept elsewhere; runs on each scrape"""
+    for name, s in (pipeline.stats() if pipeline is not None else {}).items():
+        if "occupancy" in s:
+            metrics.queue_depth.set(s["occupancy"], queue=name)
+            metrics.queue_drops.set(s["drops"], queue=name)
+    for room in rooms:
+        metrics.wake_detections.set(room.machine.counters["wake_detections"], room=room.name)
+        metrics.wake_suppressed.set(room.machine.counters["wake_suppressed"], room=room.name)
+        if room.agc_state is not None:
+            metrics.agc_gain.set(room.agc_state.gain, room=room.name)
+            metrics.noise_floor.set(room.agc_state.noise_floor, room=room.name)
+            metrics.silence_threshold.set(room.agc_state.silence_threshold, room=room.name)
+        audio = metrics.asr_audio_seconds.get(room=room.name)
+        if audio:
+            metrics.asr_real_time_factor.set(metrics.asr_decode_seconds.get(room=room.name) / audio, room=room.name)
+    if semantic_cache is not None:
+        stats = semantic_cache.stats()
+        metrics.cache_lookups.set(stats["hits"], result="hit")
+        metrics.cache_lookups.set(stats["misses"], result="miss")
+        metrics.cache_hit_ratio.set(stats["hit_rate"])
+    metrics.set_rate_limiter(api_rate_limiter.stats())
+    if llm_backend is not None:
+        metrics.llm_circuit_open.set(int(llm_breaker.state != "closed"), backend=llm_backend.name)
+    metrics.resident_memory.set(rss_bytes())
+    metrics.cpu_seconds.set(time.process_time())
+
+def start_metrics(rooms, pipeline):
+    metrics.add_collector(lambda: collect_metrics(rooms, pipeline))
+    server = start_metrics_server(metrics, METRICS_HOST, METRICS_PORT, routes={
+        "/debug/profile/start": start_profiling,
+        "/debug/profile/stop": stop_profiling,
+    })
+    print_neptr_status(f"Metrics at http://{METRICS_HOST}:{server.server_address[1]}/metrics")
+    return server
+
+def clear_headless_sessions():
+    with headless_lock:
+        headless_sessions.clear()
+
+def create_memory_budget(rooms):
+    """What NEPTR's memory is made of; the shedders are listed cheapest to lose first"""
+    budget = MemoryBudget(MEMORY_BUDGET_MB * 1_000_000 if LOW_MEMORY_MODE else 0,
+                          log=lambda message: print_neptr_status(message, logging.WARNING))
+    budget.add("vosk model", size=lambda: model_memory_bytes)
+    for room in rooms:
+        budget.add(f"room {room.name}", size=lambda room=room: room.memory_bytes)
+    budget.add("queued audio", size=lambda: sum(room.capture.qsize() for room in rooms) * BLOCK_SIZE * 2)
+    budget.add("recognizer pool", shed=recognizer_pool.shed)
+    if tracer is not None:
+        # Roughly 200 bytes per event tuple with its args
+        budget.add("trace buffer", size=lambda: len(tracer.events) * 200, shed=tracer.clear)
+    budget.add("api sessions", shed=clear_headless_sessions)
+    if semantic_cache is not None:
+        budget.add("semantic cache", size=semantic_cache.memory_bytes, shed=semantic_cache.clear)
+    return budget
+
+def watch_memory(budget, stop):
+    """Enforce the budget every MEMORY_CHECK_SEC (less often while shedding doesn't help)"""
+    next_report = time.monotonic() + MEMORY_REPORT_SEC
+    while not stop.wait(MEMORY_CHECK_SEC * budget.backoff):
+        budget.check()
+        if MEMORY_REPORT_SEC and time.monotonic() >= next_report:
+            next_report += MEMORY_REPORT_SEC
+            print_neptr_status(budget.report())
+
+def start_memory_watch(rooms, stop):
+    budget = create_memory_budget(rooms)
+    print_neptr_status(budget.report())
+    if budget.limit_bytes or MEMORY_REPORT_SEC:
+        threading.Thread(target=watch_memory, args=(budget, stop), name="neptr-memory", daemon=True).start()
+    return budget
+
+# -----------------------------
+# Hot config reload
+# -----------------------------
+def running_settings():
+    return {name: value for name, value in globals().items() if name.isupper()}
+
+def apply_config(changes, rooms):
+    """Swap in reloaded settings: module globals first, then the objects that were built from them"""
+    # One dict update with the GIL held, so no thread sees half of the new settings
+    globals().update(changes)
+    if "LOG_LEVEL" in changes:
+        log.setLevel(LOG_LEVEL.upper())
+    if llm_backend is not None:
+        # The backend keeps the model name it was built with; the next request uses the new one
+        llm_backend.model = OPENAI_MODEL if LLM_BACKEND == "openai" else LOCAL_LLM_MODEL
+    api_rate_limiter.configure(rate=1.0 / API_RATE_LIMIT_SECONDS if API_RATE_LIMIT_SECONDS > 0 else 0.0,
+                               burst=API_RATE_LIMIT_BURST)
+    if semantic_cache is not None:
+        semantic_cache.threshold = SEMANTIC_CACHE_THRESHOLD
+        semantic_cache.top_k = SEMANTIC_CACHE_TOP_K
+        semantic_cache.ttl_sec = SEMANTIC_CACHE_TTL_SEC
+
+    with headless_lock:
+        contexts = {id(c): c for c in [conversation_context, *headless_sessions.values(), *(r.context for r in rooms)]}
+    for context in contexts.values():
+        context.token_budget = CONVERSATION_TOKEN_BUDGET if CONVERSATION_HISTORY_ENABLED else 0
+        context.summary_tokens = CONVERSATION_SUMMARY_TOKENS if CONVERSATION_HISTORY_ENABLED else 0
+
+    # Compiled here, swapped in by each room's own thread between events
+    wake_matcher = WakeMatcher(TRIGGERS) if "TRIGGERS" in changes else None
+    for room in rooms:
+        if room.speculator is not None:
+            room.speculator.stable_sec = SPECULATION_STABLE_SEC
+        settings = dict(lines=conversation_lines(), flush_sec=BUFFER_FLUSH_SEC,
+                        timeout_sec=CONVERSATION_TIMEOUT_SEC, echo_guard_sec=ECHO_GUARD_SEC,
+                        filler_after_sec=RESPONSE_FILLER_AFTER_SEC, deadline_sec=RESPONSE_DEADLINE_SEC,
+                        trace_log=CONVERSATION_TRACE)
+        if wake_matcher is not None:
+            settings["wake_matcher"] = wake_matcher
+        room.machine.post(Reconfigure(settings))
+
+def start_config_reload(rooms, stop):
+    """Reload config.py on CONFIG_RELOAD_SIGNAL and, every CONFIG_WATCH_SEC, when it changes"""
+    config_module = sys.modules.get("config")
+    if config_module is None or not (CONFIG_RELOAD_SIGNAL or CONFIG_WATCH_SEC):
+        return None
+    reloader = ConfigReloader(
+        config_module.__file__,
+        current=running_settings,
+        apply=lambda changes: apply_config(changes, rooms),
+        adjust=low_memory_settings if LOW_MEMORY_MODE else None,
+        log=print_neptr_status,
+    )
+    if CONFIG_RELOAD_SIGNAL:
+        signal.signal(getattr(signal, CONFIG_RELOAD_SIGNAL),
+                      lambda signum, frame: threading.Thread(target=reloader.reload, name="neptr-config").start())
+    if CONFIG_WATCH_SEC:
+        threading.Thread(target=reloader.watch, args=(stop, CONFIG_WATCH_SEC), name="neptr-config-watch",
+                         daemon=True).start()
+    return reloader
+
 # -----------------------------
 # Main loop with improved feedback
 # -----------------------------
+def run_headless():
+    """Serve only the headless API (no microphone, no speakers)"""
+    print_neptr_status("Running headless - answering the API only. Press Ctrl+C to exit")
+    llm_breaker.start()
+    api = start_headless_api()
+    metrics_server = start_metrics([], None) if METRICS_ENABLED else None
+    install_trace_signal()
+    install_profile_signals()
+    stop = threading.Event()
+    start_memory_watch([], stop)
+    start_config_reload([], stop)
+    while not should_exit:
+        try:
+            time.sleep(0.2)
+        except KeyboardInterrupt:
+            break
+    stop.set()
+    api.stop()
+    if metrics_server is not None:
+        metrics_server.shutdown()
+    dump_latency()
+    print_neptr_status("Shutting down. Goodbye!")
+
 def main():
-    global should_exit, is_listening, in_conversation, last_speech_time, conversation_buffer, last_buffer_update, speaking_until
-    
     print_neptr_status("Initializing...")
     print_neptr_status("NEPTR is now listening! Say 'hello neptr' to start a conversation!")
     print_neptr_status("Once in conversation mode, just talk naturally - no need to say 'hello neptr' again!")
     print_neptr_status("Say 'goodbye' to end the conversation and return to wake word mode.")
     print_neptr_status("Press Ctrl+C to exit")
     print()
-    
-    # Start listening
-    is_listening = True
-    in_conversation = False
 
-    with sd.RawInputStream(samplerate=SAMPLE_RATE, blocksize=BLOCK_SIZE,
-                           dtype='int16', channels=1, callback=callback):
+    rooms = create_rooms()
+    pipeline = create_pipeline(rooms)
+    pipeline.start()
+    start_satellites(rooms)
+    api = start_headless_api() if HEADLESS_API_ENABLED else None
+    metrics_server = start_metrics(rooms, pipeline) if METRICS_ENABLED else None
+    install_trace_signal()
+    install_profile_signals()
+
+    # Watch for the AI backend coming back while the circuit is open
+    llm_breaker.start()
+
+    # Each room's conversation logic (its intent stage) runs on its own thread, driven by events and timers
+    stop = threading.Event()
+    start_memory_watch(rooms, stop)
+    start_config_reload(rooms, stop)
+    machine_threads = []
+    for room in rooms:
+        thread = threading.Thread(target=room.machine.run, args=(stop,), name=f"neptr-intent-{room.name}", daemon=True)
+        thread.start()
+        machine_threads.append(thread)
+
+    next_report = time.monotonic() + PIPELINE_REPORT_SEC
+    with contextlib.ExitStack() as streams:
+        for room in rooms:
+            if room.is_satellite:
+                continue
+            streams.enter_context(open_capture_stream(room))
         while not should_exit:
             try:
-                data = audio_q.get(timeout=1.0)  # Add timeout to allow for graceful exit
-                
-                # Only process audio if we're listening (not speaking) and not in speaking buffer period
-                if is_listening and time.time() > speaking_until and wake_rec.AcceptWaveform(data):
-                    res = json.loads(wake_rec.Result())
-                    transcript = res.get("text", "").lower().strip()
-                    
-                    if transcript:
-                        print_neptr_status(f"Heard: '{transcript}'")
-
-                        # Check if we're in conversation mode or need to detect wake word
-                        if not in_conversation:
-                            # Wake word detection (only when not in conversation)
-                            wake_detected = False
-                            
-                            # First check for exact matches
-                            for trigger in TRIGGERS:
-                                if trigger in transcript:
-                                    wake_detected = True
-                                    break
-                            
-                            # Then check for specific misheard patterns
-                            if not wake_detected:
-                                # Check for "hello" + any neptr-like word
-                                if "hello" in transcript:
-                                    neptr_variations = ["neptr", "nepter", "nectar", "after", "nefter", "nefther", "nepther", "neptar", "neptor", "neptur", "napster", "nester", "nestor", "nexter"]
-                                    for variation in neptr_variations:
-                                        if variation in transcript:
-                                            wake_detected = True
-                                            break
-                                
-                                # Check for "hey" + any neptr-like word
-                                elif "hey" in transcript:
-                                    neptr_variations = ["neptr", "nepter", "nectar", "after", "nefter", "nefther", "nepther", "neptar", "neptor", "neptur", "napster", "nester", "nestor", "nexter"]
-                                    for variation in neptr_variations:
-                                        if variation in transcript:
-                                            wake_detected = True
-                                            break
-                                
-                                # Check for "hi" + any neptr-like word
-                                elif "hi" in transcript:
-                                    neptr_variations = ["neptr", "nepter", "nectar", "after", "nefter", "nefther", "nepther", "neptar", "neptor", "neptur", "napster", "nester", "nestor", "nexter"]
-                                    for variation in neptr_variations:
-                                        if variation in transcript:
-                                            wake_detected = True
-                                            break
-                            
-                            if wake_detected:
-                                # Start conversation mode
-                                in_conversation = True
-                                last_speech_time = time.time()  # Initialize speech time
-                                conversation_buffer = ""  # Initialize conversation buffer
-                                last_buffer_update = time.time()
-                                greeting = random.choice(NEPTR_GREETINGS)
-                                print_neptr_status("Wake word detected! Starting conversation mode...")
-                                tts(greeting)
-                                
-                                # Start continuous conversation mode immediately
-                                print_neptr_status("I'm now in continuous conversation mode! Just talk naturally - I'll listen to everything you say!")
-                                print_neptr_status("Say 'goodbye' to end our conversation or I'll go to sleep after 30 seconds of silence.")
-                                is_listening = True
-                        
-                        else:
-                            # We're in conversation mode - add to buffer
-                            if transcript.strip():
-                                # Add to conversation buffer
-                                if conversation_buffer:
-                                    conversation_buffer += " " + transcript.strip()
-                                else:
-                                    conversation_buffer = transcript.strip()
-                                last_buffer_update = time.time()
-                                last_speech_time = time.time()
-                            
-                            is_listening = True
-                
-                # Buffer processing - runs every loop iteration (outside transcript block)
-                if in_conversation:
-                    # Check if we should process the buffer (2 seconds of silence)
-                    current_time = time.time()
-                    if conversation_buffer and (current_time - last_buffer_update) >= 2.0:
-                        command = conversation_buffer
-                        
-                        # Check for goodbye
-                        if GOODBYE_PAT.search(command):
-                            goodbye_messages = [
-                                "Goodbye! It was great talking with you! Beep boop!",
-                                "See you later! Thanks for the conversation! Whirr!",
-                                "Farewell, friend! I'll be here whenever you need me! Zap!",
-                                "Bye bye! Come back soon for more pie-throwing adventures! Bleep!",
-                                "Goodbye! I'll miss our chat! Beep boop whirr!"
-                            ]
-                            reply = random.choice(goodbye_messages)
-                            print_neptr_status(f"Reply: {reply}")
-                            tts(reply)
-                            in_conversation = False
-                            conversation_buffer = ""
-                            print_neptr_status("Conversation ended. Say 'Hello Neptr' to start a new conversation.")
-                        else:
-                            # Process as normal command
-                            print_neptr_status(f"Command: '{command}'")
-                            reply = handle_intent(command)
-                            print_neptr_status(f"Reply: {reply}")
-                            tts(reply)
-                        
-                        print()  # Add spacing between interactions
-                        conversation_buffer = ""  # Clear buffer after processing
-                
-                # Check for conversation timeout (30 seconds of silence) - runs every loop iteration
-                if in_conversation and last_speech_time > 0:
-                    time_since_speech = time.time() - last_speech_time
-                    if time_since_speech >= 30.0:
-                        # 30 seconds of silence - timeout and say goodbye
-                        timeout_goodbye_messages = [
-                            "I haven't heard anything for a while. I'll go back to sleep now! Goodbye! Beep boop!",
-                            "It's been quiet for a bit. I'll take a nap! See you later! Whirr!",
-                            "No one's talking, so I'll go back to sleep! Farewell! Zap!",
-                            "I'm getting sleepy from the silence. Goodbye for now! Bleep!",
-                            "Time for me to rest! I'll be here when you need me! Beep boop whirr!"
-                        ]
-                        reply = random.choice(timeout_goodbye_messages)
-                        print_neptr_status(f"Reply: {reply}")
-                        tts(reply)
-                        in_conversation = False
-                        last_speech_time = 0
-                        print_neptr_status("Conversation timed out. Say 'Hello Neptr' to start a new conversation.")
-                        print()  # Add spacing
-                            
-            except queue.Empty:
-                continue
+                time.sleep(0.2)
+                if PIPELINE_REPORT_SEC and time.monotonic() >= next_report:
+                    next_report += PIPELINE_REPORT_SEC
+                    print_pipeline_stats(pipeline)
             except KeyboardInterrupt:
                 break
-            except Exception as e:
-                print_neptr_status(f"Error: {e}")
-                continue
 
+    stop.set()
+    for thread in machine_threads:
+        thread.join(timeout=2.0)
+    pipeline.stop()
+    print_pipeline_stats(pipeline)
+    dump_latency()
+    if satellite_server is not None:
+        satellite_server.stop()
+    if api is not None:
+        api.stop()
+    if metrics_server is not None:
+        metrics_server.shutdown()
+    response_pipeline.shutdown()
+    print_speculation_stats(rooms)
     print_neptr_status("Shutting down. Goodbye!")
 
 if __name__ == "__main__":
-    main()
+    if "--headless" in sys.argv[1:]:
+        run_headless()
+    else:
+        main()
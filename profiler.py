@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+On-demand sampling profiler for NEPTR
+A background thread snapshots the stack of every Python thread (including the
+PortAudio callback thread while it runs Python code) a hundred times a second.
+Nothing is traced per call, so it can be switched on in a deployed unit that
+has started lagging, without a restart:
+
+    kill -USR1 <pid>     # start sampling
+    kill -USR2 <pid>     # stop and write neptr-profile.collapsed
+
+The output is in collapsed-stack format (one "thread;outer;...;inner count"
+line per distinct stack), ready for flamegraph.pl or speedscope.app, and a
+per-function table of self and total samples is printed. Samples are
+wall-clock: a thread blocked on a queue shows up in the queue's wait().
+"""
+
+import collections
+import os
+import sys
+import threading
+import time
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    def __init__(self, interval=0.01, max_depth=128):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self.started_at = None
+        self.duration = 0.0
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self) -> bool:
+        """Start sampling from scratch; False if it is already running"""
+        with self._lock:
+            if self._thread is not None:
+                return False
+            self.stacks.clear()
+            self.samples = 0
+            self.started_at = time.monotonic()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="neptr-profiler", daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self) -> bool:
+        """Stop sampling (the samples are kept); False if it wasn't running"""
+        with self._lock:
+            if self._thread is None:
+                return False
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self.duration = time.monotonic() - self.started_at
+            return True
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample(skip=me)
+
+    def sample(self, skip=None):
+        """Record the current stack of every thread but `skip`"""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == skip:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            self.stacks[tuple(reversed(stack))] += 1
+        self.samples += 1
+
+    def collapsed(self) -> str:
+        """Collapsed stacks, most frequent first (flamegraph.pl / speedscope input)"""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def functions(self):
+        """[(function, self samples, total samples)] sorted by self time"""
+        self_counts, total_counts = collections.Counter(), collections.Counter()
+        for stack, count in self.stacks.items():
+            frames = stack[1:]
+            if not frames:
+                continue
+            self_counts[frames[-1]] += count
+            for function in set(frames):
+                total_counts[function] += count
+        return sorted(((f, self_counts[f], total_counts[f]) for f in total_counts),
+                      key=lambda row: (-row[1], -row[2], row[0]))
+
+    def report(self, limit=20) -> str:
+        stacks = sum(self.stacks.values())
+        if not stacks:
+            return "no samples"
+        lines = [f"{self.samples} samples over {self.duration:.1f}s ({stacks} thread stacks)",
+                 f"{'self':>6} {'total':>6}  function"]
+        for function, own, total in self.functions()[:limit]:
+            lines.append(f"{own / stacks:>6.1%} {total / stacks:>6.1%}  {function}")
+        return "\n".join(lines)
+
+    def write(self, path):
+        with open(path, "w") as f:
+            f.write(self.collapsed())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Token-bucket rate limiter for NEPTR's API calls
+Only the thread making the API request waits; capture and recognition never do.
+"""
+
+import email.utils
+import threading
+import time
+
+
+def parse_retry_after(value, default=5.0) -> float:
+    """Seconds to back off from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+        return max(0.0, when.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+class TokenBucket:
+    """
+    Token bucket allowing `burst` back-to-back requests and `rate` requests per
+    second after that. Implemented as a virtual-scheduling (GCRA) bucket so each
+    caller reserves its slot under the lock and sleeps outside of it.
+    """
+
+    def __init__(self, rate=1.0, burst=1, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.tolerance = self.interval * max(0, burst - 1)
+        self._clock = clock
+        self._sleep = sleep
+        self._tat = 0.0  # theoretical arrival time of the next request
+        self._lock = threading.Lock()
+
+        self.waiting = 0
+        self.acquired = 0
+        self.rejected = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_retry_after = 0.0
+
+    def configure(self, rate, burst):
+        """Change the rate and burst in place; slots already reserved stand"""
+        with self._lock:
+            self.interval = 1.0 / rate if rate > 0 else 0.0
+            self.tolerance = self.interval * max(0, burst - 1)
+
+    def reserve(self, max_wait=None):
+        """Reserve a slot; returns seconds to wait, or None if it exceeds max_wait"""
+        with self._lock:
+            now = self._clock()
+            tat = max(self._tat, now)
+            wait = max(0.0, tat - self.tolerance - now)
+            if max_wait is not None and wait > max_wait:
+                self.rejected += 1
+                return None
+            self._tat = tat + self.interval
+            self.acquired += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            return wait
+
+    def acquire(self, max_wait=None):
+        """Block the calling thread until a request is allowed; None if it would take too long"""
+        wait = self.reserve(max_wait)
+        if wait:
+            with self._lock:
+                self.waiting += 1
+            try:
+                self._sleep(wait)
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+        return wait
+
+    def penalize(self, retry_after: float):
+        """Hold back every request for retry_after seconds (HTTP 429)"""
+        with self._lock:
+            self.throttled += 1
+            self.last_retry_after = retry_after
+            self._tat = max(self._tat, self._clock() + retry_after + self.tolerance)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "queue_depth": self.waiting,
+                "acquired": self.acquired,
+                "rejected": self.rejected,
+                "throttled": self.throttled,
+                "avg_wait_sec": self.total_wait / self.acquired if self.acquired else 0.0,
+                "max_wait_sec": self.max_wait,
+                "last_retry_after_sec": self.last_retry_after,
+            }
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Asynchronous response pipeline for NEPTR
+Races the answer sources (local intents, answer cache, LLM) on an asyncio loop.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+
+
+class ResponsePipeline:
+    """
+    Run answer sources concurrently and take the first non-empty answer.
+
+    sources is a list of (name, func, start_delay) tuples. func(text) returns a
+    reply string or None and runs on a worker thread. start_delay hedges slow,
+    costly sources: they are only started if nothing has answered by then.
+    Extra arguments given to submit() are passed to every func after the text.
+    Each source has its own pool of max_workers threads, so instant answers
+    never queue behind slow LLM calls that a cancelled race left running.
+    The filler line, deadline and fallback are the conversation machine's job;
+    cancelling the future (as the machine does at the deadline) ends the race.
+    """
+
+    def __init__(self, sources, max_workers=4, log=print):
+        self.sources = sorted(sources, key=lambda source: source[2])
+        self.log = log
+
+        self._executors = {
+            name: concurrent.futures.ThreadPoolExecutor(max_workers=max_workers,
+                                                        thread_name_prefix=f"neptr-intent-{name}")
+            for name, _, _ in self.sources}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever,
+                                        name="neptr-response-loop", daemon=True)
+        self._thread.start()
+
+    async def _race(self, text, *args):
+        loop = asyncio.get_running_loop()
+        pending = {}
+        waiting = list(self.sources)
+        started_at = loop.time()
+
+        try:
+            while waiting or pending:
+                # Launch every source whose hedge delay has elapsed
+                while waiting and loop.time() - started_at >= waiting[0][2]:
+                    name, func, _ = waiting.pop(0)
+                    pending[loop.run_in_executor(self._executors[name], func, text, *args)] = name
+
+                timeout = None
+                if waiting:
+                    timeout = max(0.0, waiting[0][2] - (loop.time() - started_at))
+                if not pending:
+                    await asyncio.sleep(timeout)
+                    continue
+
+                done, _ = await asyncio.wait(pending, timeout=timeout,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = pending.pop(task)
+                    try:
+                        reply = task.result()
+                    except Exception as e:
+                        self.log(f"Answer source '{name}' failed: {e}")
+                        continue
+                    if reply:
+                        return name, reply
+            return None
+        finally:
+            # Losers (or every source, if the race was cancelled) are dropped here.
+            # Sources already running keep their worker thread and may still
+            # cache their answer for next time; ones not yet started never run.
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    def submit(self, text, *args) -> concurrent.futures.Future:
+        """Start racing the sources; the future resolves to (source, reply) or None"""
+        return asyncio.run_coroutine_threadsafe(self._race(text, *args), self._loop)
+
+    def shutdown(self, timeout=1.0):
+        """Cancel any races still running, then stop the loop and the workers"""
+        async def cancel_races():
+            races = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in races:
+                task.cancel()
+            await asyncio.gather(*races, return_exceptions=True)
+
+        if self._loop.is_running():
+            try:
+                asyncio.run_coroutine_threadsafe(cancel_races(), self._loop).result(timeout=timeout)
+            except concurrent.futures.TimeoutError:
+                self.log("Response races did not stop in time")
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=timeout)
+        if not self._thread.is_alive() and not self._loop.is_closed():
+            self._loop.close()
+        for executor in self._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
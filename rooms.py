@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Multi-room support for NEPTR
+One process serves several microphones. All rooms share the loaded Vosk model;
+each room keeps its own recognizer, conversation and history. Recognition for
+every room runs on one small pool of workers that always picks the backlogged
+room which has used the least recognizer time so far, so a noisy room cannot
+starve a quiet one.
+"""
+
+import os
+import resource
+import sys
+import threading
+import time
+
+from stages import DROP_OLDEST, THREAD, StageQueue
+
+# ROOMS "input" value for a room whose microphone streams in over the network
+SATELLITE = "satellite"
+
+
+def rss_bytes() -> int:
+    """Current resident memory of this process (peak RSS where /proc is missing)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Room:
+    """Everything one microphone needs: its queues, recognizer and conversation"""
+
+    def __init__(self, name, input_device=None, output_device=None):
+        self.name = name
+        self.input_device = input_device
+        self.output_device = output_device
+        self.capture = None
+        self.recognizer = None
+        self.context = None
+        self.speculator = None
+        self.machine = None
+        self.tts = None
+        self.memory_bytes = 0
+        self.last_voice_at = None
+        self.agc_state = None
+
+    @property
+    def is_satellite(self) -> bool:
+        return self.input_device == SATELLITE
+
+
+class Lane:
+    """One room's share of the fair scheduler"""
+
+    def __init__(self, name, handler, output, maxsize, policy):
+        self.name = name
+        self.handler = handler
+        self.output = output
+        self.inbox = StageQueue(name, maxsize, policy)
+        self.vtime = 0.0
+        self.busy = False
+        self.processed = 0
+        self.errors = 0
+        self.busy_sec = 0.0
+        self.share = 0.0
+
+    def stats(self) -> dict:
+        stats = {"mode": "scheduled", "processed": self.processed, "errors": self.errors,
+                 "busy_sec": self.busy_sec, "share": self.share}
+        stats.update(self.inbox.stats())
+        return stats
+
+
+class FairScheduler:
+    """
+    Runs each lane's handler on a shared worker pool. A lane is handled by at
+    most one worker at a time (recognizers are stateful and not thread-safe).
+    Handler errors are counted per lane and reported through log(message).
+    """
+
+    def __init__(self, name="asr", workers=1, log=print):
+        self.name = name
+        self.log = log
+        self.mode = THREAD
+        self.workers = max(1, workers)
+        self.lanes = {}
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def add_lane(self, name, handler, output=None, maxsize=16, policy=DROP_OLDEST) -> Lane:
+        lane = Lane(f"{self.name}:{name}", handler, output, maxsize, policy)
+        with self._cond:
+            self.lanes[name] = lane
+        return lane
+
+    def submit(self, name, item):
+        lane = self.lanes[name]
+        with self._cond:
+            if lane.inbox.empty() and not lane.busy:
+                # A room waking up starts level with the others instead of
+                # spending the credit it built up while it was idle
+                backlogged = [other.vtime for other in self.lanes.values()
+                              if other is not lane and (other.busy or not other.inbox.empty())]
+                if backlogged:
+                    lane.vtime = max(lane.vtime, min(backlogged))
+        # Outside the scheduler lock: with the "block" policy a full lane waits
+        # here for a worker, and the worker needs the lock to take from it
+        lane.inbox.put(item)
+        with self._cond:
+            self._cond.notify()
+
+    def _next_lane(self):
+        ready = [lane for lane in self.lanes.values() if not lane.busy and not lane.inbox.empty()]
+        return min(ready, key=lambda lane: lane.vtime) if ready else None
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self._cond:
+                lane = self._next_lane()
+                if lane is None:
+                    self._cond.wait(0.25)
+                    continue
+                lane.busy = True
+                item = lane.inbox.get_nowait()
+
+            start = time.perf_counter()
+            try:
+                result = lane.handler(item)
+            except Exception as e:
+                lane.errors += 1
+                result = None
+                self.log(f"Room '{lane.name}' error: {e}")
+            elapsed = time.perf_counter() - start
+
+            with self._cond:
+                lane.busy = False
+                lane.vtime += elapsed
+                lane.busy_sec += elapsed
+                lane.processed += 1
+                total = sum(other.busy_sec for other in self.lanes.values()) or 1.0
+                for other in self.lanes.values():
+                    other.share = other.busy_sec / total
+                self._cond.notify()
+
+            if result is not None and lane.output is not None:
+                lane.output(result)
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"neptr-{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+
+    def stats(self) -> dict:
+        return {"mode": f"{self.workers} workers",
+                "processed": sum(lane.processed for lane in self.lanes.values()),
+                "busy_sec": sum(lane.busy_sec for lane in self.lanes.values())}
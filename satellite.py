@@ -0,0 +1,545 @@
+#!/usr/bin/env python3
+"""
+Satellite audio protocol for NEPTR
+Thin clients (Pi Zero-class boards with just a mic and a speaker) stream their
+microphone to a central NEPTR over TCP and play back the speech it sends.
+
+Every frame is a 20-byte header followed by the payload:
+
+    magic "NP" | type (1) | flags (1) | seq (4) | sent_at (8, float seconds) | length (4)
+
+Audio payloads are raw mono int16 PCM, zlib-compressed when that makes them
+smaller (flag bit 0). seq numbers audio frames only (per stream, per reply for
+speech); control frames carry 0. Run a satellite with:
+
+    python3 satellite.py --host neptr.local --name kitchen
+"""
+
+import argparse
+import collections
+import json
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+import zlib
+
+MAGIC = b"NP"
+HEADER = struct.Struct("!2sBBIdI")
+
+# Frame types
+HELLO = 1       # satellite -> neptr: JSON {"name", "sample_rate"}
+AUDIO = 2       # satellite -> neptr: microphone PCM
+TTS_START = 3   # neptr -> satellite: JSON {"sample_rate"}, plus {"filler": true} for a filler line
+TTS_AUDIO = 4   # neptr -> satellite: speech PCM
+TTS_END = 5     # neptr -> satellite: end of this reply
+PING = 6        # neptr -> satellite, echoed back as PONG with the same sent_at
+PONG = 7
+BYE = 8
+
+FLAG_ZLIB = 1
+MAX_PAYLOAD = 1 << 20
+
+Frame = collections.namedtuple("Frame", "type seq sent_at payload wire_bytes")
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def encode_frame(frame_type, seq, payload=b"", compress=False, sent_at=None) -> bytes:
+    flags = 0
+    if compress and payload:
+        packed = zlib.compress(payload, 1)
+        if len(packed) < len(payload):
+            payload, flags = packed, FLAG_ZLIB
+    sent_at = time.time() if sent_at is None else sent_at
+    return HEADER.pack(MAGIC, frame_type, flags, seq & 0xFFFFFFFF, sent_at, len(payload)) + payload
+
+
+def _read_exact(stream, size):
+    data = stream.read(size)
+    if len(data) < size:
+        return None
+    return data
+
+
+def read_frame(stream):
+    """Read one frame from a binary file-like object; None at end of stream"""
+    header = _read_exact(stream, HEADER.size)
+    if header is None:
+        return None
+    magic, frame_type, flags, seq, sent_at, length = HEADER.unpack(header)
+    if magic != MAGIC or length > MAX_PAYLOAD:
+        raise ProtocolError("bad frame header")
+    payload = _read_exact(stream, length) if length else b""
+    if payload is None:
+        return None
+    if flags & FLAG_ZLIB:
+        # MAX_PAYLOAD bounds the inflated size too, so a small frame can't expand into gigabytes
+        inflater = zlib.decompressobj()
+        payload = inflater.decompress(payload, MAX_PAYLOAD)
+        if inflater.unconsumed_tail:
+            raise ProtocolError("compressed frame inflates beyond MAX_PAYLOAD")
+    return Frame(frame_type, seq, sent_at, payload, HEADER.size + length)
+
+
+class JitterBuffer:
+    """
+    Smooths bursty arrival into steady playout. Frames are held until
+    target_frames are queued, then released in sequence order; late and
+    duplicate frames are dropped and a missing frame is skipped once enough
+    later ones are waiting.
+    """
+
+    def __init__(self, target_frames=3, max_frames=50):
+        self.target_frames = target_frames
+        self.max_frames = max_frames
+        self._frames = {}
+        self._next_seq = None
+        self._playing = False
+        self._draining = False
+        self._lock = threading.Lock()
+
+        self.received = 0
+        self.late = 0
+        self.lost = 0
+        self.overflows = 0
+        self.underruns = 0
+        self.drained = 0
+
+    def push(self, seq, payload):
+        with self._lock:
+            self.received += 1
+            if self._next_seq is None:
+                self._next_seq = seq
+            if seq < self._next_seq or seq in self._frames:
+                self.late += 1
+                return
+            self._frames[seq] = payload
+            if len(self._frames) > self.max_frames:
+                self._frames.pop(min(self._frames))
+                self.overflows += 1
+                self._next_seq = min(self._frames)
+
+    def drain(self):
+        """No more frames are coming for now: release the rest without prefilling"""
+        with self._lock:
+            self._draining = True
+
+    def pop(self):
+        """The next frame to play, or None while prefilling / starved"""
+        with self._lock:
+            if not self._playing:
+                if self._draining and not self._frames:
+                    # The reply ended while playout was starved (paced sending can underrun at the very end)
+                    self._draining = False
+                    self.drained += 1
+                    return None
+                if len(self._frames) < self.target_frames and not self._draining:
+                    return None
+                self._playing = True
+            if not self._frames:
+                self._playing = False
+                if self._draining:
+                    self.drained += 1
+                else:
+                    self.underruns += 1
+                self._draining = False
+                return None
+            if self._next_seq not in self._frames:
+                if len(self._frames) < self.target_frames and not self._draining:
+                    return None
+                skipped = min(self._frames) - self._next_seq
+                self.lost += skipped
+                self._next_seq += skipped
+            payload = self._frames.pop(self._next_seq)
+            self._next_seq += 1
+            return payload
+
+    def reset(self):
+        with self._lock:
+            self._frames.clear()
+            self._next_seq = None
+            self._playing = False
+            self._draining = False
+
+    def depth(self):
+        return len(self._frames)
+
+    def stats(self) -> dict:
+        return {"depth": len(self._frames), "received": self.received, "late": self.late,
+                "lost": self.lost, "overflows": self.overflows, "underruns": self.underruns}
+
+
+class LinkStats:
+    """Per-client counters plus RTT and RFC 3550-style interarrival jitter"""
+
+    def __init__(self):
+        self.frames = 0
+        self.audio_bytes = 0
+        self.wire_bytes = 0
+        self.gaps = 0
+        self.rtt_ms = None
+        self.avg_rtt_ms = None
+        self.jitter_ms = 0.0
+        self.connected_at = time.time()
+        self._last = None
+        self._last_seq = None
+
+    def record_audio(self, frame, pcm_bytes, arrived=None):
+        arrived = time.time() if arrived is None else arrived
+        self.frames += 1
+        self.audio_bytes += pcm_bytes
+        self.wire_bytes += frame.wire_bytes
+        if self._last_seq is not None and frame.seq != self._last_seq + 1:
+            self.gaps += 1
+        self._last_seq = frame.seq
+        if self._last is not None:
+            # Change in transit time; independent of clock offset between hosts
+            d = (arrived - self._last[0]) - (frame.sent_at - self._last[1])
+            self.jitter_ms += (abs(d) * 1000 - self.jitter_ms) / 16
+        self._last = (arrived, frame.sent_at)
+
+    def record_rtt(self, rtt_sec):
+        self.rtt_ms = rtt_sec * 1000
+        self.avg_rtt_ms = self.rtt_ms if self.avg_rtt_ms is None else 0.8 * self.avg_rtt_ms + 0.2 * self.rtt_ms
+
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "audio_bytes": self.audio_bytes,
+            "wire_bytes": self.wire_bytes,
+            "compression": self.wire_bytes / self.audio_bytes if self.audio_bytes else 1.0,
+            "gaps": self.gaps,
+            "rtt_ms": self.rtt_ms,
+            "avg_rtt_ms": self.avg_rtt_ms,
+            "jitter_ms": self.jitter_ms,
+            "connected_sec": time.time() - self.connected_at,
+        }
+
+
+class _Connection:
+    def __init__(self, name, sock, sample_rate):
+        self.name = name
+        self.sock = sock
+        self.sample_rate = sample_rate
+        self.stats = LinkStats()
+        self.lock = threading.Lock()
+
+    def send(self, frame_type, payload=b"", seq=0, compress=False, sent_at=None):
+        with self.lock:
+            self.sock.sendall(encode_frame(frame_type, seq, payload, compress, sent_at))
+
+
+class SatelliteServer(socketserver.ThreadingTCPServer):
+    """
+    Accepts satellites. on_connect(name, sample_rate) returns a callable that
+    receives the satellite's PCM blocks, or None to turn the satellite away.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, on_connect, compress=True, ping_sec=2.0, log=print):
+        super().__init__(address, SatelliteHandler)
+        self.on_connect = on_connect
+        self.compress = compress
+        self.ping_sec = ping_sec
+        self.log = log
+        self.clients = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    @property
+    def address(self):
+        return self.server_address[:2]
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="neptr-satellites", daemon=True).start()
+        if self.ping_sec:
+            threading.Thread(target=self._ping_loop, name="neptr-satellite-ping", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.shutdown()
+        with self._lock:
+            for conn in self.clients.values():
+                try:
+                    conn.sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        self.server_close()
+
+    def _ping_loop(self):
+        while not self._stop.wait(self.ping_sec):
+            with self._lock:
+                clients = list(self.clients.values())
+            for conn in clients:
+                try:
+                    conn.send(PING)
+                except OSError:
+                    pass
+
+    def connected(self, name) -> bool:
+        return name in self.clients
+
+    def send_speech(self, name, pcm, sample_rate, frame_ms=100, lead_frames=5, info=None):
+        """
+        Stream speech to a satellite; returns its duration in seconds, or None if
+        not connected. info is added to the TTS_START announcement. The first lead_frames go out at once to fill the client's
+        jitter buffer, the rest at real-time pace so a long reply never overflows
+        it. Returns once the last frame is sent, about duration - lead later.
+        """
+        conn = self.clients.get(name)
+        if conn is None:
+            return None
+        step = max(2, int(sample_rate * frame_ms / 1000) * 2)
+        try:
+            conn.send(TTS_START, json.dumps(dict(info or {}, sample_rate=sample_rate)).encode("utf-8"))
+            started = time.monotonic()
+            for seq, i in enumerate(range(0, len(pcm), step)):
+                delay = started + (seq - lead_frames) * frame_ms / 1000 - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                conn.send(TTS_AUDIO, pcm[i:i + step], seq=seq, compress=self.compress)
+            conn.send(TTS_END)
+        except OSError as e:
+            self.log(f"Satellite '{name}' send failed: {e}")
+            return None
+        return len(pcm) / 2 / sample_rate
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {name: conn.stats.stats() for name, conn in self.clients.items()}
+
+
+class SatelliteHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        server = self.server
+        try:
+            hello = read_frame(self.rfile)
+            if hello is None or hello.type != HELLO:
+                return
+            info = json.loads(hello.payload.decode("utf-8"))
+            name, sample_rate = info.get("name", ""), int(info.get("sample_rate", 16000))
+            sink = server.on_connect(name, sample_rate)
+            if sink is None:
+                server.log(f"Satellite '{name}' rejected")
+                return
+            conn = _Connection(name, self.request, sample_rate)
+            with server._lock:
+                server.clients[name] = conn
+            server.log(f"Satellite '{name}' connected from {self.client_address[0]}")
+
+            while True:
+                frame = read_frame(self.rfile)
+                if frame is None or frame.type == BYE:
+                    break
+                if frame.type == AUDIO:
+                    conn.stats.record_audio(frame, len(frame.payload))
+                    sink(frame.payload)
+                elif frame.type == PONG:
+                    conn.stats.record_rtt(time.time() - frame.sent_at)
+        except (OSError, ProtocolError, ValueError, zlib.error) as e:
+            server.log(f"Satellite connection error: {e}")
+        finally:
+            with server._lock:
+                name = next((n for n, c in server.clients.items() if c.sock is self.request), None)
+                if name is not None:
+                    del server.clients[name]
+                    server.log(f"Satellite '{name}' disconnected")
+
+
+def start_satellite_server(on_connect, host="0.0.0.0", port=0, compress=True, ping_sec=2.0, log=print):
+    """Start listening for satellites on a background thread; port 0 picks a free port"""
+    return SatelliteServer((host, port), on_connect, compress=compress, ping_sec=ping_sec, log=log).start()
+
+
+class SatelliteClient:
+    """
+    The satellite side: sends microphone PCM and plays speech through a jitter
+    buffer. on_audio(pcm, sample_rate) is called at real-time pace for playback.
+    send_audio() only queues the block (safe to call from the sound card
+    callback); a sender thread writes it to the socket, and when the network
+    stalls the oldest of send_queue_frames queued blocks are dropped.
+    """
+
+    def __init__(self, host, port, name, sample_rate=16000, compress=True,
+                 jitter_frames=3, frame_ms=100, on_audio=None, send_queue_frames=50):
+        self.host = host
+        self.port = port
+        self.name = name
+        self.sample_rate = sample_rate
+        self.compress = compress
+        self.frame_ms = frame_ms
+        self.on_audio = on_audio
+        self.jitter = JitterBuffer(target_frames=jitter_frames)
+        self.playback_rate = sample_rate
+        self.speech_info = {}
+        self.speech_started = 0
+        self._sock = None
+        self._seq = 0
+        self._outbox = queue.Queue(maxsize=send_queue_frames)
+        self.send_drops = 0
+        self._send_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def connect(self, timeout=5.0):
+        self._sock = socket.create_connection((self.host, self.port), timeout=timeout)
+        self._sock.settimeout(None)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._send(HELLO, json.dumps({"name": self.name, "sample_rate": self.sample_rate}).encode("utf-8"))
+        for target, name in ((self._read_loop, "reader"), (self._playout_loop, "playout"),
+                             (self._send_loop, "sender")):
+            thread = threading.Thread(target=target, name=f"satellite-{name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def _send(self, frame_type, payload=b"", seq=0, compress=False, sent_at=None):
+        with self._send_lock:
+            self._sock.sendall(encode_frame(frame_type, seq, payload, compress, sent_at))
+
+    def send_audio(self, pcm: bytes):
+        """Queue a microphone block for sending; never blocks"""
+        self._seq += 1
+        frame = (self._seq, pcm, time.time())
+        while True:
+            try:
+                self._outbox.put_nowait(frame)
+                return
+            except queue.Full:
+                try:
+                    self._outbox.get_nowait()
+                    self.send_drops += 1
+                except queue.Empty:
+                    pass
+
+    def _send_loop(self):
+        while not self._stop.is_set():
+            try:
+                seq, pcm, sent_at = self._outbox.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            try:
+                self._send(AUDIO, pcm, seq=seq, compress=self.compress, sent_at=sent_at)
+            except OSError:
+                self._stop.set()
+
+    def _read_loop(self):
+        stream = self._sock.makefile("rb")
+        try:
+            while not self._stop.is_set():
+                frame = read_frame(stream)
+                if frame is None:
+                    break
+                if frame.type == PING:
+                    self._send(PONG, sent_at=frame.sent_at)
+                elif frame.type == TTS_START:
+                    self.speech_info = json.loads(frame.payload.decode("utf-8"))
+                    self.playback_rate = self.speech_info["sample_rate"]
+                    self.jitter.reset()
+                    self.speech_started += 1
+                elif frame.type == TTS_AUDIO:
+                    self.jitter.push(frame.seq, frame.payload)
+                elif frame.type == TTS_END:
+                    self.jitter.drain()
+        except (OSError, ProtocolError, zlib.error):
+            pass
+        finally:
+            self._stop.set()
+
+    def _playout_loop(self):
+        interval = self.frame_ms / 1000
+        next_tick = time.monotonic()
+        while not self._stop.is_set():
+            pcm = self.jitter.pop()
+            if pcm is not None and self.on_audio:
+                self.on_audio(pcm, self.playback_rate)
+            next_tick += interval
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.monotonic()
+
+    @property
+    def closed(self) -> bool:
+        return self._stop.is_set()
+
+    def close(self):
+        self._stop.set()
+        if self._sock is not None:
+            # The sender may be stuck in sendall on a stalled link; don't wait on it to say goodbye
+            if self._send_lock.acquire(timeout=0.5):
+                try:
+                    self._sock.sendall(encode_frame(BYE, 0))
+                except OSError:
+                    pass
+                finally:
+                    self._send_lock.release()
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._sock.close()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+
+    def stats(self) -> dict:
+        return {"sent_frames": self._seq, "send_drops": self.send_drops, "speech_started": self.speech_started,
+                "speech_finished": self.jitter.drained, "jitter": self.jitter.stats()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a microphone to a central NEPTR")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7700)
+    parser.add_argument("--name", required=True, help="room name, must match an entry in ROOMS")
+    parser.add_argument("--rate", type=int, default=16000)
+    parser.add_argument("--block-ms", type=int, default=100)
+    parser.add_argument("--input", default=None, help="sounddevice input device")
+    parser.add_argument("--output", default=None, help="sounddevice output device")
+    parser.add_argument("--jitter-frames", type=int, default=3)
+    parser.add_argument("--no-compress", action="store_true")
+    args = parser.parse_args()
+
+    import sounddevice as sd
+
+    outputs = {}
+
+    def play(pcm, rate):
+        if rate not in outputs:
+            outputs[rate] = sd.RawOutputStream(samplerate=rate, channels=1, dtype="int16", device=args.output)
+            outputs[rate].start()
+        outputs[rate].write(pcm)
+
+    client = SatelliteClient(args.host, args.port, args.name, sample_rate=args.rate,
+                             compress=not args.no_compress, jitter_frames=args.jitter_frames,
+                             frame_ms=args.block_ms, on_audio=play).connect()
+    print(f"🛰️  Satellite '{args.name}' streaming to {args.host}:{args.port}")
+
+    def callback(indata, frames, time_info, status):
+        client.send_audio(bytes(indata))
+
+    try:
+        with sd.RawInputStream(samplerate=args.rate, blocksize=args.rate * args.block_ms // 1000,
+                               dtype="int16", channels=1, device=args.input, callback=callback):
+            while not client.closed:
+                time.sleep(1.0)
+        print("Connection to NEPTR lost")
+    except KeyboardInterrupt:
+        print("\nGoodbye! 🤖🥧")
+    finally:
+        client.close()
+        print(json.dumps(client.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
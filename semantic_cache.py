@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Semantic answer cache for NEPTR
+Answers near-duplicate questions ("what's your name" / "what is your name neptr")
+from a small local index instead of calling the API again.
+"""
+
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+# Words that carry no meaning for matching (wake words, politeness, fillers)
+_IGNORED_WORDS = {
+    "neptr", "nepter", "nectar", "robot", "hey", "hi", "hello",
+    "please", "um", "uh", "okay", "ok", "so", "well",
+}
+
+_CONTRACTIONS = {
+    "what's": "what is", "who's": "who is", "where's": "where is",
+    "how's": "how is", "it's": "it is", "that's": "that is",
+    "there's": "there is", "you're": "you are", "i'm": "i am",
+    "don't": "do not", "doesn't": "does not", "can't": "can not",
+    "won't": "will not", "isn't": "is not", "aren't": "are not",
+}
+
+_NUMBER_WORDS = {
+    "zero", "one", "two", "three", "four", "five", "six", "seven", "eight",
+    "nine", "ten", "eleven", "twelve", "thirteen", "fourteen", "fifteen",
+    "sixteen", "seventeen", "eighteen", "nineteen", "twenty", "thirty",
+    "forty", "fifty", "sixty", "seventy", "eighty", "ninety", "hundred",
+    "thousand", "million", "billion", "half", "quarter",
+}
+
+_WORD_PAT = re.compile(r"[a-z0-9']+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase, expand contractions and drop wake words/fillers"""
+    words = []
+    for word in _WORD_PAT.findall(text.lower()):
+        word = _CONTRACTIONS.get(word, word)
+        words.extend(w for w in word.split() if w not in _IGNORED_WORDS)
+    return " ".join(words)
+
+
+def _numbers(normalized: str) -> tuple:
+    """Numbers in a question must match exactly ("two plus two" != "two plus three")"""
+    return tuple(w for w in normalized.split() if w.isdigit() or w in _NUMBER_WORDS)
+
+
+def embed(text: str, dim: int = 512, ngram: int = 3) -> np.ndarray:
+    """
+    Cheap local embedding: signed hashed character n-grams plus word unigrams,
+    L2-normalized so a dot product is the cosine similarity.
+    """
+    vec = np.zeros(dim, dtype=np.float32)
+    normalized = normalize(text)
+    if not normalized:
+        return vec
+
+    features = [f"w:{w}" for w in normalized.split()]
+    padded = f" {normalized} "
+    features.extend(padded[i:i + ngram] for i in range(len(padded) - ngram + 1))
+
+    for feature in features:
+        h = zlib.crc32(feature.encode("utf-8"))
+        vec[h % dim] += 1.0 if (h >> 31) & 1 else -1.0
+
+    norm = np.linalg.norm(vec)
+    if norm > 0:
+        vec /= norm
+    return vec
+
+
+class SemanticCache:
+    """Bounded, array-backed cosine-similarity cache of question -> answer"""
+
+    def __init__(self, max_size=256, threshold=0.85, top_k=3, ttl_sec=3600.0, dim=512):
+        self.max_size = max_size
+        self.threshold = threshold
+        self.top_k = top_k
+        self.ttl_sec = ttl_sec
+        self.dim = dim
+
+        self._vectors = np.zeros((max_size, dim), dtype=np.float32)
+        self._replies = [None] * max_size
+        self._numbers = [()] * max_size
+        self._created = np.zeros(max_size, dtype=np.float64)
+        self._last_used = np.zeros(max_size, dtype=np.float64)
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.follow_ups = 0
+
+    def __len__(self):
+        return self._size
+
+    def _search(self, vec):
+        """Return candidate slots ordered by similarity (best first)"""
+        if self._size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        sims = self._vectors[:self._size] @ vec
+        k = min(self.top_k, self._size)
+        idx = np.argpartition(-sims, k - 1)[:k]
+        idx = idx[np.argsort(-sims[idx])]
+        return idx, sims[idx]
+
+    def lookup(self, text: str, follow_up=False):
+        """
+        Return a cached reply for a near-duplicate question, or None. Follow-ups
+        (asked with earlier turns in the conversation) are never answered from
+        the cache: "what about him" means something else in every conversation.
+        """
+        if follow_up:
+            self.follow_ups += 1
+            return None
+        vec = embed(text, self.dim)
+        numbers = _numbers(normalize(text))
+        now = time.time()
+
+        with self._lock:
+            idx, sims = self._search(vec)
+            for slot, sim in zip(idx, sims):
+                if sim < self.threshold:
+                    break
+                if self.ttl_sec and now - self._created[slot] > self.ttl_sec:
+                    continue
+                if self._numbers[slot] != numbers:
+                    continue
+                self._last_used[slot] = now
+                self.hits += 1
+                return self._replies[slot]
+            self.misses += 1
+            return None
+
+    def add(self, text: str, reply: str, follow_up=False):
+        """Store a reply, replacing an identical question or the least recently used entry"""
+        if follow_up:
+            return  # the reply depends on its conversation, see lookup()
+        vec = embed(text, self.dim)
+        if not reply or not vec.any():
+            return
+        now = time.time()
+
+        with self._lock:
+            idx, sims = self._search(vec)
+            if len(idx) and sims[0] >= 0.999:
+                slot = idx[0]
+            elif self._size < self.max_size:
+                slot = self._size
+                self._size += 1
+            else:
+                slot = int(np.argmin(self._last_used[:self._size]))
+
+            self._vectors[slot] = vec
+            self._replies[slot] = reply
+            self._numbers[slot] = _numbers(normalize(text))
+            self._created[slot] = now
+            self._last_used[slot] = now
+
+    def clear(self):
+        with self._lock:
+            self._size = 0
+            self._replies = [None] * self.max_size
+            self._numbers = [()] * self.max_size
+
+    def memory_bytes(self) -> int:
+        """Approximate size: the preallocated arrays plus the cached replies"""
+        arrays = self._vectors.nbytes + self._created.nbytes + self._last_used.nbytes
+        return arrays + sum(len(reply) for reply in self._replies[:self._size] if reply)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": self._size,
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "follow_ups": self.follow_ups,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Deterministic simulation of NEPTR's conversation logic
+A virtual clock, a scripted stand-in for Vosk and a fake TTS drive the real
+ConversationMachine, wake matcher, GOODBYE_PAT and token bucket with the
+timings from config.py. Whole scenarios (wake, several turns, goodbye, the
+30 s timeout) run in milliseconds and always play out the same way:
+
+    sim = Simulation()
+    sim.say("hello neptr", at=1.0)
+    sim.say("what is your favorite pie", at=6.0)
+    sim.run_until(60.0)
+    sim.spoken     # [(time, text), ...]
+"""
+
+import concurrent.futures
+import heapq
+import itertools
+import json
+import random
+
+from conversation import GOODBYE_PAT, ConversationMachine, SpeechFinished, Transcript
+from rate_limiter import TokenBucket
+from wake_words import WakeMatcher
+
+try:
+    import config
+except ImportError:
+    config = None
+
+
+def setting(name, default):
+    return getattr(config, name, default) if config is not None else default
+
+
+class VirtualClock:
+    """Time only moves when the simulation says so; call_at() schedules callbacks"""
+
+    def __init__(self, start=0.0):
+        self.now = start
+        self._calls = []
+        self._seq = itertools.count()
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(0.0, seconds)
+
+    def call_at(self, when, fn, *args):
+        heapq.heappush(self._calls, (when, next(self._seq), fn, args))
+
+    def next_call(self):
+        return self._calls[0][0] if self._calls else None
+
+    def run_due(self):
+        while self._calls and self._calls[0][0] <= self.now:
+            _, _, fn, args = heapq.heappop(self._calls)
+            fn(*args)
+
+
+class FakeRecognizer:
+    """
+    Stands in for KaldiRecognizer. Utterances are scripted with start and end
+    times; one is final `endpoint_sec` after it ends, if any of its audio was fed
+    (audio dropped while NEPTR speaks is never heard, just like the real thing).
+    """
+
+    def __init__(self, clock, block_sec=0.5, endpoint_sec=0.5):
+        self.clock = clock
+        self.block_sec = block_sec
+        self.endpoint_sec = endpoint_sec
+        self.script = []  # [start, end, text, heard]
+        self._result = ""
+
+    def add(self, start, end, text):
+        self.script.append([start, end, text, False])
+        self.script.sort(key=lambda u: u[0])
+
+    def AcceptWaveform(self, data):
+        now = self.clock()
+        for utterance in self.script:
+            start, end = utterance[0], utterance[1]
+            if start < now and now - self.block_sec < end:
+                utterance[3] = True
+        while self.script and now >= self.script[0][1] + self.endpoint_sec:
+            start, end, text, heard = self.script.pop(0)
+            if heard:
+                self._result = text
+                return True
+        return False
+
+    def Result(self):
+        result, self._result = self._result, ""
+        return json.dumps({"text": result})
+
+    def PartialResult(self):
+        now = self.clock()
+        for start, end, text, heard in self.script:
+            if heard and start < now:
+                words = text.split()
+                spoken = max(1, round(len(words) * min(1.0, (now - start) / (end - start))))
+                return json.dumps({"partial": " ".join(words[:spoken])})
+        return json.dumps({"partial": ""})
+
+
+class FakeTTS:
+    """Speaks at words_per_sec; tells the machine when each line has finished"""
+
+    def __init__(self, clock, words_per_sec=2.5):
+        self.clock = clock
+        self.words_per_sec = words_per_sec
+        self.spoken = []
+        self.machine = None
+
+    def duration(self, text):
+        return max(0.5, len(text.split()) / self.words_per_sec)
+
+    def speak(self, text):
+        self.spoken.append((self.clock(), text))
+        self.clock.call_at(self.clock() + self.duration(text), self.machine.post, SpeechFinished())
+
+
+class Simulation:
+    """
+    answer(command) -> (source, reply) stands in for the answer pipeline;
+    answer_latency is how long it takes, after waiting for the rate limiter.
+    As in llm_reply(), a turn that would wait longer than API_RATE_LIMIT_MAX_WAIT_SEC
+    gets the fallback instead.
+    """
+
+    def __init__(self, answer=None, answer_latency=0.5, seed=0, words_per_sec=2.5,
+                 flush_sec=None, timeout_sec=None, echo_guard_sec=None, rate_limit_sec=None,
+                 rate_limit_burst=None, block_sec=None, endpoint_sec=0.5):
+        self.clock = VirtualClock()
+        self.block_sec = block_sec or setting("BLOCK_SIZE", 8000) / setting("SAMPLE_RATE", 16000)
+        self.recognizer = FakeRecognizer(self.clock, self.block_sec, endpoint_sec)
+        self.tts = FakeTTS(self.clock, words_per_sec)
+        self.answer = answer or (lambda command: ("llm", f"Beep boop! You said {command}!"))
+        self.answer_latency = answer_latency
+        rate_limit_sec = setting("API_RATE_LIMIT_SECONDS", 1.0) if rate_limit_sec is None else rate_limit_sec
+        self.rate_limit_max_wait = setting("API_RATE_LIMIT_MAX_WAIT_SEC", 3.0)
+        self.rate_limiter = TokenBucket(rate=1.0 / rate_limit_sec if rate_limit_sec > 0 else 0.0,
+                                        burst=rate_limit_burst or setting("API_RATE_LIMIT_BURST", 3),
+                                        clock=self.clock, sleep=self.clock.sleep)
+        self.log = []
+        self.machine = ConversationMachine(
+            speak=self.tts.speak,
+            submit=self._submit,
+            wake_matcher=WakeMatcher(setting("TRIGGERS", ["hello neptr", "hey neptr", "hi neptr"])),
+            goodbye_pat=GOODBYE_PAT,
+            lines={
+                "greeting": setting("NEPTR_GREETINGS", ["Hello! I am NEPTR!"]),
+                "goodbye": setting("GOODBYE_MESSAGES", ["Goodbye!"]),
+                "timeout": setting("TIMEOUT_GOODBYE_MESSAGES", ["Going to sleep!"]),
+                "filler": setting("NEPTR_FILLERS", ["Hmm, let me think about that! Whirr!"]),
+            },
+            fallback=lambda: "Beep boop! My circuits are confused!",
+            clock=self.clock,
+            flush_sec=setting("BUFFER_FLUSH_SEC", 2.0) if flush_sec is None else flush_sec,
+            timeout_sec=setting("CONVERSATION_TIMEOUT_SEC", 30.0) if timeout_sec is None else timeout_sec,
+            echo_guard_sec=setting("ECHO_GUARD_SEC", 2.0) if echo_guard_sec is None else echo_guard_sec,
+            filler_after_sec=setting("RESPONSE_FILLER_AFTER_SEC", 2.5),
+            deadline_sec=setting("RESPONSE_DEADLINE_SEC", 6.0),
+            log=lambda message: self.log.append((self.clock(), message)),
+            rng=random.Random(seed),
+        )
+        self.tts.machine = self.machine
+        self.submitted = []
+        self._next_block = self.block_sec
+
+    @property
+    def spoken(self):
+        return self.tts.spoken
+
+    def say(self, text, at, words_per_sec=2.5):
+        """The user says text starting at `at` seconds; returns when they stop"""
+        end = at + max(0.3, len(text.split()) / words_per_sec)
+        self.recognizer.add(at, end, text)
+        return end
+
+    def _submit(self, command):
+        self.submitted.append((self.clock(), command))
+        future = concurrent.futures.Future()
+        wait = self.rate_limiter.reserve(max_wait=self.rate_limit_max_wait)
+        if wait is None:
+            future.set_result(None)
+        else:
+            self.clock.call_at(self.clock() + wait + self.answer_latency, future.set_result, self.answer(command))
+        return future
+
+    def _feed_audio(self):
+        # Same gate as the live pipeline: audio is only recognized while listening or idle
+        if self.machine.accepting_audio and self.recognizer.AcceptWaveform(b""):
+            text = json.loads(self.recognizer.Result()).get("text", "")
+            if text:
+                self.machine.post(Transcript(text, True))
+
+    def _drain_inbox(self):
+        while not self.machine.inbox.empty():
+            self.machine.dispatch(self.machine.inbox.get_nowait())
+
+    def run_until(self, end):
+        """Advance virtual time to `end`, firing audio blocks, timers and callbacks in order"""
+        while True:
+            self._drain_inbox()
+            candidates = [self._next_block, self.machine.timers.next_due(), self.clock.next_call()]
+            due = min(t for t in candidates if t is not None)
+            if due > end:
+                break
+            self.clock.now = max(self.clock.now, due)
+            self.clock.run_due()
+            if self._next_block <= self.clock.now:
+                self._next_block += self.block_sec
+                self._feed_audio()
+            self._drain_inbox()
+            self.machine.run_due_timers()
+        self.clock.now = end
+        return self
+
+    def states(self):
+        """[(time, new state, cause)] of every transition so far"""
+        return [(record.at, record.new, record.cause) for record in self.machine.trace]
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Speculative dispatch for NEPTR
+Starts answering once the transcript has stopped changing, before the end of
+utterance is confirmed, so the answer latency overlaps the endpointing wait.
+"""
+
+import threading
+import time
+
+from semantic_cache import normalize
+
+
+class SpeculativeDispatcher:
+    """
+    Watch the running transcript and submit it early once it has been stable
+    for stable_sec. take() hands over the early result if the final command
+    matches; otherwise the speculative request is cancelled and counted as wasted.
+    """
+
+    def __init__(self, submit, stable_sec=0.5, min_chars=3, clock=time.monotonic):
+        self.submit = submit
+        self.stable_sec = stable_sec
+        self.min_chars = min_chars
+        self._clock = clock
+
+        self._candidate = ""
+        self._candidate_since = 0.0
+        self._text = None
+        self._future = None
+        self._fired_at = 0.0
+        self._done_at = None
+        self._lock = threading.Lock()
+
+        self.fired = 0
+        self.hits = 0
+        self.wasted = 0
+        self.latency_saved = 0.0
+
+    def observe(self, text: str):
+        """Feed the current transcript (final text plus partial hypothesis)"""
+        now = self._clock()
+        if text != self._candidate:
+            self._candidate = text
+            self._candidate_since = now
+            # The user kept talking; the early answer is for the wrong question
+            if self._future is not None and normalize(text) != normalize(self._text):
+                self.discard()
+            return
+
+        if (self._future is None and len(text) >= self.min_chars
+                and now - self._candidate_since >= self.stable_sec):
+            self._text = text
+            self._fired_at = now
+            self._done_at = None
+            self._future = self.submit(text)
+            self._future.add_done_callback(self._mark_done)
+            self.fired += 1
+
+    def _mark_done(self, future):
+        with self._lock:
+            if future is self._future:
+                self._done_at = self._clock()
+
+    def take(self, final_text: str):
+        """Return the speculative future if it answers final_text, else None"""
+        if self._future is None:
+            return None
+        if normalize(final_text) != normalize(self._text):
+            self.discard()
+            return None
+
+        with self._lock:
+            future, done_at = self._future, self._done_at
+        now = self._clock()
+        self.hits += 1
+        self.latency_saved += min(now, done_at or now) - self._fired_at
+        self._reset()
+        return future
+
+    def discard(self):
+        """Drop the in-flight speculation"""
+        if self._future is None:
+            return
+        self._future.cancel()
+        self.wasted += 1
+        self._reset()
+
+    def _reset(self):
+        with self._lock:
+            self._future = None
+            self._text = None
+            self._done_at = None
+
+    def stats(self) -> dict:
+        return {
+            "fired": self.fired,
+            "hits": self.hits,
+            "wasted": self.wasted,
+            "wasted_rate": self.wasted / self.fired if self.fired else 0.0,
+            "latency_saved_sec": self.latency_saved,
+            "avg_latency_saved_sec": self.latency_saved / self.hits if self.hits else 0.0,
+        }
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Staged processing pipeline for NEPTR
+
+    capture -> vad -> asr -> intent (conversation machine) -> tts
+
+Stages are connected by bounded queues. Each queue has an explicit policy for
+what to shed when it is full, and every stage reports occupancy, drops,
+overruns and busy time so it is visible where the Pi is saturating.
+"""
+
+import collections
+import multiprocessing
+import queue
+import threading
+import time
+
+DROP_OLDEST = "drop_oldest"   # keep the freshest items (audio: stale audio is useless)
+DROP_NEWEST = "drop_newest"   # keep what is already queued, refuse new items
+BLOCK = "block"               # make the producer wait (never use from the audio callback)
+
+THREAD = "thread"
+PROCESS = "process"
+INLINE = "inline"
+
+
+class StageQueue:
+    """Bounded FIFO with a shedding policy; API-compatible with queue.Queue for get/put"""
+
+    def __init__(self, name, maxsize=16, policy=DROP_OLDEST):
+        if policy not in (DROP_OLDEST, DROP_NEWEST, BLOCK):
+            raise ValueError(f"Unknown queue policy for {name}: {policy}")
+        self.name = name
+        self.maxsize = maxsize
+        self.policy = policy
+        self._items = collections.deque()
+        self._cond = threading.Condition()
+
+        self.puts = 0
+        self.drops = 0
+        self.overruns = 0
+        self.high_water = 0
+
+    def put(self, item, block=True, timeout=None):
+        with self._cond:
+            self.puts += 1
+            if self.maxsize and len(self._items) >= self.maxsize:
+                self.overruns += 1
+                if self.policy == DROP_OLDEST:
+                    self._items.popleft()
+                    self.drops += 1
+                elif self.policy == DROP_NEWEST or not block:
+                    self.drops += 1
+                    return False
+                else:
+                    end = None if timeout is None else time.monotonic() + timeout
+                    while len(self._items) >= self.maxsize:
+                        remaining = None if end is None else end - time.monotonic()
+                        if remaining is not None and remaining <= 0:
+                            self.drops += 1
+                            return False
+                        self._cond.wait(remaining)
+            self._items.append(item)
+            self.high_water = max(self.high_water, len(self._items))
+            self._cond.notify_all()
+            return True
+
+    def put_nowait(self, item):
+        return self.put(item, block=False)
+
+    def get(self, block=True, timeout=None):
+        with self._cond:
+            if not block:
+                timeout = 0
+            end = None if timeout is None else time.monotonic() + timeout
+            while not self._items:
+                remaining = None if end is None else end - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise queue.Empty
+                self._cond.wait(remaining)
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def clear(self):
+        """Discard everything queued (not counted as drops)"""
+        with self._cond:
+            self._items.clear()
+            self._cond.notify_all()
+
+    def qsize(self):
+        return len(self._items)
+
+    def empty(self):
+        return not self._items
+
+    def stats(self) -> dict:
+        return {
+            "occupancy": len(self._items),
+            "capacity": self.maxsize,
+            "high_water": self.high_water,
+            "puts": self.puts,
+            "drops": self.drops,
+            "overruns": self.overruns,
+            "policy": self.policy,
+        }
+
+
+class Stage:
+    """
+    One pipeline step. handler(item) returns an item for the next stage or None.
+    mode "thread" runs it on its own thread, "process" in a forked worker process
+    (handler state is copied at fork), "inline" directly in the producer's thread.
+    Handler errors are counted and reported through log(message).
+    """
+
+    def __init__(self, name, handler, output=None, mode=THREAD, maxsize=16, policy=DROP_OLDEST, inbox=None,
+                 log=print):
+        if mode not in (THREAD, PROCESS, INLINE):
+            raise ValueError(f"Unknown stage mode for {name}: {mode}")
+        if mode == INLINE and inbox is not None:
+            raise ValueError(f"Stage {name} reads from a queue and cannot run inline")
+        self.name = name
+        self.handler = handler
+        self.output = output
+        self.mode = mode
+        if inbox is None and mode != INLINE:
+            inbox = StageQueue(name, maxsize, policy)
+        self.inbox = inbox
+        self.log = log
+
+        self.processed = 0
+        self.errors = 0
+        self.busy_sec = 0.0
+        self._stop = threading.Event()
+        self._threads = []
+        self._process = None
+
+    def submit(self, item):
+        """Hand an item to this stage (never blocks unless the policy is BLOCK)"""
+        if self.mode == INLINE:
+            self._handle(item)
+        else:
+            self.inbox.put(item)
+
+    def _emit(self, result):
+        if result is not None and self.output is not None:
+            self.output(result)
+
+    def _handle(self, item):
+        start = time.perf_counter()
+        try:
+            result = self.handler(item)
+        except Exception as e:
+            self.errors += 1
+            self.log(f"Stage '{self.name}' error: {e}")
+            return
+        finally:
+            self.busy_sec += time.perf_counter() - start
+            self.processed += 1
+        self._emit(result)
+
+    def _run_thread(self):
+        while not self._stop.is_set():
+            try:
+                item = self.inbox.get(timeout=0.25)
+            except queue.Empty:
+                continue
+            self._handle(item)
+
+    def start(self):
+        if self.mode == THREAD:
+            self._start_thread(self._run_thread, f"neptr-{self.name}")
+        elif self.mode == PROCESS:
+            ctx = multiprocessing.get_context("fork")
+            self._to_worker = ctx.Queue(self.inbox.maxsize or 0)
+            self._from_worker = ctx.Queue()
+            self._process = ctx.Process(target=_process_worker,
+                                        args=(self.handler, self._to_worker, self._from_worker),
+                                        name=f"neptr-{self.name}", daemon=True)
+            self._process.start()
+            self._start_thread(self._feed_process, f"neptr-{self.name}-feed")
+            self._start_thread(self._collect_process, f"neptr-{self.name}-collect")
+
+    def _start_thread(self, target, name):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _feed_process(self):
+        while not self._stop.is_set():
+            try:
+                item = self.inbox.get(timeout=0.25)
+            except queue.Empty:
+                continue
+            self._to_worker.put(item)
+
+    def _collect_process(self):
+        while not self._stop.is_set():
+            try:
+                ok, result, busy = self._from_worker.get(timeout=0.25)
+            except queue.Empty:
+                continue
+            self.processed += 1
+            self.busy_sec += busy
+            if ok:
+                self._emit(result)
+            else:
+                self.errors += 1
+                self.log(f"Stage '{self.name}' error: {result}")
+
+    def stop(self):
+        self._stop.set()
+        if self._process is not None:
+            self._to_worker.put(None)
+            self._process.join(timeout=1.0)
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+
+    def stats(self) -> dict:
+        stats = {"mode": self.mode, "processed": self.processed, "errors": self.errors,
+                 "busy_sec": self.busy_sec}
+        if self.inbox is not None:
+            stats.update(self.inbox.stats())
+        return stats
+
+
+def _process_worker(handler, inbox, outbox):
+    while True:
+        item = inbox.get()
+        if item is None:
+            break
+        start = time.perf_counter()
+        try:
+            outbox.put((True, handler(item), time.perf_counter() - start))
+        except Exception as e:
+            outbox.put((False, str(e), time.perf_counter() - start))
+
+
+class Pipeline:
+    """A set of stages plus the extra queues (capture, intent) they connect to"""
+
+    def __init__(self, stages, queues=()):
+        self.stages = list(stages)
+        self.queues = list(queues)
+
+    def start(self):
+        # Fork worker processes before any other stage thread is running
+        for stage in sorted(self.stages, key=lambda s: s.mode != PROCESS):
+            stage.start()
+
+    def stop(self):
+        for stage in self.stages:
+            stage.stop()
+
+    def stats(self) -> dict:
+        stats = {q.name: q.stats() for q in self.queues}
+        stats.update({stage.name: stage.stats() for stage in self.stages})
+        return stats
+
+    def report(self) -> str:
+        """One line per stage: occupancy/capacity, drops, overruns, busy time"""
+        lines = []
+        for name, s in self.stats().items():
+            line = f"{name:>8}:"
+            if "occupancy" in s:
+                line += (f" queue {s['occupancy']}/{s['capacity']} (peak {s['high_water']}),"
+                         f" {s['drops']} dropped, {s['overruns']} overruns [{s['policy']}]")
+            if "processed" in s:
+                line += f" {s['processed']} processed in {s['busy_sec']:.1f}s busy [{s['mode']}]"
+            lines.append(line)
+        return "\n".join(lines)
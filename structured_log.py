@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Asynchronous logging for NEPTR
+Callers only put a record on a bounded queue; a background thread formats it
+and writes it to the console and/or a size-rotated log file, as text or JSON.
+A slow terminal or journald can therefore never stall the audio callback,
+Vosk or the conversation threads: when the queue is full the record is
+dropped and counted instead.
+"""
+
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+
+LOGGER_NAME = "neptr"
+
+# Attributes every LogRecord has; anything else was passed with extra={...}
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class ConsoleFormatter(logging.Formatter):
+    """[12:34:56] 🤖 NEPTR: message (warnings and errors get their level)"""
+
+    def format(self, record):
+        timestamp = time.strftime("%H:%M:%S", time.localtime(record.created))
+        level = "" if record.levelno == logging.INFO else f"{record.levelname}: "
+        line = f"[{timestamp}] 🤖 NEPTR: {level}{record.getMessage()}"
+        return f"{line}\n{record.exc_text}" if record.exc_text else line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, thread, msg plus any extra fields"""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Never blocks the caller: records that don't fit in the queue are counted and dropped"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Leave formatting to the writer thread; only resolve the message now
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_text = logging.Formatter().formatException(record.exc_info) if record.exc_info else None
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging(level="INFO", console=True, to_file=False, path="neptr.log", json_format=False,
+                  max_bytes=5 * 1024 * 1024, backups=3, queue_size=10000, stream=None):
+    """
+    Route the "neptr" logger through a background writer.
+    Returns (logger, listener); call listener.stop() at exit to flush.
+    """
+    handlers = []
+    if console:
+        handler = logging.StreamHandler(stream or sys.stdout)
+        handler.setFormatter(JsonFormatter() if json_format else ConsoleFormatter())
+        handlers.append(handler)
+    if to_file:
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups,
+                                                       encoding="utf-8")
+        handler.setFormatter(JsonFormatter() if json_format else
+                             logging.Formatter("%(asctime)s %(levelname)s [%(threadName)s] %(message)s"))
+        handlers.append(handler)
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+    logger.propagate = False
+    for old in list(logger.handlers):
+        logger.removeHandler(old)
+    log_queue = queue.Queue(maxsize=queue_size)
+    logger.addHandler(DroppingQueueHandler(log_queue))
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return logger, listener
@@ -31,7 +31,32 @@ def main():
         ("test_espeak_tts.py", "espeak TTS test"),
         ("test_voice.py", "Voice settings test"),
         ("test_wake_words.py", "Wake word detection test"),
-        ("test_voice_neptr.py", "Voice assistant simulation")
+        ("test_voice_neptr.py", "Voice assistant simulation"),
+        ("test_semantic_cache.py", "Semantic answer cache test"),
+        ("test_response_pipeline.py", "Response pipeline test"),
+        ("test_rate_limiter.py", "Rate limiter test"),
+        ("test_circuit_breaker.py", "Circuit breaker test"),
+        ("test_conversation_context.py", "Conversation history test"),
+        ("test_speculation.py", "Speculative dispatch test"),
+        ("test_llm_backend.py", "LLM backend test"),
+        ("test_conversation.py", "Conversation state machine test"),
+        ("test_stages.py", "Pipeline stages test"),
+        ("test_rooms.py", "Multi-room scheduler test"),
+        ("test_satellite.py", "Satellite protocol test"),
+        ("test_headless_api.py", "Headless API test"),
+        ("test_latency.py", "Latency tracking test"),
+        ("test_metrics.py", "Metrics test"),
+        ("test_tracer.py", "Tracer test"),
+        ("test_structured_log.py", "Logging test"),
+        ("test_profiler.py", "Profiler test"),
+        ("test_benchmark.py", "Benchmark suite test"),
+        ("test_e2e_bench.py", "End-to-end benchmark test"),
+        ("test_simulation.py", "Simulation test"),
+        ("test_memory_budget.py", "Memory budget test"),
+        ("test_config_reload.py", "Config reload test"),
+        ("test_noise_suppression.py", "Noise suppression test"),
+        ("test_agc.py", "AGC test"),
+        ("test_resampler.py", "Resampler test")
     ]
     
     print("Available tests:")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for automatic gain control and the adaptive silence threshold (no microphone needed)
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from audio_dsp import AutomaticGainControl, block_rms
+
+RATE = 16000
+
+def room_audio(speech_amp, noise_amp, seconds=20, seed=0):
+    """Speech-like bursts for 1.5 s of every 4, over steady noise"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(RATE * seconds) / RATE
+    speech = np.where(t % 4 < 1.5, speech_amp * np.sin(2 * np.pi * 300 * t) * (1 + 0.5 * np.sin(2 * np.pi * 3 * t)), 0)
+    return np.clip(speech + rng.standard_normal(t.size) * noise_amp, -32768, 32767).astype(np.int16).tobytes()
+
+def run(agc, pcm, block_bytes=RATE):
+    return np.frombuffer(b"".join(agc.process(pcm[i:i + block_bytes]) for i in range(0, len(pcm), block_bytes)),
+                         dtype=np.int16)
+
+def level(out, start, end):
+    return block_rms(out[int(start * RATE):int(end * RATE)].tobytes())
+
+def test_quiet_and_loud_microphones_end_up_alike():
+    speech_levels = []
+    for speech_amp, noise_amp in ((500, 30), (3000, 200), (12000, 100)):
+        agc = AutomaticGainControl(RATE)
+        out = run(agc, room_audio(speech_amp, noise_amp))
+        speech_levels.append(level(out, 16.2, 17.3))
+        assert agc.min_gain <= agc.gain <= agc.max_gain
+    assert max(speech_levels) / min(speech_levels) < 1.2, speech_levels
+
+def test_threshold_follows_the_room():
+    thresholds = {}
+    for name, noise_amp in (("quiet", 30), ("noisy", 300)):
+        agc = AutomaticGainControl(RATE)
+        out = run(agc, room_audio(3000, noise_amp, seed=1))
+        state = agc.state()
+        thresholds[name] = state.silence_threshold
+        # Above the room's noise, below its speech
+        assert level(out, 18.0, 19.8) < state.silence_threshold < level(out, 16.2, 17.3), state
+    assert thresholds["noisy"] > 3 * thresholds["quiet"], thresholds
+
+def test_gain_moves_smoothly():
+    agc = AutomaticGainControl(RATE)
+    rng = np.random.default_rng(3)
+    run(agc, (rng.standard_normal(RATE) * 50).astype(np.int16).tobytes())
+    shout = (np.sin(np.arange(RATE) / 3) * 20000).astype(np.int16).tobytes()
+    out = run(agc, shout, block_bytes=len(shout) // 5)
+    assert abs(agc.gain - 1 / 1.25 ** 5) < 1e-9  # five blocks, each at most 1.25x lower
+    steps = np.abs(np.diff(out.astype(np.float64)))
+    assert steps.max() < 20000 / 3 * 1.01  # no jumps at block edges beyond the signal's own slope
+
+def test_noise_alone_is_not_amplified():
+    agc = AutomaticGainControl(RATE)
+    rng = np.random.default_rng(2)
+    run(agc, (rng.standard_normal(RATE * 5) * 100).astype(np.int16).tobytes())
+    assert agc.gain == 1.0 and agc.state().speech_level == 0.0
+    assert 100 < agc.silence_threshold < 300
+    assert agc.process(b"") == b""
+
+def test_frozen_while_neptr_speaks():
+    agc = AutomaticGainControl(RATE)
+    run(agc, room_audio(1000, 50, seconds=12))
+    before = agc.state()
+    # NEPTR's reply, loud through a speakerphone, arrives while the AGC is frozen
+    echo = (np.sin(np.arange(RATE * 3) / 4) * 20000).astype(np.int16).tobytes()
+    out = np.frombuffer(b"".join(agc.process(echo[i:i + RATE], adapt=False) for i in range(0, len(echo), RATE)),
+                        dtype=np.int16)
+    assert agc.state() == before, (before, agc.state())
+    expected = np.clip(np.frombuffer(echo, dtype=np.int16) * np.float32(before.gain), -32768, 32767)
+    assert np.abs(out - expected.astype(np.int16)).max() <= 1
+    run(agc, echo)
+    assert agc.gain < before.gain  # the same audio would have pulled the gain down
+
+def main():
+    print("🎚️ NEPTR Automatic Gain Control Test")
+    print("=" * 40)
+
+    tests = [
+        test_quiet_and_loud_microphones_end_up_alike,
+        test_threshold_follows_the_room,
+        test_gain_moves_smoothly,
+        test_noise_alone_is_not_amplified,
+        test_frozen_while_neptr_speaks,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"  ❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
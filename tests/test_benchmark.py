@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for the hot-path benchmark suite (no microphone or model needed)
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import benchmark
+from audio_dsp import block_rms
+
+def test_block_rms():
+    assert block_rms(b"") == 0.0
+    assert block_rms(np.full(100, 300, dtype=np.int16).tobytes()) == 300.0
+    block = np.array([3000, -4000] * 50, dtype=np.int16)
+    expected = float(np.sqrt(np.mean(block.astype(np.float64) ** 2)))
+    assert abs(block_rms(block.tobytes()) - expected) < 1e-3
+
+def test_measure_per_item():
+    calls = []
+    stats = benchmark.measure(lambda: calls.append(1), repeat=3, number=4, items=10)
+    assert len(calls) == 12
+    assert stats["min"] <= stats["median"] <= stats["max"]
+    assert stats["repeat"] == 3 and stats["number"] == 4
+
+def test_run_cheap_benchmarks():
+    results = benchmark.run_benchmarks(["wake_match", "vad_rms"], quick=True)["results"]
+    assert results["wake_match"]["unit"] == "us/transcript" and results["wake_match"]["median"] > 0
+    assert results["vad_rms"]["unit"] == "us/block" and results["vad_rms"]["median"] > 0
+
+def test_missing_dependencies_are_skipped():
+    def unavailable(quick=False):
+        raise benchmark.Skipped("espeak-ng not installed")
+
+    original = benchmark.BENCHMARKS["tts_espeak"]
+    benchmark.BENCHMARKS["tts_espeak"] = unavailable
+    try:
+        results = benchmark.run_benchmarks(["tts_espeak"], quick=True)["results"]
+    finally:
+        benchmark.BENCHMARKS["tts_espeak"] = original
+    assert results == {"tts_espeak": {"skipped": "espeak-ng not installed"}}
+
+def test_compare_with_baseline():
+    baseline = {"results": {"wake_match": {"median": 4.0}, "vad_rms": {"median": 10.0},
+                            "tts_espeak": {"skipped": "espeak-ng not installed"}}}
+    current = {"results": {"wake_match": {"median": 4.4}, "vad_rms": {"median": 12.0},
+                           "tts_espeak": {"median": 0.1}, "asr_accept_waveform": {"median": 0.3}}}
+    rows = {name: (ratio, regressed) for name, _, _, ratio, regressed in benchmark.compare(current, baseline, 0.15)}
+    assert set(rows) == {"wake_match", "vad_rms"}
+    assert abs(rows["wake_match"][0] - 1.1) < 1e-9 and not rows["wake_match"][1]
+    assert rows["vad_rms"][1]
+
+def main():
+    print("⏱️ NEPTR Benchmark Suite Test")
+    print("=" * 40)
+
+    tests = [
+        test_block_rms,
+        test_measure_per_item,
+        test_run_cheap_benchmarks,
+        test_missing_dependencies_are_skipped,
+        test_compare_with_baseline,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"  ❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
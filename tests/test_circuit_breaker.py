@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test script for the LLM circuit breaker
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def make_breaker(**kwargs):
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30.0,
+                             clock=clock, log=lambda message: None, **kwargs)
+    return breaker, clock
+
+def test_opens_after_consecutive_failures():
+    breaker, _ = make_breaker()
+    assert breaker.allow_request()
+    breaker.record_failure("timeout")
+    assert breaker.state == CLOSED
+    breaker.record_failure("timeout")
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+    assert breaker.rejected == 1
+
+def test_success_resets_failures():
+    breaker, _ = make_breaker()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+def test_half_open_single_trial():
+    """After the reset timeout exactly one trial request goes through"""
+    breaker, clock = make_breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now += 31
+    assert breaker.allow_request()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow_request()
+    breaker.record_failure("still down")
+    assert breaker.state == OPEN
+
+    clock.now += 31
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+def test_release_frees_trial():
+    breaker, clock = make_breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now += 31
+    assert breaker.allow_request()
+    breaker.release()
+    assert breaker.allow_request()
+
+def test_health_probe_detects_recovery():
+    """A successful background probe moves an open circuit to half-open"""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=3600,
+                             probe=lambda: True, probe_interval=0.01,
+                             log=lambda message: None)
+    breaker.start()
+    try:
+        breaker.record_failure()
+        deadline = time.time() + 2
+        while breaker.state == OPEN and time.time() < deadline:
+            time.sleep(0.01)
+        assert breaker.state == HALF_OPEN
+    finally:
+        breaker.stop()
+
+def test_transitions_are_recorded():
+    breaker, _ = make_breaker()
+    seen = []
+    breaker.listeners.append(lambda ts, old, new, reason: seen.append((old, new)))
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    assert seen == [(CLOSED, OPEN), (OPEN, CLOSED)]
+    assert len(breaker.transitions) == 2
+
+def main():
+    print("🔌 Testing LLM Circuit Breaker")
+    print("=" * 40)
+
+    tests = [
+        test_opens_after_consecutive_failures,
+        test_success_resets_failures,
+        test_half_open_single_trial,
+        test_release_frees_trial,
+        test_health_probe_detects_recovery,
+        test_transitions_are_recorded,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"  ❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test script for hot config reload (no microphone or model needed)
+"""
+
+import os
+import sys
+import tempfile
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config_reload import ConfigReloader, diff, validate
+from conversation import IDLE, Reconfigure
+from rate_limiter import TokenBucket
+from simulation import Simulation
+from wake_words import WakeMatcher
+
+RUNNING = {
+    "RMS_SILENCE_THRESHOLD": 250,
+    "VOICE_SPEED": 175,
+    "TRIGGERS": ["hello neptr"],
+    "AUDIO_FEEDBACK": True,
+    "MODEL_PATH": "/models/small",
+    "LOG_LEVEL": "INFO",
+}
+
+CONFIG = """
+import os
+RMS_SILENCE_THRESHOLD = {rms}
+VOICE_SPEED = 175
+TRIGGERS = {triggers}
+AUDIO_FEEDBACK = True
+MODEL_PATH = {model!r}
+LOG_LEVEL = "INFO"
+"""
+
+def write_config(directory, rms=250, triggers='["hello neptr"]', model="/models/small"):
+    path = os.path.join(directory, "config.py")
+    with open(path, "w") as f:
+        f.write(CONFIG.format(rms=rms, triggers=triggers, model=model))
+    return path
+
+def make_reloader(path, running):
+    applied, logged = [], []
+
+    def apply(changes):
+        applied.append(changes)
+        running.update(changes)
+
+    reloader = ConfigReloader(path, current=lambda: dict(running), apply=apply, log=logged.append)
+    return reloader, applied, logged
+
+def test_validate_and_diff():
+    assert validate(dict(RUNNING, RMS_SILENCE_THRESHOLD=400.5), RUNNING) == []
+    errors = validate(dict(RUNNING, RMS_SILENCE_THRESHOLD=-1, AUDIO_FEEDBACK=1, TRIGGERS=[],
+                           VOICE_SPEED="fast", LOG_LEVEL="LOUD"), RUNNING)
+    assert len(errors) == 5, errors
+    live, restart = diff(dict(RUNNING, RMS_SILENCE_THRESHOLD=400, MODEL_PATH="/models/big"), RUNNING)
+    assert live == {"RMS_SILENCE_THRESHOLD": 400} and restart == ["MODEL_PATH"]
+    # Applied to the running backend by apply_config, not deferred to a restart
+    live, restart = diff({"OPENAI_MODEL": "gpt-4o", "LOCAL_LLM_MODEL": "llama"},
+                         {"OPENAI_MODEL": "gpt-4o-mini", "LOCAL_LLM_MODEL": "local-model"})
+    assert set(live) == {"OPENAI_MODEL", "LOCAL_LLM_MODEL"} and restart == []
+
+def test_reload_applies_only_live_changes():
+    running = dict(RUNNING)
+    with tempfile.TemporaryDirectory() as directory:
+        path = write_config(directory, rms=400, triggers='["hello neptr", "hey robot"]', model="/models/big")
+        reloader, applied, logged = make_reloader(path, running)
+        changes = reloader.reload()
+    assert changes == {"RMS_SILENCE_THRESHOLD": 400, "TRIGGERS": ["hello neptr", "hey robot"]}
+    assert applied == [changes] and running["MODEL_PATH"] == "/models/small"
+    assert any("Restart NEPTR to apply: MODEL_PATH" in message for message in logged)
+    assert reloader.last_duration_ms < 100, f"reload took {reloader.last_duration_ms:.1f} ms"
+
+def test_bad_config_keeps_running_settings():
+    running = dict(RUNNING)
+    with tempfile.TemporaryDirectory() as directory:
+        path = write_config(directory, rms=-5)
+        reloader, applied, logged = make_reloader(path, running)
+        assert reloader.reload() == {}
+        with open(path, "a") as f:
+            f.write("VOICE_PITCH = (\n")
+        assert reloader.reload() == {}
+    assert not applied and running == RUNNING and reloader.rejected == 2
+    assert "RMS_SILENCE_THRESHOLD = -5" in logged[0] and "failed to load" in logged[1]
+
+def test_watch_reloads_on_file_change():
+    running = dict(RUNNING)
+    stop = threading.Event()
+    with tempfile.TemporaryDirectory() as directory:
+        path = write_config(directory)
+        reloader, applied, _ = make_reloader(path, running)
+        assert not reloader.changed()
+        write_config(directory, rms=300)
+        os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1_000_000))
+        watcher = threading.Thread(target=reloader.watch, args=(stop, 0.01))
+        watcher.start()
+        for _ in range(200):
+            if applied:
+                break
+            stop.wait(0.01)
+        stop.set()
+        watcher.join()
+    assert applied == [{"RMS_SILENCE_THRESHOLD": 300}]
+
+def test_machine_swaps_wake_matcher():
+    sim = Simulation(flush_sec=2.0, timeout_sec=30.0, echo_guard_sec=2.0, block_sec=0.5, rate_limit_sec=0)
+    matcher = WakeMatcher(["wake up robot"], greetings=[])
+    sim.machine.post(Reconfigure({"wake_matcher": matcher, "flush_sec": 1.0, "clock": None}))
+    sim.say("hello neptr", at=1.0)
+    sim.run_until(5.0)
+    assert sim.machine.state == IDLE and sim.machine.flush_sec == 1.0 and sim.machine.clock is not None
+    sim.say("wake up robot", at=6.0)
+    sim.run_until(10.0)
+    assert sim.states()[0][2] == "wake word"
+
+def test_rate_limiter_configure():
+    now = [0.0]
+    bucket = TokenBucket(rate=1.0, burst=1, clock=lambda: now[0], sleep=lambda seconds: None)
+    assert bucket.reserve() == 0.0
+    bucket.configure(rate=0.1, burst=3)
+    assert bucket.interval == 10.0 and bucket.tolerance == 20.0
+
+def main():
+    print("🔄 NEPTR Config Reload Test")
+    print("=" * 40)
+
+    tests = [
+        test_validate_and_diff,
+        test_reload_applies_only_live_changes,
+        test_bad_config_keeps_running_settings,
+        test_watch_reloads_on_file_change,
+        test_machine_swaps_wake_matcher,
+        test_rate_limiter_configure,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"  ❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
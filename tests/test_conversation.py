@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Test script for the conversation state machine (no microphone or model needed)
+"""
+
+import concurrent.futures
+import os
+import re
+import sys
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversation import (ConversationMachine, TimerQueue, Transcript, SpeechFinished,
+                          IDLE, WAKE, LISTENING, THINKING, SPEAKING)
+from stages import BLOCK, StageQueue
+from wake_words import WakeMatcher
+
+GOODBYE_PAT = re.compile(r"\b(goodbye|bye)\b")
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def make_machine(answer_future=None, inbox=None):
+    clock = FakeClock()
+    spoken, submitted = [], []
+
+    def submit(command):
+        submitted.append(command)
+        return answer_future if answer_future is not None else completed(("llm", f"answer to {command}"))
+
+    machine = ConversationMachine(
+        speak=spoken.append,
+        submit=submit,
+        wake_matcher=WakeMatcher(["hello neptr"]),
+        goodbye_pat=GOODBYE_PAT,
+        lines={"greeting": ["hi!"], "goodbye": ["bye!"], "timeout": ["sleepy!"], "filler": ["hmm!"]},
+        fallback=lambda: "fallback!",
+        clock=clock,
+        log=lambda message: None,
+        inbox=inbox,
+    )
+    return machine, clock, spoken, submitted
+
+def completed(result):
+    future = concurrent.futures.Future()
+    future.set_result(result)
+    return future
+
+def advance(machine, clock, seconds):
+    """Move the fake clock forward, firing timers and queued events on the way"""
+    end = clock.now + seconds
+    while True:
+        while not machine.inbox.empty():
+            machine.dispatch(machine.inbox.get())
+        due = machine.timers.next_due()
+        if due is None or due > end:
+            break
+        clock.now = max(clock.now, due)
+        machine.run_due_timers()
+    clock.now = end
+
+def finish_speaking(machine, clock):
+    machine.dispatch(SpeechFinished())
+    advance(machine, clock, 2.0)
+
+def test_timer_queue():
+    timers = TimerQueue()
+    timers.schedule("a", 5.0)
+    timers.schedule("b", 3.0)
+    timers.schedule("a", 1.0)  # replaces the 5.0 deadline
+    assert timers.next_due() == 1.0
+    assert timers.pop_due(3.0) == [("a", 1.0), ("b", 3.0)]
+    assert timers.next_due() is None
+
+def test_wake_greets_then_listens():
+    machine, clock, spoken, _ = make_machine()
+    machine.dispatch(Transcript("what a nice day", True))
+    assert machine.state == IDLE
+    machine.dispatch(Transcript("hello neptr", True))
+    assert machine.state == SPEAKING and spoken == ["hi!"]
+    assert not machine.accepting_audio
+    finish_speaking(machine, clock)
+    assert machine.state == LISTENING
+    assert [t.new for t in machine.trace] == [WAKE, SPEAKING, LISTENING]
+
+def test_flush_exactly_when_due():
+    machine, clock, spoken, submitted = make_machine()
+    machine.dispatch(Transcript("hello neptr", True))
+    finish_speaking(machine, clock)
+
+    machine.dispatch(Transcript("tell me", True))
+    advance(machine, clock, 1.5)
+    machine.dispatch(Transcript("a story", True))
+    advance(machine, clock, 1.9)
+    assert submitted == []
+    advance(machine, clock, 0.2)
+    assert submitted == ["tell me a story"]
+    assert spoken[-1] == "answer to tell me a story"
+    thinking = [t for t in machine.trace if t.new == THINKING][0]
+    assert thinking.lateness == 0.0
+
+def test_goodbye_ends_conversation():
+    machine, clock, spoken, submitted = make_machine()
+    machine.dispatch(Transcript("hello neptr", True))
+    finish_speaking(machine, clock)
+    machine.dispatch(Transcript("goodbye", True))
+    advance(machine, clock, 2.0)
+    assert spoken[-1] == "bye!" and submitted == []
+    finish_speaking(machine, clock)
+    assert machine.state == IDLE
+
+def test_silence_timeout():
+    machine, clock, spoken, _ = make_machine()
+    machine.dispatch(Transcript("hello neptr", True))
+    finish_speaking(machine, clock)
+    advance(machine, clock, 29.9)
+    assert machine.state == LISTENING
+    advance(machine, clock, 0.1)
+    assert spoken[-1] == "sleepy!"
+    finish_speaking(machine, clock)
+    assert machine.state == IDLE
+
+def test_filler_then_late_answer():
+    """A slow answer gets a filler first, then the real answer"""
+    slow = concurrent.futures.Future()
+    machine, clock, spoken, _ = make_machine(answer_future=slow)
+    machine.dispatch(Transcript("hello neptr", True))
+    finish_speaking(machine, clock)
+    machine.dispatch(Transcript("explain pie", True))
+    advance(machine, clock, 2.0)
+    assert machine.state == THINKING
+
+    advance(machine, clock, 2.5)
+    assert spoken[-1] == "hmm!"
+    slow.set_result(("llm", "pie is great"))
+    advance(machine, clock, 0.1)
+    machine.dispatch(SpeechFinished())
+    advance(machine, clock, 2.0)
+    assert spoken[-1] == "pie is great"
+
+def test_deadline_fallback():
+    never = concurrent.futures.Future()
+    never.set_running_or_notify_cancel()  # already running, so the deadline cannot cancel it
+    machine, clock, spoken, _ = make_machine(answer_future=never)
+    machine.dispatch(Transcript("hello neptr", True))
+    finish_speaking(machine, clock)
+    machine.dispatch(Transcript("explain pie", True))
+    advance(machine, clock, 2.0 + 2.5)
+    finish_speaking(machine, clock)  # filler done, still thinking
+    advance(machine, clock, 6.0)
+    assert spoken[-1] == "fallback!"
+
+    never.set_result(("llm", "too late"))
+    advance(machine, clock, 0.1)
+    assert "too late" not in spoken
+
+def test_deadline_cancels_the_race():
+    pending = concurrent.futures.Future()
+    machine, clock, spoken, _ = make_machine(answer_future=pending)
+    machine.dispatch(Transcript("hello neptr", True))
+    finish_speaking(machine, clock)
+    machine.dispatch(Transcript("explain pie", True))
+    advance(machine, clock, 2.0 + 6.0)
+    assert pending.cancelled()
+    finish_speaking(machine, clock)
+    assert spoken[-1] == "fallback!"
+
+def test_full_inbox_never_blocks_internal_events():
+    machine, clock, spoken, _ = make_machine(inbox=StageQueue("intent", 1, BLOCK))
+    machine.post(Transcript("hel", False))  # fills the inbox
+    started = time.monotonic()
+    machine.post(Transcript("hello", False))  # dropped: the next partial supersedes it
+    machine.post(SpeechFinished())  # overflows instead of waiting for room
+    assert time.monotonic() - started < 0.1
+
+    seen = []
+    machine.dispatch = seen.append
+    stop = threading.Event()
+    thread = threading.Thread(target=machine.run, args=(stop, 0.05), daemon=True)
+    thread.start()
+    try:
+        end = time.monotonic() + 2.0
+        while len(seen) < 2 and time.monotonic() < end:
+            time.sleep(0.01)
+        assert sorted(seen, key=repr) == sorted([Transcript("hel", False), SpeechFinished()], key=repr), seen
+    finally:
+        stop.set()
+        thread.join()
+
+def main():
+    print("🔁 Testing Conversation State Machine")
+    print("=" * 40)
+
+    tests = [
+        test_timer_queue,
+        test_wake_greets_then_listens,
+        test_flush_exactly_when_due,
+        test_goodbye_ends_conversation,
+        test_silence_timeout,
+        test_filler_then_late_answer,
+        test_deadline_fallback,
+        test_deadline_cancels_the_race,
+        test_full_inbox_never_blocks_internal_events,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"  ❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
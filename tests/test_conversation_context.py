@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for the token-budgeted conversation history
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversation_context import ConversationContext, estimate_tokens
+
+SYSTEM_PROMPT = "You are NEPTR, the Never Ending Pie Throwing Robot!"
+
+def test_first_turn_matches_single_request():
+    """With no history the request is just system prompt plus utterance"""
+    context = ConversationContext(SYSTEM_PROMPT)
+    messages = context.messages_for("hello")
+    assert messages == [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": "hello"},
+    ]
+
+def test_recent_turns_are_included():
+    context = ConversationContext(SYSTEM_PROMPT)
+    context.add_turn("who is finn", "Finn is my best friend!")
+    messages = context.messages_for("how old is he")
+    assert [m["role"] for m in messages] == ["system", "user", "assistant", "user"]
+    assert messages[1]["content"] == "who is finn"
+
+def test_system_prompt_is_stable_prefix():
+    """The system message is the same object on every request"""
+    context = ConversationContext(SYSTEM_PROMPT, token_budget=40)
+    first = context.messages_for("one")[0]
+    for i in range(10):
+        context.add_turn(f"question number {i}", f"answer number {i}")
+    assert context.messages_for("two")[0] is first
+
+def test_budget_evicts_into_summary():
+    """Old turns beyond the budget are folded into a short summary"""
+    context = ConversationContext(SYSTEM_PROMPT, token_budget=60, summary_tokens=40)
+    for i in range(10):
+        context.add_turn(f"tell me about adventure number {i}", f"adventure {i} was algebraic")
+
+    assert context.history_tokens <= 60
+    assert context.evicted_turns > 0
+    messages = context.messages_for("and then?")
+    assert messages[1]["role"] == "system"
+    assert messages[1]["content"].startswith("Earlier in this conversation:")
+    assert estimate_tokens(messages[1]["content"]) <= 40 + estimate_tokens("Earlier in this conversation: ")
+    assert "adventure number 9" in messages[-3]["content"]
+
+def test_reset_starts_new_session():
+    context = ConversationContext(SYSTEM_PROMPT)
+    assert not context.has_history
+    context.add_turn("hi", "hello!")
+    assert context.has_history
+    context.reset()
+    assert len(context.messages_for("hi again")) == 2 and not context.has_history
+
+def test_request_stats():
+    context = ConversationContext(SYSTEM_PROMPT)
+    context.add_turn("hi", "hello!")
+    stats = context.record_request(2048, 350.0, cached_tokens=1024)
+    assert stats["payload_bytes"] == 2048
+    assert stats["history_turns"] == 1
+    assert stats["cached_prompt_tokens"] == 1024
+
+def main():
+    print("💬 Testing Conversation History")
+    print("=" * 40)
+
+    tests = [
+        test_first_turn_matches_single_request,
+        test_recent_turns_are_included,
+        test_system_prompt_is_stable_prefix,
+        test_budget_evicts_into_summary,
+        test_reset_starts_new_session,
+        test_request_stats,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"  ❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test script for the end-to-end latency benchmark (no microphone or model needed)
+Runs the virtual microphone against a fake NEPTR that answers every utterance.
+"""
+
+import os
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from audio_dsp import block_rms, resample_linear
+from e2e_bench import VirtualMicrophone, distribution, run_once, summarize, trim_silence
+from satellite import start_satellite_server
+
+RATE = 16000
+
+def tone(seconds, amplitude=5000):
+    t = np.arange(int(RATE * seconds)) / RATE
+    return (np.sin(2 * np.pi * 440 * t) * amplitude).astype(np.int16).tobytes()
+
+class FakeNeptr:
+    """
+    Answers with a short tone `delay` seconds after each utterance ends (two quiet frames).
+    With filler_delay, every command (the second utterance of a run) first gets a filler line.
+    """
+    def __init__(self, delay=0.1, filler_delay=None):
+        self.delay = delay
+        self.filler_delay = filler_delay
+        self.heard = 0
+        self.server = start_satellite_server(self.on_connect, host="127.0.0.1", port=0,
+                                             ping_sec=60, log=lambda message: None)
+
+    def on_connect(self, name, sample_rate):
+        state = {"loud": False, "quiet": 0}
+
+        def put(pcm):
+            if block_rms(pcm) > 500:
+                state.update(loud=True, quiet=0)
+            elif state["loud"]:
+                state["quiet"] += 1
+                if state["quiet"] == 2:
+                    state["loud"] = False
+                    self.heard += 1
+                    delay = self.delay
+                    if self.filler_delay is not None and self.heard % 3 == 2:
+                        threading.Timer(self.filler_delay, self.server.send_speech, (name, tone(0.2), RATE),
+                                        {"info": {"filler": True}}).start()
+                        delay += self.filler_delay + 0.3  # after the filler has played
+                    threading.Timer(delay, self.server.send_speech, (name, tone(0.3), RATE)).start()
+        return put
+
+    def stop(self):
+        self.server.stop()
+
+def test_trim_and_resample():
+    pcm = bytes(3200) + tone(0.2) + bytes(3200)
+    trimmed = trim_silence(pcm, RATE)
+    assert abs(len(trimmed) - len(tone(0.2))) <= 320
+    assert trim_silence(bytes(3200), RATE) == b""
+    resampled = resample_linear(tone(0.5), RATE, 22050)
+    assert abs(len(resampled) // 2 - 11025) <= 1
+    assert abs(block_rms(resampled) - block_rms(tone(0.5))) < 100
+
+def test_distribution_and_summary():
+    d = distribution([300.0, 100.0, 200.0])
+    assert d["count"] == 3 and d["p50"] == 200.0 and d["min"] == 100.0 and d["max"] == 300.0
+    assert distribution([]) == {"count": 0}
+    runs = [{"wake": True, "wake_ms": 500.0, "answered": True, "response_ms": 800.0},
+            {"wake": True, "wake_ms": 600.0, "answered": False},
+            {"wake": False, "answered": False}]
+    summary = summarize(runs, [False, True, False, False])
+    assert abs(summary["wake_accuracy"] - 2 / 3) < 1e-9
+    assert summary["answer_rate"] == 0.5
+    assert summary["false_wake_rate"] == 0.25
+    assert summary["response_ms"]["count"] == 1
+
+def test_session_against_fake_neptr():
+    neptr = FakeNeptr(delay=0.1)
+    mic = VirtualMicrophone("127.0.0.1", neptr.server.address[1], "bench", sample_rate=RATE,
+                            jitter_frames=1).start()
+    try:
+        result = run_once(mic, tone(0.3), tone(0.3), tone(0.2), timeout=5.0, guard_sec=0.1)
+    finally:
+        mic.close()
+        neptr.stop()
+    assert result["wake"] and result["answered"], result
+    # Two quiet frames for the fake endpointer, its delay, then the jitter buffer
+    assert 250 <= result["response_ms"] <= 1500, result
+    assert neptr.heard == 3
+
+def test_filler_is_not_taken_for_the_answer():
+    neptr = FakeNeptr(delay=0.1, filler_delay=0.05)
+    mic = VirtualMicrophone("127.0.0.1", neptr.server.address[1], "bench", sample_rate=RATE,
+                            jitter_frames=1).start()
+    try:
+        runs = [run_once(mic, tone(0.3), tone(0.3), tone(0.2), timeout=5.0, guard_sec=0.1) for _ in range(2)]
+    finally:
+        mic.close()
+        neptr.stop()
+    for result in runs:
+        assert result["wake"] and result["answered"], result
+        assert result["filler_ms"] < result["response_ms"], result
+        assert result["response_ms"] >= 450 and "extra_replies" not in result, result
+    assert len(mic.filler_starts) == 2 and len(mic.reply_starts) == 6
+    summary = summarize(runs, [])
+    assert summary["filler_ms"]["count"] == 2 and summary["extra_reply_runs"] == 0
+
+def main():
+    print("🎙️ NEPTR End-to-End Benchmark Test")
+    print("=" * 40)
+
+    tests = [
+        test_trim_and_resample,
+        test_distribution_and_summary,
+        test_session_against_fake_neptr,
+        test_filler_is_not_taken_for_the_answer,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"  ❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for the headless API and load generator (no microphone or model needed)
+"""
+
+import base64
+import http.client
+import json
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from headless_api import HeadlessAPI
+from load_test import percentile, run_load
+
+def make_api():
+    sessions = {}
+
+    def respond(text, session):
+        sessions.setdefault(session, []).append(text)
+        time.sleep(0.005)
+        return f"answer to {text}", "llm"
+
+    api = HeadlessAPI(transcribe=lambda pcm, rate: f"{len(pcm) // 2} samples at {rate}",
+                      respond=respond,
+                      synthesize=lambda text: (22050, b"\x01\x00" * 10),
+                      log=lambda message: None)
+    return api, sessions
+
+def post(port, path, body, content_type):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.request("POST", path, body=body, headers={"Content-Type": content_type})
+    response = conn.getresponse()
+    return response.status, json.loads(response.read())
+
+def test_text_utterance():
+    api, sessions = make_api()
+    port = api.serve_tcp(port=0).server_address[1]
+    try:
+        status, result = post(port, "/v1/utterance",
+                              json.dumps({"text": "what is pi", "session": "a", "audio": True}),
+                              "application/json")
+        assert status == 200
+        assert result["transcript"] == "what is pi" and result["reply"] == "answer to what is pi"
+        assert result["source"] == "llm" and result["latency_ms"] > 0
+        assert result["sample_rate"] == 22050 and base64.b64decode(result["audio"]) == b"\x01\x00" * 10
+        assert sessions == {"a": ["what is pi"]}
+    finally:
+        api.stop()
+
+def test_pcm_utterance():
+    api, _ = make_api()
+    port = api.serve_tcp(port=0).server_address[1]
+    try:
+        status, result = post(port, "/v1/utterance?rate=8000&session=b", b"\x00\x00" * 400, "audio/L16")
+        assert status == 200
+        assert result["transcript"] == "400 samples at 8000"
+        assert "audio" not in result
+        status, _ = post(port, "/v1/utterance", b"{not json", "application/json")
+        assert status == 400
+    finally:
+        api.stop()
+
+def test_load_over_tcp():
+    api, sessions = make_api()
+    port = api.serve_tcp(port=0).server_address[1]
+    try:
+        results = run_load(url=f"http://127.0.0.1:{port}", concurrency=4, requests=40)
+        assert results["requests"] == 40 and results["errors"] == 0
+        assert results["p50_ms"] <= results["p95_ms"] <= results["p99_ms"] <= results["max_ms"]
+        assert results["throughput_rps"] > 0
+        assert len(sessions) == 4
+    finally:
+        api.stop()
+
+def test_load_over_unix_socket():
+    api, _ = make_api()
+    path = os.path.join(tempfile.mkdtemp(), "neptr.sock")
+    api.serve_unix(path)
+    try:
+        results = run_load(socket_path=path, pcm_clips=[(b"\x00\x00" * 160, 16000)], questions=[],
+                           concurrency=2, requests=10)
+        assert results["requests"] == 10 and results["errors"] == 0
+    finally:
+        api.stop()
+    assert not os.path.exists(path)
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([7], 95) == 7
+    assert percentile([], 50) == 0.0
+
+def main():
+    print("🌐 Testing Headless API")
+    print("=" * 40)
+
+    tests = [
+        test_text_utterance,
+        test_pcm_utterance,
+        test_load_over_tcp,
+        test_load_over_unix_socket,
+        test_percentile,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"  ❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
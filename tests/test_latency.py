@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script for per-stage latency tracking and histograms (no microphone or model needed)
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from latency import (FINAL_TRANSCRIPT, INTENT_DISPATCH, LISTEN_RESUME, LLM_FIRST_BYTE, PLAYBACK_END,
+                     REPLY_COMPLETE, SPEECH_END, TTS_FIRST_SAMPLE, HdrHistogram, LatencyTracker)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+def test_histogram_percentiles_within_precision():
+    histogram = HdrHistogram(digits=2)
+    values = [random.uniform(0.05, 60000) for _ in range(5000)]
+    for value in values:
+        histogram.record(value)
+    values.sort()
+    for pct in (50, 90, 99):
+        exact = values[int(len(values) * pct / 100) - 1]
+        assert abs(histogram.percentile(pct) - exact) / exact < 0.02, pct
+    assert histogram.count == 5000
+    assert histogram.min == values[0] and histogram.max == values[-1]
+
+def test_histogram_small_values_exact():
+    histogram = HdrHistogram()
+    for value in (0.001, 0.002, 0.1):
+        histogram.record(value)
+    histogram.record(-1.0)  # ignored
+    assert histogram.count == 3
+    assert histogram.percentile(50) == 0.002
+
+def test_histogram_merge():
+    a, b = HdrHistogram(), HdrHistogram()
+    a.record(10.0)
+    b.record(1000.0)
+    a.merge(b)
+    assert a.count == 2 and a.max == 1000.0 and a.min == 10.0
+
+def test_turn_intervals():
+    clock = FakeClock()
+    tracker = LatencyTracker(clock=clock)
+    steps = [(SPEECH_END, 0.0), (FINAL_TRANSCRIPT, 0.4), (INTENT_DISPATCH, 2.0), (LLM_FIRST_BYTE, 0.3),
+             (REPLY_COMPLETE, 0.5), (TTS_FIRST_SAMPLE, 0.2), (PLAYBACK_END, 1.5), (LISTEN_RESUME, 2.0)]
+    for boundary, step in steps:
+        clock.now += step
+        tracker.mark("kitchen", boundary)
+    intervals = tracker.finish("kitchen")
+    assert round(intervals["endpointing"]) == 400
+    assert round(intervals["flush_wait"]) == 2000
+    assert round(intervals["llm_first_byte"]) == 300
+    assert round(intervals["answer"]) == 800
+    assert round(intervals["response"]) == 3400
+    assert round(intervals["turn"]) == 6900
+    assert tracker.finish("kitchen") == {}
+    assert "endpointing" in tracker.dump()
+
+def test_partial_and_out_of_order_turns():
+    clock = FakeClock()
+    tracker = LatencyTracker(clock=clock)
+    tracker.mark("api", INTENT_DISPATCH)
+    tracker.mark("api", LLM_FIRST_BYTE, at=clock.now - 0.5)  # speculative request started earlier
+    clock.now += 1.0
+    tracker.mark("api", REPLY_COMPLETE)
+    intervals = tracker.finish("api")
+    assert set(intervals) == {"answer"}
+    assert tracker.histograms["llm_first_byte"].count == 0
+
+def test_observe_and_dump_json():
+    tracker = LatencyTracker()
+    tracker.observe("vosk_block", 42.0)
+    path = os.path.join(tempfile.mkdtemp(), "latency.json")
+    tracker.dump_json(path)
+    with open(path) as f:
+        data = json.load(f)
+    assert data["histograms"]["vosk_block"]["count"] == 1
+    tracker.reset()
+    assert tracker.dump() == "no turns recorded yet"
+
+def main():
+    print("⏱️  Testing Latency Tracking")
+    print("=" * 40)
+
+    tests = [
+        test_histogram_percentiles_within_precision,
+        test_histogram_small_values_exact,
+        test_histogram_merge,
+        test_turn_intervals,
+        test_partial_and_out_of_order_turns,
+        test_observe_and_dump_json,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"  ❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for the LLM backend against the bundled mock server (no network needed)
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from llm_backend import create_backend
+from mock_llm_server import mock_reply, start_mock_server
+
+MESSAGES = [
+    {"role": "system", "content": "You are NEPTR!"},
+    {"role": "user", "content": "what is your favorite pie"},
+]
+
+def test_complete():
+    server = start_mock_server(latency=0.0)
+    try:
+        backend = create_backend("mock", "neptr-mock", base_url=server.base_url)
+        response = backend.complete(MESSAGES)
+        assert response.text == mock_reply("what is your favorite pie")
+        assert response.status_code == 200
+        assert response.payload_bytes > 0
+        assert response.usage["prompt_tokens"] > 0
+    finally:
+        server.shutdown()
+
+def test_stream():
+    server = start_mock_server(latency=0.0, token_delay=0.001)
+    try:
+        backend = create_backend("mock", "neptr-mock", base_url=server.base_url, stream=True)
+        response = backend.complete(MESSAGES)
+        assert response.text == mock_reply("what is your favorite pie")
+        assert response.first_byte_ms <= response.latency_ms
+    finally:
+        server.shutdown()
+
+def test_latency_is_simulated():
+    server = start_mock_server(latency=0.2)
+    try:
+        backend = create_backend("mock", "neptr-mock", base_url=server.base_url)
+        assert backend.complete(MESSAGES).latency_ms >= 200
+    finally:
+        server.shutdown()
+
+def test_errors_and_health():
+    server = start_mock_server(latency=0.0, error_every=2)
+    try:
+        backend = create_backend("local", "neptr-mock", base_url=server.base_url)
+        assert backend.health()
+        backend.complete(MESSAGES)
+        try:
+            backend.complete(MESSAGES)
+            assert False, "expected HTTP 503"
+        except requests.exceptions.HTTPError as e:
+            assert e.response.status_code == 503
+    finally:
+        server.shutdown()
+
+def test_openai_needs_key():
+    assert create_backend("openai", "gpt-4o-mini", api_key=None) is None
+    assert create_backend("openai", "gpt-4o-mini", api_key="sk-test").base_url == "https://api.openai.com/v1"
+
+def main():
+    print("🧩 Testing LLM Backend with Mock Server")
+    print("=" * 40)
+
+    tests = [
+        test_complete,
+        test_stream,
+        test_latency_is_simulated,
+        test_errors_and_health,
+        test_openai_needs_key,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"  ❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test script for the low-memory profile and RSS budget (no microphone or model needed)
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from memory_budget import MemoryBudget, RecognizerPool, drop_file_cache, low_memory_settings, trim_heap
+from semantic_cache import SemanticCache
+
+class FakeRecognizer:
+    def __init__(self, sample_rate):
+        self.sample_rate = sample_rate
+        self.resets = 0
+
+    def Reset(self):
+        self.resets += 1
+
+def test_low_memory_settings_only_shrink():
+    settings = {"PIPELINE_QUEUE_SIZES": {"capture": 16, "asr": 4, "intent": 64, "tts": 4},
+                "SEMANTIC_CACHE_SIZE": 32, "LOG_QUEUE_SIZE": 10000, "UNRELATED": 1}
+    changed = low_memory_settings(settings)
+    assert changed == {"PIPELINE_QUEUE_SIZES": {"capture": 8, "asr": 4, "intent": 16, "tts": 2},
+                       "LOG_QUEUE_SIZE": 1000}
+
+def test_recognizer_pool_reuses_and_resets():
+    pool = RecognizerPool(FakeRecognizer, idle=1)
+    with pool.recognizer(16000) as first:
+        pass
+    with pool.recognizer(16000) as again:
+        assert again is first
+    assert first.resets == 2 and pool.created == 1 and pool.reused == 1
+
+    # Concurrent users get their own; only `idle` are kept afterwards
+    a, b = pool.acquire(16000), pool.acquire(16000)
+    assert a is not b
+    pool.release(16000, a)
+    pool.release(16000, b)
+    assert len(pool) == 1
+    with pool.recognizer(8000) as other:
+        assert other.sample_rate == 8000
+    assert pool.shed() == 2 and len(pool) == 0
+
+def test_budget_sheds_in_order_until_under():
+    rss = {"value": 900}
+    shed = []
+
+    def shedder(name, frees):
+        def run():
+            shed.append(name)
+            rss["value"] -= frees
+        return run
+
+    budget = MemoryBudget(700, measure=lambda: rss["value"], trim=lambda: False, log=lambda message: None)
+    budget.add("model", size=lambda: 500)
+    budget.add("pool", shed=shedder("pool", 50))
+    budget.add("cache", size=lambda: 200, shed=shedder("cache", 200))
+    budget.add("sessions", shed=shedder("sessions", 100))
+
+    assert budget.check() == ["pool", "cache"]
+    assert shed == ["pool", "cache"] and budget.backoff == 1
+    assert budget.check() == []
+    assert budget.breakdown() == {"model": 500, "cache": 200, "other": 0, "total": 650}
+
+def test_budget_backs_off_when_shedding_is_not_enough():
+    logged = []
+    budget = MemoryBudget(100, measure=lambda: 300, trim=lambda: False, log=logged.append)
+    budget.add("cache", size=lambda: 50, shed=lambda: None)
+    budget.check()
+    budget.check()
+    assert budget.backoff == 4 and budget.sheds == 2
+    assert "Still over the memory budget" in logged[-1] and "cache" in logged[-1]
+    report = budget.report()
+    assert report.startswith("Resident memory: 0.0 MB of 0 MB budget") and "other" in report
+
+def test_no_limit_only_reports():
+    budget = MemoryBudget(0, measure=lambda: 10 ** 9, log=lambda message: None)
+    budget.add("cache", shed=lambda: (_ for _ in ()).throw(AssertionError("shed without a limit")))
+    assert budget.check() == []
+
+def test_os_helpers():
+    assert isinstance(trim_heap(), bool)
+    with tempfile.TemporaryDirectory() as directory:
+        os.makedirs(os.path.join(directory, "am"))
+        with open(os.path.join(directory, "am", "final.mdl"), "wb") as f:
+            f.write(b"\0" * 4096)
+        assert drop_file_cache(directory) in (0, 4096)
+
+def test_semantic_cache_memory_bytes():
+    cache = SemanticCache(max_size=8, dim=64)
+    empty = cache.memory_bytes()
+    assert empty == 8 * 64 * 4 + 8 * 8 * 2
+    cache.add("what is your favorite pie", "Cherry pie!")
+    assert cache.memory_bytes() == empty + len("Cherry pie!")
+
+def main():
+    print("🧠 NEPTR Memory Budget Test")
+    print("=" * 40)
+
+    tests = [
+        test_low_memory_settings_only_shrink,
+        test_recognizer_pool_reuses_and_resets,
+        test_budget_sheds_in_order_until_under,
+        test_budget_backs_off_when_shedding_is_not_enough,
+        test_no_limit_only_reports,
+        test_os_helpers,
+        test_semantic_cache_memory_bytes,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"  ❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
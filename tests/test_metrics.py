@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test script for the Prometheus metrics endpoint (no microphone or model needed)
+"""
+
+import os
+import re
+import sys
+import urllib.error
+import urllib.request
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversation import ConversationMachine, Transcript
+from metrics import NeptrMetrics, Registry, start_metrics_server
+from rate_limiter import TokenBucket
+from wake_words import WakeMatcher
+
+def test_counter_and_gauge_render():
+    registry = Registry()
+    callbacks = registry.counter("neptr_audio_callbacks_total", "Audio blocks", ["room"])
+    depth = registry.gauge("neptr_queue_depth", "Queue depth", ["queue"])
+    callbacks.inc(room="kitchen")
+    callbacks.inc(2, room="kitchen")
+    callbacks.inc(room='say "hi"')
+    depth.set(7, queue="capture")
+    text = registry.render()
+    assert "# TYPE neptr_audio_callbacks_total counter" in text
+    assert 'neptr_audio_callbacks_total{room="kitchen"} 3' in text
+    assert 'neptr_audio_callbacks_total{room="say \\"hi\\""} 1' in text
+    assert 'neptr_queue_depth{queue="capture"} 7' in text
+    assert callbacks.get(room="kitchen") == 3 and callbacks.get(room="office") == 0
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    tts = registry.histogram("neptr_tts_seconds", "TTS time", buckets=(0.5, 1.0))
+    for value in (0.2, 0.7, 0.9, 3.0):
+        tts.observe(value)
+    text = registry.render()
+    assert 'neptr_tts_seconds_bucket{le="0.5"} 1' in text
+    assert 'neptr_tts_seconds_bucket{le="1.0"} 3' in text
+    assert 'neptr_tts_seconds_bucket{le="+Inf"} 4' in text
+    assert "neptr_tts_seconds_count 4" in text
+    assert re.search(r"neptr_tts_seconds_sum 4\.8", text)
+    assert tts.count() == 4
+
+def test_collectors_run_on_scrape():
+    registry = NeptrMetrics()
+    calls = []
+
+    def collect():
+        calls.append(1)
+        registry.resident_memory.set(1234)
+
+    def broken():
+        raise RuntimeError("collector failed")
+
+    registry.add_collector(broken)
+    registry.add_collector(collect)
+    text = registry.render()
+    assert calls == [1]
+    assert "process_resident_memory_bytes 1234" in text
+
+def test_http_endpoint():
+    registry = NeptrMetrics()
+    registry.llm_requests.inc(backend="mock", code="200")
+    registry.llm_requests.inc(backend="mock", code="Timeout")
+    server = start_metrics_server(registry, port=0)
+    try:
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{base}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            body = response.read().decode()
+        assert 'neptr_llm_requests_total{backend="mock",code="Timeout"} 1' in body
+        try:
+            urllib.request.urlopen(f"{base}/other", timeout=5)
+            assert False, "expected 404"
+        except urllib.error.HTTPError as e:
+            assert e.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_rate_limiter_metrics():
+    now = [0.0]
+    bucket = TokenBucket(rate=1.0, burst=1, clock=lambda: now[0], sleep=lambda seconds: now.__setitem__(0, now[0] + seconds))
+    bucket.acquire()
+    bucket.acquire()  # waits a second
+    assert bucket.acquire(max_wait=0.5) is None
+    bucket.penalize(5.0)
+    metrics = NeptrMetrics()
+    metrics.set_rate_limiter(bucket.stats())
+    text = metrics.render()
+    assert "neptr_api_rate_limit_queue_depth 0" in text
+    assert 'neptr_api_rate_limit_wait_seconds{stat="max"} 1' in text
+    assert 'neptr_api_rate_limit_wait_seconds{stat="avg"} 0.5' in text
+    assert "neptr_api_rate_limit_rejected_total 1" in text
+    assert "neptr_api_rate_limit_throttled_total 1" in text
+
+def test_wake_counters():
+    matcher = WakeMatcher(["hello neptr"])
+    assert matcher.near_miss("hey there")
+    assert matcher.near_miss("nester")
+    assert not matcher.near_miss("hello neptr")
+    assert not matcher.near_miss("this is a whistle")
+
+    machine = ConversationMachine(
+        speak=lambda text: None,
+        submit=lambda command: None,
+        wake_matcher=matcher,
+        goodbye_pat=re.compile(r"\bgoodbye\b"),
+        lines={"greeting": ["hi!"], "goodbye": ["bye!"], "timeout": ["sleepy!"], "filler": ["hmm!"]},
+        fallback=lambda: "fallback!",
+        clock=lambda: 0.0,
+        log=lambda message: None,
+    )
+    machine.dispatch(Transcript("hey there", True))
+    machine.dispatch(Transcript("what a nice day", True))
+    machine.dispatch(Transcript("hello neptr", True))
+    assert machine.counters["wake_suppressed"] == 1
+    assert machine.counters["wake_detections"] == 1
+
+def main():
+    print("📈 NEPTR Metrics Test")
+    print("=" * 40)
+
+    tests = [
+        test_counter_and_gauge_render,
+        test_histogram_buckets_are_cumulative,
+        test_collectors_run_on_scrape,
+        test_http_endpoint,
+        test_rate_limiter_metrics,
+        test_wake_counters,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"  ❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
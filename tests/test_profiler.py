@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script for the on-demand sampling profiler (no microphone or model needed)
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import Registry, start_metrics_server
+from profiler import SamplingProfiler
+
+def spin_inner(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+def spin_outer(stop):
+    spin_inner(stop)
+
+def run_busy_thread(profiler, seconds=0.3):
+    stop = threading.Event()
+    worker = threading.Thread(target=spin_outer, args=(stop,), name="busy-worker")
+    worker.start()
+    profiler.start()
+    time.sleep(seconds)
+    profiler.stop()
+    stop.set()
+    worker.join()
+
+def test_samples_busy_thread():
+    profiler = SamplingProfiler(interval=0.005)
+    run_busy_thread(profiler)
+    assert profiler.samples >= 10, profiler.samples
+    busy = {stack: count for stack, count in profiler.stacks.items() if stack[0] == "busy-worker"}
+    assert busy, list(profiler.stacks)[:3]
+    # Outer frames come first, and the outer function calls the inner one
+    stack = max(busy, key=busy.get)
+    outer = next(i for i, frame in enumerate(stack) if frame.startswith("spin_outer "))
+    assert stack[outer + 1].startswith("spin_inner ")
+    # The profiler's own thread is never sampled
+    assert not any(stack[0] == "neptr-profiler" for stack in profiler.stacks)
+
+def test_collapsed_output_and_breakdown():
+    profiler = SamplingProfiler()
+    profiler.stacks.update({("main", "a (x.py:1)", "b (x.py:5)"): 3, ("main", "a (x.py:1)"): 1})
+    profiler.samples, profiler.duration = 4, 0.04
+    lines = profiler.collapsed().splitlines()
+    assert lines == ["main;a (x.py:1);b (x.py:5) 3", "main;a (x.py:1) 1"]
+    assert profiler.functions() == [("b (x.py:5)", 3, 3), ("a (x.py:1)", 1, 4)]
+    report = profiler.report()
+    assert "75.0%" in report and "100.0%" in report
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "profile.collapsed")
+        profiler.write(path)
+        with open(path) as f:
+            assert f.read() == profiler.collapsed()
+
+def test_start_stop_are_idempotent():
+    profiler = SamplingProfiler()
+    assert profiler.stop() is False
+    assert profiler.start() is True
+    assert profiler.start() is False and profiler.running
+    assert profiler.stop() is True
+    assert not profiler.running
+
+def test_metrics_endpoint_routes():
+    profiler = SamplingProfiler(interval=0.005)
+    routes = {
+        "/debug/profile/start": lambda: "started\n" if profiler.start() else "running\n",
+        "/debug/profile/stop": lambda: profiler.collapsed() if profiler.stop() else "",
+    }
+    server = start_metrics_server(Registry(), port=0, routes=routes)
+    try:
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{base}/debug/profile/start", timeout=5) as response:
+            assert response.read() == b"started\n"
+        time.sleep(0.1)
+        with urllib.request.urlopen(f"{base}/debug/profile/stop", timeout=5) as response:
+            body = response.read().decode()
+        assert body and all(line.rsplit(" ", 1)[1].isdigit() for line in body.splitlines())
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def main():
+    print("🔥 NEPTR Profiler Test")
+    print("=" * 40)
+
+    tests = [
+        test_samples_busy_thread,
+        test_collapsed_output_and_breakdown,
+        test_start_stop_are_idempotent,
+        test_metrics_endpoint_routes,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"  ❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script for the token-bucket API rate limiter
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limiter import TokenBucket, parse_retry_after
+
+class FakeClock:
+    """Manually advanced clock so no test ever really sleeps"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+def make_bucket(rate, burst):
+    clock = FakeClock()
+    return TokenBucket(rate=rate, burst=burst, clock=clock, sleep=clock.sleep), clock
+
+def test_burst_then_rate():
+    """A burst goes straight through, then calls are spaced by the rate"""
+    bucket, _ = make_bucket(rate=1.0, burst=3)
+    waits = [bucket.reserve() for _ in range(5)]
+    assert waits == [0.0, 0.0, 0.0, 1.0, 2.0], waits
+
+def test_refills_over_time():
+    """Idle time refills the bucket"""
+    bucket, clock = make_bucket(rate=2.0, burst=2)
+    bucket.reserve()
+    bucket.reserve()
+    clock.now += 1.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+
+def test_max_wait_rejects():
+    """Callers that would wait too long are turned away without reserving"""
+    bucket, _ = make_bucket(rate=1.0, burst=1)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve(max_wait=0.5) is None
+    assert bucket.reserve(max_wait=2.0) == 1.0
+    assert bucket.stats()["rejected"] == 1
+
+def test_retry_after_penalty():
+    """A 429 holds back every request for Retry-After seconds"""
+    bucket, clock = make_bucket(rate=10.0, burst=5)
+    bucket.penalize(4.0)
+    assert abs(bucket.acquire() - 4.0) < 1e-9
+    assert clock.now == 104.0
+    assert bucket.stats()["throttled"] == 1
+
+def test_wait_metrics():
+    bucket, _ = make_bucket(rate=1.0, burst=1)
+    for _ in range(3):
+        bucket.acquire()
+    stats = bucket.stats()
+    assert stats["acquired"] == 3
+    assert stats["max_wait_sec"] == 1.0
+    assert stats["queue_depth"] == 0
+
+def test_parse_retry_after():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after(None, default=2.0) == 2.0
+    assert parse_retry_after("garbage", default=3.0) == 3.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+def main():
+    print("🚦 Testing API Rate Limiter")
+    print("=" * 40)
+
+    tests = [
+        test_burst_then_rate,
+        test_refills_over_time,
+        test_max_wait_rejects,
+        test_retry_after_penalty,
+        test_wait_metrics,
+        test_parse_retry_after,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"  ❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
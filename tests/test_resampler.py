@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script for the polyphase resampler used for native-rate capture (no microphone needed)
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from audio_dsp import PolyphaseResampler, block_rms
+from benchmark import bench_resample
+
+RATE = 16000
+
+def tone(freq, rate, seconds=2.0, amp=10000):
+    t = np.arange(int(rate * seconds)) / rate
+    return (amp * np.sin(2 * np.pi * freq * t)).astype(np.int16).tobytes()
+
+def run(resampler, pcm, block_bytes):
+    out = b"".join(resampler.process(pcm[i:i + block_bytes]) for i in range(0, len(pcm), block_bytes))
+    return np.frombuffer(out, dtype=np.int16)
+
+def test_tone_comes_through_intact():
+    for native in (48000, 44100, 22050, 8000):
+        resampler = PolyphaseResampler(native, RATE)
+        out = run(resampler, tone(1000, native), block_bytes=native)  # 0.5 s blocks, as captured
+        t = np.arange(out.size) / RATE - resampler.delay_sec
+        expected = 10000 * np.sin(2 * np.pi * 1000 * t)
+        error = np.abs(out[400:-400] - expected[400:-400]).max()
+        assert error < 3, (native, error)
+
+def test_removes_frequencies_above_the_new_nyquist():
+    for native in (48000, 44100):
+        resampler = PolyphaseResampler(native, RATE)
+        out = run(resampler, tone(9000, native), block_bytes=native)
+        # 9 kHz would fold back to 7 kHz; the filter leaves less than -60 dB of it
+        assert block_rms(out[800:].tobytes()) < 10000 / np.sqrt(2) / 1000, native
+
+def test_output_length_follows_the_ratio():
+    resampler = PolyphaseResampler(44100, RATE)
+    assert (resampler.up, resampler.down) == (160, 441)
+    total = 0
+    for _ in range(20):
+        total += len(resampler.process(bytes(2 * 22050))) // 2
+    assert abs(total - 20 * 8000) <= 1, total
+    assert resampler.process(b"") == b""
+
+def test_block_size_does_not_change_the_output():
+    pcm = tone(440, 48000) + tone(3000, 48000, seconds=0.5)
+    whole = run(PolyphaseResampler(48000, RATE), pcm, block_bytes=len(pcm))
+    odd = run(PolyphaseResampler(48000, RATE), pcm, block_bytes=2 * 777)
+    assert np.array_equal(whole, odd)
+
+def test_same_rate_is_a_passthrough():
+    pcm = tone(440, RATE, seconds=0.1)
+    assert PolyphaseResampler(RATE, RATE).process(pcm) == pcm
+
+def test_fast_enough_for_a_pi():
+    result = bench_resample(quick=True)
+    assert result["median"] < 0.1 and result["44100"] < 0.1, result
+
+def main():
+    print("🎛️ NEPTR Resampler Test")
+    print("=" * 40)
+
+    tests = [
+        test_tone_comes_through_intact,
+        test_removes_frequencies_above_the_new_nyquist,
+        test_output_length_follows_the_ratio,
+        test_block_size_does_not_change_the_output,
+        test_same_rate_is_a_passthrough,
+        test_fast_enough_for_a_pi,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"  ❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Test script for the asynchronous response pipeline (racing, hedging, cancellation)
+"""
+
+import gc
+import io
+import logging
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from response_pipeline import ResponsePipeline
+
+def make_pipeline(llm_delay, llm_reply="LLM answer", cache_reply=None, **kwargs):
+    calls = []
+
+    def cache(text):
+        calls.append("cache")
+        return cache_reply
+
+    def llm(text):
+        calls.append("llm")
+        time.sleep(llm_delay)
+        return llm_reply
+
+    pipeline = ResponsePipeline(
+        sources=[("cache", cache, 0.0), ("llm", llm, 0.05)],
+        log=lambda message: None,
+        **kwargs,
+    )
+    return pipeline, calls
+
+def quietly(test):
+    """Run test and return what asyncio logged (e.g. "Task was destroyed but it is pending!")"""
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    logger = logging.getLogger("asyncio")
+    logger.addHandler(handler)
+    try:
+        test()
+        gc.collect()
+    finally:
+        logger.removeHandler(handler)
+    return stream.getvalue()
+
+def test_first_answer_wins():
+    """The LLM answers when the cache has nothing"""
+    pipeline, calls = make_pipeline(0.01)
+    try:
+        assert pipeline.submit("hello").result(timeout=1.0) == ("llm", "LLM answer")
+        assert calls == ["cache", "llm"]
+    finally:
+        pipeline.shutdown()
+
+def test_hedging_skips_llm():
+    """A cache hit inside the hedge delay means the LLM is never called"""
+    pipeline, calls = make_pipeline(0.01, cache_reply="cached answer")
+    try:
+        assert pipeline.submit("hello").result(timeout=1.0) == ("cache", "cached answer")
+        time.sleep(0.1)
+        assert "llm" not in calls
+    finally:
+        pipeline.shutdown()
+
+def test_cancelled_race_stops_waiting_sources():
+    """Cancelling at the deadline ends the race; hedged sources not yet started never run"""
+    def run():
+        pipeline, calls = make_pipeline(0.01)
+        pipeline.sources[1] = ("llm", pipeline.sources[1][1], 0.2)
+        try:
+            future = pipeline.submit("hello")
+            time.sleep(0.05)
+            assert future.cancel()
+            time.sleep(0.3)
+            assert calls == ["cache"]
+        finally:
+            pipeline.shutdown()
+
+    assert "destroyed" not in quietly(run)
+
+def test_losers_and_shutdown_leave_nothing_pending():
+    """The winner's race cancels the slow source; shutdown cancels races still running"""
+    def run():
+        pipeline = ResponsePipeline(
+            sources=[("fast", lambda text: "fast answer", 0.0), ("slow", lambda text: time.sleep(0.3), 0.0)],
+            log=lambda message: None,
+        )
+        slow = ResponsePipeline(sources=[("slow", lambda text: time.sleep(0.3), 0.0)], log=lambda message: None)
+        try:
+            assert pipeline.submit("hello").result(timeout=1.0) == ("fast", "fast answer")
+            still_running = slow.submit("hello")
+            time.sleep(0.05)
+        finally:
+            pipeline.shutdown()
+            slow.shutdown()
+        assert still_running.cancelled()
+
+    assert "destroyed" not in quietly(run)
+
+def test_abandoned_llm_calls_do_not_delay_local_answers():
+    """Cancelled races leave their LLM calls running; instant answers don't wait for them"""
+    def local(text):
+        return "It's noon!" if text == "what time is it" else None
+
+    pipeline = ResponsePipeline(
+        sources=[("local", local, 0.0), ("llm", lambda text: time.sleep(0.5) or "LLM answer", 0.0)],
+        max_workers=2,
+        log=lambda message: None,
+    )
+    try:
+        for _ in range(4):
+            race = pipeline.submit("tell me a story")
+            time.sleep(0.02)  # the LLM call has started
+            race.cancel()
+        start = time.monotonic()
+        assert pipeline.submit("what time is it").result(timeout=1.0) == ("local", "It's noon!")
+        assert time.monotonic() - start < 0.2
+    finally:
+        pipeline.shutdown()
+
+def test_failing_source_is_ignored():
+    """A source that raises does not prevent other answers"""
+    def broken(text):
+        raise RuntimeError("boom")
+
+    pipeline = ResponsePipeline(
+        sources=[("broken", broken, 0.0), ("ok", lambda text: "fine", 0.0)],
+        log=lambda message: None,
+    )
+    try:
+        assert pipeline.submit("hello").result(timeout=1.0) == ("ok", "fine")
+    finally:
+        pipeline.shutdown()
+
+def main():
+    print("⏱️  Testing Response Pipeline")
+    print("=" * 40)
+
+    tests = [
+        test_first_answer_wins,
+        test_hedging_skips_llm,
+        test_cancelled_race_stops_waiting_sources,
+        test_losers_and_shutdown_leave_nothing_pending,
+        test_abandoned_llm_calls_do_not_delay_local_answers,
+        test_failing_source_is_ignored,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"  ❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
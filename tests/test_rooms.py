@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test script for the multi-room fair scheduler (no microphone or model needed)
+"""
+
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rooms import FairScheduler, rss_bytes
+from stages import BLOCK
+
+def wait_for(condition, timeout=3.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+def busy(seconds):
+    def handle(item):
+        time.sleep(seconds)
+        return item
+    return handle
+
+def test_results_reach_each_room():
+    results = {"kitchen": [], "office": []}
+    scheduler = FairScheduler(workers=2)
+    for name in results:
+        scheduler.add_lane(name, lambda item: item.upper(), output=results[name].append)
+    scheduler.start()
+    try:
+        scheduler.submit("kitchen", "a")
+        scheduler.submit("office", "b")
+        scheduler.submit("kitchen", "c")
+        assert wait_for(lambda: len(results["kitchen"]) == 2 and len(results["office"]) == 1)
+        assert results["kitchen"] == ["A", "C"] and results["office"] == ["B"]
+    finally:
+        scheduler.stop()
+
+def test_heavy_room_does_not_starve_light_room():
+    """With one worker, a room sending expensive audio still leaves time for the others"""
+    order = []
+    scheduler = FairScheduler(workers=1)
+    scheduler.add_lane("noisy", busy(0.03), output=lambda item: order.append("noisy"), maxsize=0)
+    scheduler.add_lane("quiet", busy(0.01), output=lambda item: order.append("quiet"), maxsize=0)
+    for i in range(10):
+        scheduler.submit("noisy", i)
+    for i in range(3):
+        scheduler.submit("quiet", i)
+    scheduler.start()
+    try:
+        assert wait_for(lambda: len(order) == 13)
+        # All quiet blocks are done long before the noisy backlog drains
+        assert max(i for i, name in enumerate(order) if name == "quiet") < 6
+    finally:
+        scheduler.stop()
+
+def test_one_worker_per_room_at_a_time():
+    active, overlaps = set(), []
+    lock = threading.Lock()
+
+    def handle(item):
+        with lock:
+            if "kitchen" in active:
+                overlaps.append(item)
+            active.add("kitchen")
+        time.sleep(0.01)
+        with lock:
+            active.discard("kitchen")
+
+    scheduler = FairScheduler(workers=4)
+    lane = scheduler.add_lane("kitchen", handle, maxsize=0)
+    scheduler.start()
+    try:
+        for i in range(10):
+            scheduler.submit("kitchen", i)
+        assert wait_for(lambda: lane.processed == 10)
+        assert overlaps == []
+    finally:
+        scheduler.stop()
+
+def test_blocking_lane_does_not_deadlock():
+    """A full "block" lane makes submit() wait for the worker, not hold it off"""
+    results = []
+    scheduler = FairScheduler(workers=1)
+    lane = scheduler.add_lane("kitchen", busy(0.02), output=results.append, maxsize=1, policy=BLOCK)
+    scheduler.start()
+    feeder = threading.Thread(target=lambda: [scheduler.submit("kitchen", i) for i in range(10)], daemon=True)
+    try:
+        feeder.start()
+        feeder.join(timeout=3.0)
+        assert not feeder.is_alive(), "submit() is stuck"
+        assert wait_for(lambda: len(results) == 10)
+        assert results == list(range(10)) and lane.stats()["drops"] == 0
+    finally:
+        scheduler.stop()
+
+def test_errors_are_logged_and_counted():
+    results, logged = [], []
+    scheduler = FairScheduler(workers=1, log=logged.append)
+    lane = scheduler.add_lane("kitchen", lambda item: 10 // item, output=results.append)
+    scheduler.start()
+    try:
+        scheduler.submit("kitchen", 0)
+        scheduler.submit("kitchen", 5)
+        assert wait_for(lambda: results == [2])
+        assert logged == ["Room 'asr:kitchen' error: integer division or modulo by zero"]
+        assert lane.errors == 1
+    finally:
+        scheduler.stop()
+
+def test_stats_and_memory():
+    scheduler = FairScheduler(workers=1)
+    lane = scheduler.add_lane("kitchen", busy(0.0), maxsize=2)
+    for i in range(3):
+        scheduler.submit("kitchen", i)
+    stats = lane.stats()
+    assert stats["drops"] == 1 and stats["occupancy"] == 2
+    assert rss_bytes() > 0
+
+def main():
+    print("🏠 Testing Multi-Room Scheduler")
+    print("=" * 40)
+
+    tests = [
+        test_results_reach_each_room,
+        test_heavy_room_does_not_starve_light_room,
+        test_one_worker_per_room_at_a_time,
+        test_blocking_lane_does_not_deadlock,
+        test_errors_are_logged_and_counted,
+        test_stats_and_memory,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"  ❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
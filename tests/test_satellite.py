@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test script for the satellite audio protocol over localhost (no microphone needed)
+"""
+
+import io
+import os
+import socket
+import sys
+import time
+import zlib
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from satellite import (AUDIO, FLAG_ZLIB, HEADER, MAGIC, MAX_PAYLOAD, JitterBuffer,
+                       ProtocolError, SatelliteClient, encode_frame, read_frame,
+                       start_satellite_server)
+
+def wait_for(condition, timeout=3.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+def test_frame_round_trip():
+    silence = b"\x00\x00" * 1600
+    data = encode_frame(AUDIO, 7, silence, compress=True)
+    assert data[3] & FLAG_ZLIB and len(data) < HEADER.size + len(silence)
+    frame = read_frame(io.BytesIO(data))
+    assert frame.type == AUDIO and frame.seq == 7 and frame.payload == silence
+    assert read_frame(io.BytesIO(data[:10])) is None
+
+def test_compressed_frame_cannot_inflate_past_the_limit():
+    bomb = zlib.compress(bytes(MAX_PAYLOAD * 4), 9)
+    data = HEADER.pack(MAGIC, AUDIO, FLAG_ZLIB, 1, 0.0, len(bomb)) + bomb
+    try:
+        read_frame(io.BytesIO(data))
+    except ProtocolError:
+        return
+    assert False, "oversized frame was accepted"
+
+def test_jitter_buffer_orders_and_prefills():
+    jitter = JitterBuffer(target_frames=3)
+    jitter.push(0, b"a")
+    jitter.push(2, b"c")
+    assert jitter.pop() is None  # still prefilling
+    jitter.push(1, b"b")
+    jitter.push(1, b"b")         # duplicate
+    assert [jitter.pop(), jitter.pop(), jitter.pop()] == [b"a", b"b", b"c"]
+    assert jitter.pop() is None
+    stats = jitter.stats()
+    assert stats["late"] == 1 and stats["underruns"] == 1
+
+def test_jitter_buffer_skips_lost_and_drains():
+    jitter = JitterBuffer(target_frames=2)
+    for seq in (0, 2, 3):
+        jitter.push(seq, bytes([seq]))
+    assert jitter.pop() == b"\x00"
+    assert jitter.pop() == b"\x02"  # frame 1 never came
+    jitter.drain()
+    assert jitter.pop() == b"\x03"
+    assert jitter.pop() is None
+    assert jitter.stats()["lost"] == 1 and jitter.drained == 1
+
+def test_audio_in_speech_out():
+    received = []
+    server = start_satellite_server(lambda name, rate: received.append if name == "kitchen" else None,
+                                    host="127.0.0.1", ping_sec=0.05, log=lambda message: None)
+    played = []
+    client = SatelliteClient("127.0.0.1", server.address[1], "kitchen", jitter_frames=2,
+                             frame_ms=10, on_audio=lambda pcm, rate: played.append(pcm)).connect()
+    try:
+        blocks = [bytes([i]) * 320 for i in range(5)]
+        for block in blocks:
+            client.send_audio(block)
+        assert wait_for(lambda: len(received) == 5)
+        assert received == blocks
+
+        speech = bytes(range(256)) * 50
+        assert wait_for(lambda: server.connected("kitchen"))
+        duration = server.send_speech("kitchen", speech, 16000, frame_ms=20)
+        assert abs(duration - len(speech) / 2 / 16000) < 1e-9
+        assert wait_for(lambda: client.stats()["speech_finished"] == 1)
+        assert b"".join(played) == speech
+
+        assert wait_for(lambda: server.stats()["kitchen"]["rtt_ms"] is not None)
+        stats = server.stats()["kitchen"]
+        assert stats["frames"] == 5 and stats["gaps"] == 0
+        assert stats["wire_bytes"] < stats["audio_bytes"]
+    finally:
+        client.close()
+        server.stop()
+
+def test_long_reply_is_played_in_full():
+    server = start_satellite_server(lambda name, rate: (lambda pcm: None), host="127.0.0.1", ping_sec=0,
+                                    log=lambda message: None)
+    played = []
+    client = SatelliteClient("127.0.0.1", server.address[1], "kitchen", jitter_frames=2,
+                             frame_ms=10, on_audio=lambda pcm, rate: played.append(pcm)).connect()
+    try:
+        frames = client.jitter.max_frames + 30  # longer than the jitter buffer can hold
+        speech = b"".join(bytes([i % 256]) * 320 for i in range(frames))
+        assert wait_for(lambda: server.connected("kitchen"))
+        started = time.monotonic()
+        server.send_speech("kitchen", speech, 16000, frame_ms=10)
+        assert time.monotonic() - started > (frames - 5) * 0.01 * 0.9  # paced, not sent in one burst
+        assert wait_for(lambda: client.stats()["speech_finished"] == 1)
+        assert len(played) == frames and b"".join(played) == speech
+        assert client.jitter.overflows == 0
+    finally:
+        client.close()
+        server.stop()
+
+def test_send_audio_never_blocks_on_a_stalled_link():
+    listener = socket.create_server(("127.0.0.1", 0))
+    client = SatelliteClient("127.0.0.1", listener.getsockname()[1], "kitchen",
+                             compress=False, send_queue_frames=10).connect()
+    peer, _ = listener.accept()  # never reads, so the socket buffers fill up
+    try:
+        block = bytes(64000)
+        started = time.monotonic()
+        for _ in range(300):  # ~19 MB, far more than the kernel will buffer
+            client.send_audio(block)
+        assert time.monotonic() - started < 1.0
+        assert client.stats()["send_drops"] > 0
+    finally:
+        client.close()
+        peer.close()
+        listener.close()
+
+def test_unknown_room_rejected():
+    server = start_satellite_server(lambda name, rate: None, host="127.0.0.1", ping_sec=0,
+                                    log=lambda message: None)
+    client = SatelliteClient("127.0.0.1", server.address[1], "attic").connect()
+    try:
+        assert wait_for(lambda: client.closed)
+        assert not server.connected("attic")
+    finally:
+        client.close()
+        server.stop()
+
+def main():
+    print("🛰️  Testing Satellite Protocol")
+    print("=" * 40)
+
+    tests = [
+        test_frame_round_trip,
+        test_compressed_frame_cannot_inflate_past_the_limit,
+        test_jitter_buffer_orders_and_prefills,
+        test_jitter_buffer_skips_lost_and_drains,
+        test_audio_in_speech_out,
+        test_long_reply_is_played_in_full,
+        test_send_audio_never_blocks_on_a_stalled_link,
+        test_unknown_room_rejected,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"  ❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
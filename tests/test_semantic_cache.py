@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test script for the semantic answer cache
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversation_context import ConversationContext
+from semantic_cache import SemanticCache, embed, normalize
+
+def test_normalize():
+    """Wake words, fillers and contractions are ignored"""
+    assert normalize("What's your name, Neptr?") == "what is your name"
+    assert normalize("hey neptr um tell me a joke please") == "tell me a joke"
+
+def test_near_duplicates_hit():
+    """Different phrasings of the same question share one answer"""
+    cache = SemanticCache(max_size=8, threshold=0.85)
+    cache.add("what is your name", "I am NEPTR!")
+
+    assert cache.lookup("what's your name") == "I am NEPTR!"
+    assert cache.lookup("what is your name neptr") == "I am NEPTR!"
+    assert cache.lookup("what is the capital of france") is None
+    assert cache.hits == 2 and cache.misses == 1
+
+def test_numbers_must_match():
+    """Similar math questions with different numbers never share an answer"""
+    cache = SemanticCache(max_size=8, threshold=0.5)
+    cache.add("what is two plus two", "Four!")
+
+    assert cache.lookup("what is two plus two") == "Four!"
+    assert cache.lookup("what is two plus three") is None
+
+def test_threshold_is_tunable():
+    """A looser threshold accepts looser paraphrases"""
+    strict = SemanticCache(max_size=8, threshold=0.95)
+    loose = SemanticCache(max_size=8, threshold=0.4)
+    for cache in (strict, loose):
+        cache.add("what is your name", "I am NEPTR!")
+
+    assert strict.lookup("tell me your name") is None
+    assert loose.lookup("tell me your name") == "I am NEPTR!"
+
+def test_bounded_size():
+    """The least recently used entry is evicted when full"""
+    cache = SemanticCache(max_size=2, threshold=0.9)
+    cache.add("what is your name", "I am NEPTR!")
+    cache.add("what is the capital of france", "Paris!")
+    cache.lookup("what is your name")  # refresh
+    cache.add("how do i make a pie", "With love!")
+
+    assert len(cache) == 2
+    assert cache.lookup("what is your name") == "I am NEPTR!"
+    assert cache.lookup("what is the capital of france") is None
+    assert cache.lookup("how do i make a pie") == "With love!"
+
+def test_ttl_expiry():
+    """Expired answers are not served"""
+    cache = SemanticCache(max_size=4, threshold=0.9, ttl_sec=1)
+    cache.add("what is your name", "I am NEPTR!")
+    cache._created[:] -= 10
+
+    assert cache.lookup("what is your name") is None
+
+def test_follow_ups_stay_in_their_conversation():
+    """An answer that leans on earlier turns is not served to another session"""
+    cache = SemanticCache(max_size=4, threshold=0.85)
+    kitchen = ConversationContext("You are NEPTR.", name="kitchen")
+    kitchen.add_turn("name two of finn's friends", "Jake and Princess Bubblegum!")
+    cache.add("and the second one", "She rules the Candy Kingdom!", follow_up=kitchen.has_history)
+
+    office = ConversationContext("You are NEPTR.", name="office")
+    assert not office.has_history
+    assert cache.lookup("and the second one", follow_up=office.has_history) is None
+    assert len(cache) == 0
+
+    cache.add("what is your name", "I am NEPTR!", follow_up=office.has_history)
+    assert cache.lookup("what is your name", follow_up=kitchen.has_history) is None
+    assert cache.lookup("what is your name", follow_up=office.has_history) == "I am NEPTR!"
+    assert cache.stats()["follow_ups"] == 1
+
+def test_embedding_is_normalized():
+    vec = embed("tell me about the land of ooo")
+    assert abs(float(vec @ vec) - 1.0) < 1e-5
+    assert not embed("neptr").any()
+
+def main():
+    print("🧠 Testing Semantic Answer Cache")
+    print("=" * 40)
+
+    tests = [
+        test_normalize,
+        test_near_duplicates_hit,
+        test_numbers_must_match,
+        test_threshold_is_tunable,
+        test_bounded_size,
+        test_ttl_expiry,
+        test_follow_ups_stay_in_their_conversation,
+        test_embedding_is_normalized,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"  ❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
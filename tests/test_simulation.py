@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script for whole conversation scenarios on a virtual clock (no microphone or model needed)
+Each scenario covers minutes of conversation and runs in milliseconds.
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversation import IDLE, LISTENING, SPEAKING, THINKING
+from simulation import Simulation
+
+def make_sim(**kwargs):
+    # Explicit timings so the scenarios don't depend on config.py edits
+    settings = dict(flush_sec=2.0, timeout_sec=30.0, echo_guard_sec=2.0, block_sec=0.5,
+                    endpoint_sec=0.5, answer_latency=0.5, rate_limit_sec=0)
+    settings.update(kwargs)
+    return Simulation(**settings)
+
+def test_wake_and_answer_timing():
+    sim = make_sim()
+    spoke_until = sim.say("hello neptr", at=1.0)
+    sim.run_until(5.0)
+    states = sim.states()
+    # Final transcript on the first audio block after the endpoint
+    assert states[0][1:] == ("wake", "wake word") and states[0][0] == 2.5, states
+    greeting_at, greeting = sim.spoken[0]
+    assert greeting_at == 2.5 and spoke_until < greeting_at
+    listening_at = greeting_at + sim.tts.duration(greeting) + 2.0
+    sim.run_until(listening_at + 0.1)
+    assert sim.machine.state == LISTENING and sim.states()[-1][0] == listening_at
+
+    end = sim.say("what is your favorite pie", at=listening_at + 1.0)
+    sim.run_until(listening_at + 10.0)
+    transcript_at = next(t for t, message in sim.log if message == "Heard: 'what is your favorite pie'")
+    assert end + 0.5 <= transcript_at < end + 1.0
+    thinking_at = next(t for t, state, cause in sim.states() if state == THINKING)
+    assert thinking_at == transcript_at + 2.0  # the buffer flush, to the millisecond
+    assert sim.spoken[1] == (thinking_at + 0.5, "Beep boop! You said what is your favorite pie!")
+
+def test_multi_turn_then_goodbye():
+    sim = make_sim()
+    sim.say("hey neptr", at=0.5)
+    sim.say("what is pi", at=12.0)
+    sim.say("tell me a joke about robots", at=24.0)
+    sim.say("okay that's all for now", at=40.0)
+    sim.run_until(60.0)
+    assert [command for _, command in sim.submitted] == ["what is pi", "tell me a joke about robots"]
+    assert sim.machine.state == IDLE
+    assert [cause for _, state, cause in sim.states() if state == SPEAKING] == \
+        ["greeting", "answer", "answer", "goodbye"]
+
+def test_silence_timeout():
+    sim = make_sim()
+    sim.say("hello neptr", at=1.0)
+    sim.run_until(100.0)
+    listening_at = next(t for t, state, _ in sim.states() if state == LISTENING)
+    timeout_at = next(t for t, state, cause in sim.states() if cause == "timeout")
+    assert timeout_at == listening_at + 30.0
+    assert sim.machine.state == IDLE and not sim.submitted
+
+def test_speech_while_speaking_is_not_heard():
+    sim = make_sim()
+    sim.say("hello neptr", at=1.0)
+    sim.say("are you there", at=3.0)  # over the greeting
+    sim.run_until(20.0)
+    assert not any("are you there" in message for _, message in sim.log)
+    assert sim.machine.state == LISTENING
+
+def test_rate_limited_turn_gets_fallback():
+    sim = make_sim(rate_limit_sec=20.0, rate_limit_burst=1)
+    sim.say("hello neptr", at=1.0)
+    sim.say("what is pi", at=10.0)
+    sim.say("what is tau", at=18.0)
+    sim.run_until(40.0)
+    replies = [text for _, text in sim.spoken]
+    assert "Beep boop! You said what is pi!" in replies
+    assert "Beep boop! My circuits are confused!" in replies  # would have waited ~15 s for the API
+
+def test_deterministic_and_fast():
+    def scenario():
+        sim = make_sim(seed=7)
+        sim.say("hi neptr", at=0.5)
+        for i in range(20):
+            sim.say(f"question number {i}", at=10.0 + i * 15.0)
+        sim.run_until(600.0)
+        return sim.states(), sim.spoken
+
+    start = time.perf_counter()
+    first = scenario()
+    elapsed = time.perf_counter() - start
+    assert first == scenario()
+    assert elapsed < 1.0, f"10 simulated minutes took {elapsed:.2f}s"
+
+def main():
+    print("⏰ NEPTR Simulation Test")
+    print("=" * 40)
+
+    tests = [
+        test_wake_and_answer_timing,
+        test_multi_turn_then_goodbye,
+        test_silence_timeout,
+        test_speech_while_speaking_is_not_heard,
+        test_rate_limited_turn_gets_fallback,
+        test_deterministic_and_fast,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"  ❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
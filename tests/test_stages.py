@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script for the bounded-queue processing pipeline (no microphone or model needed)
+"""
+
+import os
+import queue
+import sys
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stages import BLOCK, DROP_NEWEST, DROP_OLDEST, INLINE, PROCESS, Pipeline, Stage, StageQueue
+
+def wait_for(condition, timeout=3.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+def double(x):
+    return x * 2
+
+def test_drop_oldest():
+    q = StageQueue("capture", maxsize=3, policy=DROP_OLDEST)
+    for i in range(5):
+        q.put_nowait(i)
+    assert [q.get_nowait() for _ in range(3)] == [2, 3, 4]
+    stats = q.stats()
+    assert stats["drops"] == 2 and stats["overruns"] == 2 and stats["high_water"] == 3
+
+def test_drop_newest():
+    q = StageQueue("asr", maxsize=2, policy=DROP_NEWEST)
+    assert q.put(1) and q.put(2)
+    assert not q.put(3)
+    assert [q.get_nowait(), q.get_nowait()] == [1, 2]
+    try:
+        q.get(timeout=0.01)
+        assert False, "expected queue.Empty"
+    except queue.Empty:
+        pass
+
+def test_block_waits_for_consumer():
+    q = StageQueue("tts", maxsize=1, policy=BLOCK)
+    q.put("first")
+    assert not q.put("timed out", timeout=0.05)
+    threading.Timer(0.05, q.get).start()
+    assert q.put("second", timeout=1.0)
+    assert q.get_nowait() == "second"
+    assert q.stats()["overruns"] == 2
+
+def test_thread_stage_chain():
+    results = []
+    second = Stage("second", double, output=results.append)
+    first = Stage("first", double, output=second.submit)
+    pipeline = Pipeline([first, second])
+    pipeline.start()
+    try:
+        for i in range(5):
+            first.submit(i)
+        assert wait_for(lambda: len(results) == 5)
+        assert results == [0, 4, 8, 12, 16]
+        assert "first" in pipeline.report()
+    finally:
+        pipeline.stop()
+
+def test_inline_and_errors():
+    results, logged = [], []
+    stage = Stage("inline", lambda x: 10 // x, output=results.append, mode=INLINE, log=logged.append)
+    stage.submit(5)
+    stage.submit(0)
+    assert results == [2]
+    assert stage.stats()["processed"] == 2 and stage.stats()["errors"] == 1
+    assert logged == ["Stage 'inline' error: integer division or modulo by zero"]
+
+def test_process_stage():
+    results = []
+    stage = Stage("worker", double, output=results.append, mode=PROCESS)
+    stage.start()
+    try:
+        for i in range(3):
+            stage.submit(i)
+        assert wait_for(lambda: len(results) == 3)
+        assert sorted(results) == [0, 2, 4]
+    finally:
+        stage.stop()
+
+def main():
+    print("🚰 Testing Pipeline Stages")
+    print("=" * 40)
+
+    tests = [
+        test_drop_oldest,
+        test_drop_newest,
+        test_block_waits_for_consumer,
+        test_thread_stage_chain,
+        test_inline_and_errors,
+        test_process_stage,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"  ❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
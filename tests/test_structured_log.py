@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for the asynchronous logging layer (no microphone or model needed)
+"""
+
+import io
+import json
+import logging
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from structured_log import DroppingQueueHandler, setup_logging
+
+class SlowStream(io.StringIO):
+    """A terminal that takes its time, like stdout under back-pressure"""
+    def write(self, text):
+        time.sleep(0.05)
+        return super().write(text)
+
+def test_console_format_and_levels():
+    stream = io.StringIO()
+    log, listener = setup_logging("INFO", stream=stream)
+    log.debug("hidden")
+    log.info("Heard: %s", "hello neptr")
+    log.warning("TTS error")
+    listener.stop()
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 2, lines
+    assert lines[0].endswith("🤖 NEPTR: Heard: hello neptr")
+    assert lines[1].endswith("🤖 NEPTR: WARNING: TTS error")
+
+def test_json_file_with_extra_fields():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "neptr.log")
+        log, listener = setup_logging("DEBUG", console=False, to_file=True, path=path, json_format=True)
+        log.info("Heard something", extra={"room": "kitchen"})
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            log.exception("Unexpected error")
+        listener.stop()
+        with open(path) as f:
+            entries = [json.loads(line) for line in f]
+    assert entries[0]["msg"] == "Heard something" and entries[0]["room"] == "kitchen"
+    assert entries[0]["level"] == "INFO" and entries[0]["thread"] == threading.current_thread().name
+    assert entries[1]["level"] == "ERROR" and "ValueError: boom" in entries[1]["exc"]
+
+def test_rotation():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "neptr.log")
+        log, listener = setup_logging(console=False, to_file=True, path=path, max_bytes=500, backups=2)
+        for i in range(100):
+            log.info("line %d of a log that is long enough to rotate", i)
+        listener.stop()
+        files = sorted(os.listdir(tmp))
+    assert files == ["neptr.log", "neptr.log.1", "neptr.log.2"], files
+
+def test_slow_stream_never_blocks_caller():
+    stream = SlowStream()
+    log, listener = setup_logging(stream=stream)
+    start = time.perf_counter()
+    for i in range(20):
+        log.info("block %d", i)
+    elapsed = time.perf_counter() - start
+    listener.stop()
+    assert elapsed < 0.5, elapsed  # writing them takes 1 s
+    assert len(stream.getvalue().splitlines()) == 20
+
+def test_full_queue_drops():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    logger = logging.getLogger("neptr-test-drops")
+    logger.propagate = False
+    logger.addHandler(handler)
+    for i in range(5):
+        logger.warning("overflow %d", i)
+    logger.removeHandler(handler)
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+    assert handler.queue.get().msg == "overflow 0"
+
+def main():
+    print("📝 NEPTR Logging Test")
+    print("=" * 40)
+
+    tests = [
+        test_console_format_and_levels,
+        test_json_file_with_extra_fields,
+        test_rotation,
+        test_slow_stream_never_blocks_caller,
+        test_full_queue_drops,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"  ❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for Chrome-trace timeline export (no microphone or model needed)
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import urllib.request
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from headless_api import HeadlessAPI
+from tracer import Tracer
+
+class FakeClock:
+    def __init__(self):
+        self.now = 10.0
+
+    def __call__(self):
+        return self.now
+
+def test_spans_and_instants():
+    clock = FakeClock()
+    tracer = Tracer(clock=clock)
+    clock.now = 10.5
+    with tracer.span("AcceptWaveform", "asr", room="kitchen"):
+        clock.now = 10.52
+    tracer.instant("idle -> wake", "conversation", cause="wake word")
+    trace = tracer.to_chrome()
+    events = [e for e in trace["traceEvents"] if e["ph"] != "M"]
+    span, instant = events
+    assert span["ph"] == "X" and span["name"] == "AcceptWaveform" and span["cat"] == "asr"
+    assert span["ts"] == 500000.0 and abs(span["dur"] - 20000.0) < 0.2
+    assert span["args"] == {"room": "kitchen"}
+    assert instant["ph"] == "i" and instant["s"] == "t" and "dur" not in instant
+
+def test_ring_buffer_keeps_newest():
+    tracer = Tracer(capacity=3)
+    for i in range(10):
+        tracer.instant(f"block {i}")
+    trace = tracer.to_chrome()
+    names = [e["name"] for e in trace["traceEvents"] if e["ph"] != "M"]
+    assert names == ["block 7", "block 8", "block 9"]
+    assert trace["otherData"] == {"recorded": 10, "kept": 3}
+
+def test_thread_ids_and_names():
+    tracer = Tracer()
+    tracer.instant("main")
+    worker = threading.Thread(target=lambda: tracer.instant("worker"), name="asr-worker")
+    worker.start()
+    worker.join()
+    trace = tracer.to_chrome()
+    metadata = [e for e in trace["traceEvents"] if e["ph"] == "M"]
+    events = {e["name"]: e for e in trace["traceEvents"] if e["ph"] != "M"}
+    assert len(metadata) == 2
+    assert events["main"]["tid"] != events["worker"]["tid"]
+    main_name = [m["args"]["name"] for m in metadata if m["tid"] == events["main"]["tid"]]
+    assert main_name == [threading.current_thread().name]
+
+def test_dump_and_api_route():
+    tracer = Tracer()
+    with tracer.span("tts", "tts"):
+        pass
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "trace.json")
+        assert tracer.dump(path) == 1
+        with open(path) as f:
+            assert json.load(f)["traceEvents"][-1]["name"] == "tts"
+
+    api = HeadlessAPI(transcribe=lambda pcm, rate: "", respond=lambda text, session: ("", "test"),
+                      trace=tracer.to_chrome, log=lambda message: None)
+    server = api.serve_tcp(port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/v1/trace"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            body = json.loads(response.read())
+        assert body["traceEvents"][-1]["name"] == "tts"
+    finally:
+        api.stop()
+
+def main():
+    print("🧵 NEPTR Tracer Test")
+    print("=" * 40)
+
+    tests = [
+        test_spans_and_instants,
+        test_ring_buffer_keeps_newest,
+        test_thread_ids_and_names,
+        test_dump_and_api_route,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"  ❌ {test.__name__}: {e}")
+
+    print(f"\n📊 Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
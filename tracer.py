@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Timeline tracing for NEPTR
+Spans (audio blocks, Vosk decodes, state changes, answer sources, TTS) are
+appended to a ring buffer with the thread they ran on, and exported in the
+Chrome trace event format on request. Open the dump in chrome://tracing or
+https://ui.perfetto.dev to see why one turn stalled.
+
+Recording a span is one tuple appended to a bounded deque; when tracing is
+off NEPTR keeps no tracer at all, so there is nothing to pay.
+"""
+
+import collections
+import contextlib
+import json
+import os
+import threading
+import time
+
+
+class Tracer:
+    """Keeps the last `capacity` events; older ones are overwritten"""
+
+    def __init__(self, capacity=50000, clock=time.monotonic):
+        self.clock = clock
+        self.origin = clock()
+        self.events = collections.deque(maxlen=capacity)
+        self.recorded = 0
+        self.pid = os.getpid()
+
+    def complete(self, name, start, end=None, cat="neptr", **args):
+        """A span that started at `start` (clock seconds) and ends at `end` (default now)"""
+        end = self.clock() if end is None else end
+        self.events.append(("X", name, cat, start, end - start, threading.get_ident(), args))
+        self.recorded += 1
+
+    def instant(self, name, cat="neptr", **args):
+        self.events.append(("i", name, cat, self.clock(), 0.0, threading.get_ident(), args))
+        self.recorded += 1
+
+    @contextlib.contextmanager
+    def span(self, name, cat="neptr", **args):
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.complete(name, start, cat=cat, **args)
+
+    def clear(self):
+        self.events.clear()
+
+    def to_chrome(self) -> dict:
+        """Chrome trace event JSON (timestamps in microseconds since the tracer started)"""
+        events = list(self.events)
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        trace = []
+        for tid in sorted({event[5] for event in events}):
+            trace.append({"ph": "M", "name": "thread_name", "pid": self.pid, "tid": tid,
+                          "args": {"name": names.get(tid, f"thread-{tid}")}})
+        for ph, name, cat, at, duration, tid, args in events:
+            event = {"ph": ph, "name": name, "cat": cat, "pid": self.pid, "tid": tid,
+                     "ts": round((at - self.origin) * 1e6, 1)}
+            if ph == "X":
+                event["dur"] = round(duration * 1e6, 1)
+            else:
+                event["s"] = "t"
+            if args:
+                event["args"] = args
+            trace.append(event)
+        return {"traceEvents": trace, "displayTimeUnit": "ms",
+                "otherData": {"recorded": self.recorded, "kept": len(events)}}
+
+    def dump(self, path) -> int:
+        """Write the buffer as Chrome trace JSON; returns the number of events written"""
+        trace = self.to_chrome()
+        with open(path, "w") as f:
+            json.dump(trace, f)
+        return trace["otherData"]["kept"]
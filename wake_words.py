@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Wake word matching for NEPTR
+Compiles TRIGGERS and the common mishears of "neptr" into two regexes so a
+transcript is checked in one pass instead of a loop per phrase.
+"""
+
+import re
+
+# Things Vosk hears when you say "neptr"
+NEPTR_VARIATIONS = [
+    "neptr", "nepter", "nectar", "after", "nefter", "nefther", "nepther", "neptar",
+    "neptor", "neptur", "napster", "nester", "nestor", "nexter",
+]
+
+GREETING_WORDS = ["hello", "hey", "hi"]
+
+
+def _alternation(phrases, whole_words=False):
+    unique = sorted({p.lower() for p in phrases if p}, key=len, reverse=True)
+    if not unique:
+        return None
+    pattern = "|".join(re.escape(p) for p in unique)
+    return re.compile(rf"\b(?:{pattern})\b" if whole_words else pattern)
+
+
+class WakeMatcher:
+    """
+    A transcript wakes NEPTR if it contains any trigger phrase, or a greeting
+    word together with any "neptr"-like word (same rules as before, as substrings).
+    """
+
+    def __init__(self, triggers, greetings=GREETING_WORDS, variations=NEPTR_VARIATIONS):
+        self.triggers = list(triggers)
+        self._trigger_re = _alternation(self.triggers)
+        self._greeting_re = _alternation(greetings)
+        self._variation_re = _alternation(variations)
+        self._partial_re = _alternation(list(greetings) + list(variations), whole_words=True)
+
+    def matches(self, transcript: str) -> bool:
+        text = transcript.lower()
+        if self._trigger_re is not None and self._trigger_re.search(text):
+            return True
+        return bool(self._greeting_re and self._greeting_re.search(text)
+                    and self._variation_re and self._variation_re.search(text))
+
+    __call__ = matches
+
+    def near_miss(self, transcript: str) -> bool:
+        """Half a wake phrase (a greeting or a "neptr"-like word on its own) that did not wake NEPTR"""
+        text = transcript.lower()
+        return bool(self._partial_re and self._partial_re.search(text)) and not self.matches(text)